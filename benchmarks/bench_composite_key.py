@@ -0,0 +1,99 @@
+"""
+Benchmark DataValidator.create_composite_key against the original iterrows() implementation
+
+Usage:
+    python benchmarks/bench_composite_key.py                        # 10k / 100k / 500k rows
+    python benchmarks/bench_composite_key.py --rows 1000000 --repeat 1
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.config import ExportConfig
+from shared.data_validator import DataValidator
+
+def legacy_keys(df: pd.DataFrame, key_columns) -> pd.Series:
+    """DataValidator.create_composite_key before vectorization"""
+    if key_columns == "ALL_EXCEPT_NO":
+        available_columns = [col for col in df.columns if col.lower() != "no"]
+    else:
+        available_columns = [col for col in key_columns if col in df.columns]
+
+    composite_keys = []
+    for _, row in df.iterrows():
+        key_parts = []
+        for col in available_columns:
+            value = str(row[col]) if pd.notna(row[col]) and row[col] != '' else 'NULL'
+            key_parts.append(value)
+        composite_keys.append("||".join(key_parts))
+    return pd.Series(composite_keys, index=df.index)
+
+def build_point_trx_frame(rows: int) -> pd.DataFrame:
+    """Parsed point_trx export: text, money, counts with blanks, text dates and sparse reasons"""
+    rng = np.random.default_rng(42)
+    timestamps = pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 7 * 86400, rows), unit="s")
+    status = rng.choice(["Berhasil", "Batal", "Pending"], rows)
+    return pd.DataFrame({
+        "No": np.arange(1, rows + 1),
+        "Nomor Transaksi QRCODE": [f"QR{n:010d}" for n in rng.integers(0, 10**10, rows)],
+        "Cabang": rng.choice(["Jakarta", "Bandung", "Surabaya", "Medan"], rows).astype(object),
+        "Checker": rng.choice(["checker01", "checker02", "checker03"], rows).astype(object),
+        "Nama": [f"Member {n}" for n in rng.integers(0, 50000, rows)],
+        "Tipe": rng.choice(["Earn", "Redeem"], rows).astype(object),
+        "Jumlah Total Belanja": rng.integers(10000, 5000000, rows),
+        "Jumlah": np.where(rng.random(rows) < 0.02, np.nan, rng.integers(1, 500, rows)),
+        "Tanggal Belanja": timestamps.strftime("%Y-%m-%d %H:%M:%S").astype(object),
+        "Tanggal Scan": timestamps.strftime("%Y-%m-%d %H:%M:%S").astype(object),
+        "Status": status.astype(object),
+        "Alasan Batal": np.where(status == "Batal", "Dibatalkan member", None),
+    })
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare composite key building with the iterrows() original")
+    parser.add_argument("--rows", type=int, action="append", help="Row counts to benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions of the new builder (best is reported)")
+    args = parser.parse_args()
+
+    # create_composite_key logs the column list on every call
+    logging.getLogger("shared.data_validator").setLevel(logging.WARNING)
+
+    cases = [
+        ("point_trx", ExportConfig.get_export_config("point_trx")["composite_key_columns"]),
+        ("ALL_EXCEPT_NO", "ALL_EXCEPT_NO"),
+    ]
+
+    print(f"{'keys':>14} {'rows':>8} {'iterrows (s)':>13} {'vectorized (s)':>15} {'speedup':>9}  identical")
+    for rows in args.rows or [10_000, 100_000, 500_000]:
+        df = build_point_trx_frame(rows)
+        for name, key_columns in cases:
+            validator = DataValidator(composite_key_columns=key_columns)
+
+            # The original is slow enough that a single run is representative
+            start = time.perf_counter()
+            expected = legacy_keys(df, key_columns)
+            legacy_time = time.perf_counter() - start
+            vectorized_time = best_of(lambda: validator.create_composite_key(df), args.repeat)
+
+            actual = validator.create_composite_key(df)
+            same = expected.index.equals(actual.index) and expected.tolist() == actual.tolist()
+            print(f"{name:>14} {rows:>8} {legacy_time:>13.3f} {vectorized_time:>15.3f} "
+                  f"{legacy_time / vectorized_time:>8.1f}x  {'yes' if same else 'NO'}")
+
+if __name__ == "__main__":
+    main()
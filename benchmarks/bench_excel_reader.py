@@ -0,0 +1,119 @@
+"""
+Benchmark xlsx reader engines on workbooks shaped like our exports
+
+Usage:
+    python benchmarks/bench_excel_reader.py                 # synthetic point_trx/pembayaran_koin/user shapes
+    python benchmarks/bench_excel_reader.py --rows 50000
+    python benchmarks/bench_excel_reader.py --file downloads/export_point_trx_2025-09-01_2025-09-07.xlsx
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.excel_reader import ExcelReader
+
+def build_export_frame(export_type: str, rows: int) -> pd.DataFrame:
+    """Synthetic frame with the column mix of a real export (text, money, dates, sparse columns)"""
+    rng = np.random.default_rng(42)
+    start = datetime(2025, 9, 1)
+    timestamps = [start + timedelta(seconds=int(s)) for s in rng.integers(0, 7 * 86400, rows)]
+    status = rng.choice(["Berhasil", "Batal", "Pending"], rows)
+
+    if export_type == "point_trx":
+        return pd.DataFrame({
+            "No": np.arange(1, rows + 1),
+            "Nomor Transaksi QRCODE": [f"QR{n:010d}" for n in rng.integers(0, 10**10, rows)],
+            "Cabang": rng.choice(["Jakarta", "Bandung", "Surabaya", "Medan"], rows),
+            "Checker": rng.choice(["checker01", "checker02", "checker03"], rows),
+            "Nama": [f"Member {n}" for n in rng.integers(0, 50000, rows)],
+            "Tipe": rng.choice(["Earn", "Redeem"], rows),
+            "Jumlah Total Belanja": rng.integers(10000, 5000000, rows),
+            "Jumlah": rng.integers(1, 500, rows),
+            "Tanggal Belanja": timestamps,
+            "Tanggal Scan": timestamps,
+            "Status": status,
+            # Mostly empty - becomes NaN in pandas
+            "Alasan Batal": np.where(status == "Batal", "Dibatalkan member", None),
+        })
+
+    if export_type == "pembayaran_koin":
+        return pd.DataFrame({
+            "No": np.arange(1, rows + 1),
+            "Nama": [f"Member {n}" for n in rng.integers(0, 50000, rows)],
+            "Cabang": rng.choice(["Jakarta", "Bandung", "Surabaya", "Medan"], rows),
+            "Jumlah Koin": rng.integers(1, 1000, rows),
+            "Nominal": np.round(rng.random(rows) * 100000, 2),
+            "Tanggal": timestamps,
+            "Status": status,
+        })
+
+    return pd.DataFrame({
+        "#ID/ Nama": [f"{n}/ Member {n}" for n in rng.integers(0, 10**6, rows)],
+        "Email": [f"member{n}@example.com" for n in rng.integers(0, 10**6, rows)],
+        "No HP": [f"08{n:010d}" for n in rng.integers(0, 10**10, rows)],
+        "Poin": rng.integers(0, 100000, rows),
+        "Tanggal Daftar": timestamps,
+    })
+
+def to_xlsx_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+def time_call(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench(label: str, content: bytes, repeat: int):
+    print(f"\n=== {label}: {len(content) / 1024:.0f} KB ===")
+    reference = ExcelReader("pandas").read(content)
+    print(f"{'engine':<20} {'read (s)':>10} {'count_rows (s)':>15}  identical")
+
+    for engine in ExcelReader.available_engines():
+        reader = ExcelReader(engine)
+        read_time = time_call(lambda: reader.read(content), repeat)
+        count_time = time_call(lambda: reader.count_rows(content), repeat)
+
+        try:
+            pd.testing.assert_frame_equal(reader.read(content), reference)
+            identical = "yes"
+        except AssertionError as e:
+            identical = f"NO ({str(e).splitlines()[0]})"
+
+        assert reader.count_rows(content) == len(reference), f"{engine} row count mismatch"
+        print(f"{engine:<20} {read_time:>10.3f} {count_time:>15.3f}  {identical}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare xlsx reader engines")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per synthetic export")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--file", action="append", help="Benchmark a real export file instead (repeatable)")
+    args = parser.parse_args()
+
+    print(f"Available engines: {ExcelReader.available_engines()}")
+
+    if args.file:
+        for path in args.file:
+            with open(path, "rb") as fh:
+                bench(os.path.basename(path), fh.read(), args.repeat)
+        return
+
+    for export_type in ("point_trx", "pembayaran_koin", "user"):
+        content = to_xlsx_bytes(build_export_frame(export_type, args.rows))
+        bench(f"{export_type} x {args.rows} rows", content, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the Sheets values serializer against the original cleaning + values.tolist()
+
+Usage:
+    python benchmarks/bench_sheets_serializer.py                    # 10k / 100k / 1M cells
+    python benchmarks/bench_sheets_serializer.py --cells 5000000 --repeat 1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.export_schema import ExportSchema
+from shared.sheets_serializer import SheetsSerializer
+
+def legacy_values(df: pd.DataFrame) -> list:
+    """SheetsManager._clean_data_for_json before the serializer, followed by values.tolist()"""
+    df = df.fillna('')
+    df = df.replace([float('inf'), float('-inf')], '')
+    for col in df.select_dtypes(include=['float64', 'int64']).columns:
+        df[col] = df[col].astype(str).replace('nan', '').replace('inf', '').replace('-inf', '')
+    return df.values.tolist()
+
+def build_point_trx_frame(rows: int) -> pd.DataFrame:
+    """Parsed point_trx export: 12 columns of text, money, counts, text dates and sparse reasons"""
+    rng = np.random.default_rng(42)
+    timestamps = pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 7 * 86400, rows), unit="s")
+    status = rng.choice(["Berhasil", "Batal", "Pending"], rows)
+    return pd.DataFrame({
+        "No": np.arange(1, rows + 1),
+        "Nomor Transaksi QRCODE": [f"QR{n:010d}" for n in rng.integers(0, 10**10, rows)],
+        "Cabang": rng.choice(["Jakarta", "Bandung", "Surabaya", "Medan"], rows).astype(object),
+        "Checker": rng.choice(["checker01", "checker02", "checker03"], rows).astype(object),
+        "Nama": [f"Member {n}" for n in rng.integers(0, 50000, rows)],
+        "Tipe": rng.choice(["Earn", "Redeem"], rows).astype(object),
+        "Jumlah Total Belanja": rng.integers(10000, 5000000, rows),
+        # Blank cells make pandas read the column as float64 with NaN
+        "Jumlah": np.where(rng.random(rows) < 0.02, np.nan, rng.integers(1, 500, rows)),
+        "Tanggal Belanja": timestamps.strftime("%Y-%m-%d %H:%M:%S").astype(object),
+        "Tanggal Scan": timestamps.strftime("%Y-%m-%d %H:%M:%S").astype(object),
+        "Status": status.astype(object),
+        "Alasan Batal": np.where(status == "Batal", "Dibatalkan member", None),
+    })
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def identical(expected: list, actual: list) -> bool:
+    """Same cells, including Python types (a float 4.0 and the string '4.0' are different cells)"""
+    return len(expected) == len(actual) and all(
+        len(left) == len(right) and all(type(a) is type(b) and a == b for a, b in zip(left, right))
+        for left, right in zip(expected, actual)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Sheets serializer with the original cleaning")
+    parser.add_argument("--cells", type=int, action="append", help="Cell counts to benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    schema = ExportSchema("point_trx")
+    serializer = SheetsSerializer(schema)
+
+    print(f"{'cells':>10} {'rows':>8} {'legacy (s)':>11} {'serializer (s)':>15} {'typed (s)':>10} {'speedup':>8}  identical")
+    for cells in args.cells or [10_000, 100_000, 1_000_000]:
+        df = build_point_trx_frame(max(cells // 12, 1))
+        typed = schema.apply(df.copy())
+
+        expected = legacy_values(df)
+        legacy_time = best_of(lambda: legacy_values(df), args.repeat)
+        serializer_time = best_of(lambda: serializer.to_values(df), args.repeat)
+        # Frame with the schema's categoricals and datetimes, as SheetsManager parses it
+        typed_time = best_of(lambda: serializer.to_values(typed), args.repeat)
+
+        same = identical(expected, serializer.to_values(df)) and identical(expected, serializer.to_values(typed))
+        print(f"{df.size:>10} {len(df):>8} {legacy_time:>11.3f} {serializer_time:>15.3f} {typed_time:>10.3f} "
+              f"{legacy_time / serializer_time:>7.1f}x  {'yes' if same else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -137,6 +137,10 @@ def test_other_dependencies():
         ('webdriver_manager', 'WebDriver management')
     ]
 
+    # Encrypted session cache needs Fernet
+    if os.getenv('SESSION_CACHE_KEY'):
+        dependencies.append(('cryptography', 'Session cache encryption (SESSION_CACHE_KEY is set)'))
+
     all_good = True
 
     for dep_name, description in dependencies:
@@ -11,6 +11,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared.backend_connector import BackendConnector
+from shared.export_download import ExportDownloadMixin
+from shared.http_exporter import HttpExportFetcher
+from shared.windowed_export import WindowedExportFetcher
 from shared.sheets_manager import SheetsManager
 from shared.config import ExportConfig
 
@@ -24,12 +27,12 @@ logging.basicConfig(
     ]
 )
 
-class PointTrxExportAutomation:
+class PointTrxExportAutomation(ExportDownloadMixin):
     """Point Transaction export automation with smart data validation"""
     
-    def __init__(self):
-        self.export_type = "point_trx"
-        self.connector = BackendConnector(self.export_type)
+    def __init__(self, connector: BackendConnector = None, http_fetcher: HttpExportFetcher = None,
+                 windowed_fetcher: WindowedExportFetcher = None):
+        self._setup_download("point_trx", connector, http_fetcher, windowed_fetcher)
         self.sheets_manager = SheetsManager(self.export_type)
         self.logger = logging.getLogger(__name__)
     
@@ -45,20 +48,13 @@ class PointTrxExportAutomation:
             
             self.logger.info(f"Starting point transaction export for date range: {start_date} to {end_date}")
             
-            # Setup browser
-            self.connector.setup_browser()
-            
-            # Login to backend
-            self.connector.login_to_backend()
-            
-            # Navigate to export page
-            self.connector.navigate_to_export_page()
-            
-            # Download export file
-            downloaded_file = self.connector.download_export_file(start_date, end_date)
+            # One download, or a long range's merged date windows
+            downloaded_file = self.fetch_source(start_date, end_date)
             
             # Upload to Google Sheets with smart validation
-            upload_result = self.sheets_manager.upload_with_smart_validation(downloaded_file)
+            upload_result = self.sheets_manager.upload_with_smart_validation(
+                downloaded_file, start_date=start_date, end_date=end_date
+            )
 
             # Cleanup old files
             self.connector.cleanup_old_files()
@@ -79,8 +75,9 @@ class PointTrxExportAutomation:
             return {"success": False, "records": 0, "error": str(e)}
         
         finally:
-            # Cleanup browser resources
-            self.connector.cleanup()
+            # Cleanup browser resources (shared sessions are closed by their owner)
+            if self.owns_connector:
+                self.connector.cleanup()
 
 # Convenience functions
 def run_today():
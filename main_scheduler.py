@@ -211,14 +211,20 @@ from exports.automation_user import UserExportAutomation
 from exports.automation_pembayaran_koin import PembayaranKoinExportAutomation
 
 # Import Telegram notifications and configuration
-# Note: SingleSessionAutomation temporarily disabled during Selenium migration
 from shared.telegram_notifier import TelegramNotifier
 from shared.config import ExportConfig
+from shared.backend_connector import BackendConnector
+from shared.http_exporter import HttpExportFetcher
+from shared.windowed_export import WindowedExportFetcher, split_date_range
+from shared.backfill_checkpoint import BackfillCheckpoint
+from shared.raw_archive import RawExportArchive
+from shared.sheets_manager import SheetsManager
+from shared.streaming_upload import peak_rss_mb
 
 class MainScheduler:
     """Main scheduler for all export automation tasks"""
     
-    def __init__(self, use_single_session=True):
+    def __init__(self, use_single_session=True, window_days=None):
         self.logger = logging.getLogger(__name__)
         self.use_single_session = use_single_session
         
@@ -236,6 +242,12 @@ class MainScheduler:
             chat_id=ExportConfig.TELEGRAM_CHAT_ID
         )
         
+        # Pooled HTTP session shared by every export; the browser is only a fallback
+        self.http_fetcher = HttpExportFetcher() if ExportConfig.HTTP_EXPORT_CONFIG["enabled"] else None
+        
+        # Multi-day ranges split into N-day windows (window_days overrides WINDOWED_EXPORT_CONFIG)
+        self.windowed_fetcher = WindowedExportFetcher(window_days=window_days)
+        
         # Individual export classes
         self.exports = {
             "transaksi": TransaksiExportAutomation,
@@ -244,15 +256,17 @@ class MainScheduler:
             "pembayaran_koin": PembayaranKoinExportAutomation
         }
     
-    def run_single_export(self, export_type, start_date=None, end_date=None):
-        """Run a single export task"""
+    def run_single_export(self, export_type, start_date=None, end_date=None, connector=None):
+        """Run a single export task, optionally on a shared logged-in connector"""
         if export_type not in self.exports:
             raise ValueError(f"Unknown export type: {export_type}")
         
         self.logger.info(f"Starting {export_type} export with dates: {start_date} to {end_date}")
         
         try:
-            automation = self.exports[export_type]()
+            automation = self.exports[export_type](
+                connector=connector, http_fetcher=self.http_fetcher, windowed_fetcher=self.windowed_fetcher
+            )
             
             # Handle all exports with date parameters
             if export_type == "user":
@@ -281,21 +295,30 @@ class MainScheduler:
         mode = "single session" if self.use_single_session else "individual sessions"
         self.telegram.send_system_start(mode)
         
-        # Temporarily use individual sessions mode during Selenium migration
-        # Single session mode will be re-enabled after SingleSessionAutomation is updated for Selenium
         if self.use_single_session:
-            self.logger.info("Single session mode temporarily disabled - using individual sessions")
-            self.logger.info("Running individual exports with Selenium WebDriver...")
-            return self._run_individual_exports(start_date, end_date, start_time)
+            return self._run_single_session_exports(start_date, end_date, start_time)
         else:
             return self._run_individual_exports(start_date, end_date, start_time)
     
-    def _run_individual_exports(self, start_date=None, end_date=None, start_time=None):
-        """Run exports using individual automation classes (legacy mode)"""
+    def _run_single_session_exports(self, start_date=None, end_date=None, start_time=None):
+        """Run all exports on one browser that logs in once and is shared by every export"""
+        self.logger.info("Starting all exports in single session mode (one browser, one login)...")
+        
+        # Browser setup and login happen lazily on the first export that needs them
+        shared_connector = BackendConnector(next(iter(self.exports)))
+        
+        try:
+            return self._run_individual_exports(start_date, end_date, start_time, connector=shared_connector)
+        finally:
+            shared_connector.cleanup()
+    
+    def _run_individual_exports(self, start_date=None, end_date=None, start_time=None, connector=None):
+        """Run exports using individual automation classes (legacy mode, or on a shared connector)"""
         if start_time is None:
             start_time = datetime.now()
             
-        self.logger.info("Starting all exports in individual session mode...")
+        if connector is None:
+            self.logger.info("Starting all exports in individual session mode...")
         
         results = {}
         
@@ -304,7 +327,7 @@ class MainScheduler:
             export_start_time = datetime.now()
             
             try:
-                result = self.run_single_export(export_type, start_date, end_date)
+                result = self.run_single_export(export_type, start_date, end_date, connector=connector)
                 execution_time = (datetime.now() - export_start_time).total_seconds()
 
                 # Handle both old boolean and new dict return formats
@@ -313,7 +336,11 @@ class MainScheduler:
                     records = result.get("records", 0)
                     error = result.get("error", "")
 
-                    if success:
+                    if success and result.get("status") == "unchanged":
+                        # Same download as the last run - reported in the daily summary only
+                        self.logger.info(f"{export_type} unchanged since last run - upload skipped")
+                        results[export_type] = {"success": True, "records": records, "time": execution_time, "status": "unchanged"}
+                    elif success:
                         self.telegram.send_export_success(export_type, records, execution_time)
                         results[export_type] = {"success": True, "records": records, "time": execution_time}
                     else:
@@ -337,11 +364,17 @@ class MainScheduler:
         successful = [k for k, v in results.items() if v.get("success", False)]
         failed = [k for k, v in results.items() if not v.get("success", False)]
         
-        self.logger.info(f"Individual exports execution completed!")
+        self.logger.info(f"{'Single session' if connector else 'Individual'} exports execution completed!")
         self.logger.info(f"Successful exports: {successful}")
+        unchanged = [k for k, v in results.items() if v.get("status") == "unchanged"]
+        if unchanged:
+            self.logger.info(f"Unchanged exports (upload skipped): {unchanged}")
         if failed:
             self.logger.warning(f"Failed exports: {failed}")
         
+        # Memory high-water mark for the whole run (large ranges use the streaming upload)
+        self.logger.info(f"Peak RSS this run: {peak_rss_mb():.0f} MB")
+        
         # Send daily summary
         total_time = (datetime.now() - start_time).total_seconds()
         self.telegram.send_daily_summary(results, total_time)
@@ -368,14 +401,17 @@ class MainScheduler:
         else:
             return self.run_all_exports_sequential(target_date, target_date)
     
-    def run_weekly_exports(self, mode="sequential"):
-        """Run exports for the last 7 days"""
+    def run_weekly_exports(self, mode="sequential", window_days=None):
+        """Run exports for the last 7 days (optionally fetched as window_days-day windows)"""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=7)
         
         start_date_str = start_date.strftime("%Y-%m-%d")
         end_date_str = end_date.strftime("%Y-%m-%d")
         
+        if window_days:
+            self.windowed_fetcher = WindowedExportFetcher(window_days=window_days)
+        
         self.logger.info(f"Running weekly exports from {start_date_str} to {end_date_str} in {mode} mode")
         
         if mode == "parallel":
@@ -383,6 +419,140 @@ class MainScheduler:
         else:
             return self.run_all_exports_sequential(start_date_str, end_date_str)
     
+    def run_backfill(self, export_types, start_date, end_date, window_days=None, restart=False):
+        """Load history for a date range window by window, resuming from the last checkpoint"""
+        unknown = [export_type for export_type in export_types if export_type not in self.exports]
+        if unknown:
+            raise ValueError(f"Unknown export type(s): {unknown}")
+        
+        window_days = window_days or ExportConfig.BACKFILL_CONFIG["window_days"]
+        windows = split_date_range(start_date, end_date, window_days)
+        checkpoint = BackfillCheckpoint(start_date, end_date, window_days)
+        if restart:
+            checkpoint.reset()
+        
+        self.logger.info(f"BACKFILL: {export_types} from {start_date} to {end_date} - {len(windows)} windows of {window_days} day(s)")
+        self.logger.info(f"BACKFILL checkpoint: {checkpoint.path}")
+        
+        # One browser and one login for the whole backfill (started only if the HTTP export fails)
+        shared_connector = BackendConnector(export_types[0])
+        backfill_start = datetime.now()
+        results = {}
+        
+        try:
+            for export_type in export_types:
+                results[export_type] = self._backfill_export(export_type, windows, checkpoint, shared_connector)
+        finally:
+            shared_connector.cleanup()
+        
+        minutes = max((datetime.now() - backfill_start).total_seconds() / 60, 1e-6)
+        windows_done = sum(result["windows_done"] for result in results.values())
+        records = sum(result["records"] for result in results.values())
+        failed = [export_type for export_type, result in results.items() if not result["success"]]
+        
+        self.logger.info(f"BACKFILL finished in {minutes:.1f} min: {windows_done} windows, {records} rows "
+                         f"({windows_done / minutes:.1f} windows/min, {records / minutes:.0f} rows/min)")
+        if failed:
+            self.logger.warning(f"BACKFILL incomplete for {failed} - rerun the same command to resume")
+        
+        return results
+    
+    def _backfill_export(self, export_type, windows, checkpoint, connector):
+        """Download, parse and upload every pending window of one export, in date order
+
+        Stops at the first failed window so the sheet is always filled up to the checkpoint.
+        """
+        automation = self.exports[export_type](
+            connector=connector, http_fetcher=self.http_fetcher, windowed_fetcher=self.windowed_fetcher
+        )
+        sheets_manager = automation.sheets_manager
+        export_start = datetime.now()
+        windows_done = 0
+        windows_skipped = 0
+        records = 0
+        error = None
+        
+        for window_start, window_end in windows:
+            if checkpoint.is_uploaded(export_type, window_start, window_end):
+                windows_skipped += 1
+                continue
+            
+            try:
+                # 1. Download - reuse the file an interrupted attempt left behind
+                source = checkpoint.reusable_file(export_type, window_start, window_end)
+                if source is None:
+                    source = automation.download_export(window_start, window_end)
+                    if source is None:
+                        raise Exception("No export file downloaded")
+                content_hash = sheets_manager.parsed_cache.content_hash(source)
+                checkpoint.mark(export_type, window_start, window_end, "downloaded",
+                                file=str(source) if isinstance(source, (str, Path)) else None, content_hash=content_hash)
+                
+                # 2. Parse into the Parquet cache - the upload reads the same entry (large files stream instead)
+                rows = None
+                if not sheets_manager._use_streaming(source):
+                    rows = len(sheets_manager.parsed_cache.load(source, sheets_manager.excel_reader, digest=content_hash))
+                checkpoint.mark(export_type, window_start, window_end, "parsed", rows=rows)
+                
+                # 3. Upload
+                upload_result = sheets_manager.upload_with_smart_validation(source, start_date=window_start, end_date=window_end)
+                if not upload_result.get("success", False):
+                    raise Exception(upload_result.get("error") or "Upload failed")
+                checkpoint.mark(export_type, window_start, window_end, "uploaded",
+                                records=upload_result.get("records", 0), status=upload_result.get("status", "uploaded"))
+                
+            except Exception as e:
+                error = str(e)
+                checkpoint.mark_failed(export_type, window_start, window_end, error)
+                self.logger.error(f"BACKFILL {export_type} {window_start}..{window_end} failed: {error}")
+                break
+            
+            windows_done += 1
+            records += upload_result.get("records", 0)
+            minutes = max((datetime.now() - export_start).total_seconds() / 60, 1e-6)
+            self.logger.info(f"BACKFILL {export_type}: {windows_done + windows_skipped}/{len(windows)} windows "
+                             f"({windows_done / minutes:.1f} windows/min, {records / minutes:.0f} rows/min)")
+        
+        automation.connector.cleanup_old_files()
+        
+        return {
+            "success": error is None,
+            "records": records,
+            "windows_done": windows_done,
+            "windows_skipped": windows_skipped,
+            "windows_total": len(windows),
+            "time": (datetime.now() - export_start).total_seconds(),
+            "error": error
+        }
+    
+    def run_replay(self, export_type, start_date, end_date, run_id=None):
+        """Upload an archived download again without contacting the backend
+
+        A range that was fetched as date windows is rebuilt from its archived windows.
+        """
+        if export_type not in self.exports:
+            raise ValueError(f"Unknown export type: {export_type}")
+        
+        archive = RawExportArchive()
+        source = archive.replay_source(export_type, start_date, end_date, run_id)
+        if source is None and not run_id and self.windowed_fetcher.should_split(start_date, end_date):
+            windows = self.windowed_fetcher.windows_for(start_date, end_date)
+            buffers = [archive.replay_source(export_type, *window) for window in windows]
+            if all(buffer is not None for buffer in buffers):
+                source = self.windowed_fetcher.merge(export_type, buffers)
+        
+        if source is None:
+            runs = archive.runs(export_type, start_date, end_date)
+            self.logger.error(f"REPLAY: no archived {export_type} download for {start_date}..{end_date}"
+                              f"{f' run {run_id}' if run_id else ''} (archived runs: {[run['run_id'] for run in runs]})")
+            return {"success": False, "records": 0, "error": "Not archived"}
+        
+        self.logger.info(f"REPLAY: uploading archived {export_type} {start_date}..{end_date}{f' from run {run_id}' if run_id else ''}")
+        # Rows already in the sheet are still skipped by smart validation
+        return SheetsManager(export_type).upload_with_smart_validation(
+            source, start_date=start_date, end_date=end_date, skip_unchanged=False
+        )
+    
     def get_export_status(self):
         """Get status information about all available exports"""
         status = {
@@ -426,6 +596,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run export automation tasks')
     parser.add_argument('--export', type=str, help='Specific export to run (transaksi, point_trx, user, pembayaran_koin)')
     parser.add_argument('--date', type=str, help='Date for export (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, help='End of a multi-day range starting at --date (YYYY-MM-DD)')
+    parser.add_argument('--window-days', type=int, help='Split multi-day ranges into windows of this many days, fetched in parallel')
+    parser.add_argument('--backfill', action='store_true', help='Backfill history from --date to --end-date window by window (resumable)')
+    parser.add_argument('--exports', type=str, help='Comma-separated exports for --backfill (default: all)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the --backfill checkpoint and start over')
+    parser.add_argument('--replay', action='store_true', help='Upload the archived download of --export for --date/--end-date again (no backend access)')
+    parser.add_argument('--run-id', type=str, help='Archived run to --replay (default: latest)')
     parser.add_argument('--mode', type=str, choices=['sequential', 'parallel'], default='sequential', help='Execution mode')
     parser.add_argument('--all', action='store_true', help='Run all exports')
     parser.add_argument('--single-session', action='store_true', default=True, help='Use single session mode (default)')
@@ -439,7 +616,8 @@ if __name__ == "__main__":
     # ENHANCED DEBUG: Log all parsed arguments with validation
     logging.info("="*50)
     logging.info("MAIN SCHEDULER ARGUMENT VALIDATION")
-    logging.info(f"Parsed arguments: export={args.export}, date={args.date}, mode={args.mode}, all={args.all}")
+    logging.info(f"Parsed arguments: export={args.export}, date={args.date}, end_date={args.end_date}, mode={args.mode}, all={args.all}")
+    logging.info(f"Window days: {args.window_days}")
     logging.info(f"Single session: {args.single_session}")
     logging.info(f"Headless: {args.headless}, Debug: {args.debug}, Production: {args.production}")
     
@@ -458,31 +636,54 @@ if __name__ == "__main__":
     else:
         logging.info("DEFAULT MODE: Will run daily exports (yesterday)")
     
+    if args.backfill:
+        if not args.date or not args.end_date:
+            logging.error("--backfill needs both --date (start) and --end-date")
+            sys.exit(1)
+        export_types = args.exports.split(",") if args.exports else list(ExportConfig.EXPORTS.keys())
+        logging.info(f"BACKFILL MODE: {export_types} from {args.date} to {args.end_date}")
+        scheduler = MainScheduler(use_single_session=args.single_session)
+        backfill_results = scheduler.run_backfill(
+            [export_type.strip() for export_type in export_types], args.date, args.end_date,
+            window_days=args.window_days, restart=args.restart
+        )
+        sys.exit(0 if all(result["success"] for result in backfill_results.values()) else 1)
+    
+    if args.replay:
+        if not args.export or not args.date:
+            logging.error("--replay needs --export and --date (optionally --end-date and --run-id)")
+            sys.exit(1)
+        logging.info(f"REPLAY MODE: {args.export} from {args.date} to {args.end_date or args.date}")
+        scheduler = MainScheduler(use_single_session=args.single_session, window_days=args.window_days)
+        replay_result = scheduler.run_replay(args.export, args.date, args.end_date or args.date, run_id=args.run_id)
+        sys.exit(0 if replay_result.get("success", False) else 1)
+    
     # Default date fallback if none provided
     if args.date is None:
         # Use today's date for current data
         from datetime import datetime
         args.date = datetime.now().strftime("%Y-%m-%d")
         logging.info(f"No date provided, using today's date: {args.date}")
+    end_date = args.end_date or args.date
     
     logging.info("="*50)
     
-    scheduler = MainScheduler(use_single_session=args.single_session)
+    scheduler = MainScheduler(use_single_session=args.single_session, window_days=args.window_days)
     
     if args.export:
         # SINGLE EXPORT EXECUTION - Enhanced logging
         logging.info(f"EXECUTING SINGLE EXPORT: {args.export}")
-        logging.info(f"Date range: {args.date} to {args.date}")
-        result = scheduler.run_single_export(args.export, args.date, args.date)
+        logging.info(f"Date range: {args.date} to {end_date}")
+        result = scheduler.run_single_export(args.export, args.date, end_date)
         logging.info(f"SINGLE EXPORT RESULT: {'SUCCESS' if result else 'FAILED'}")
         sys.exit(0 if result else 1)
     elif args.all:
         # Run all exports
-        logging.info(f"Running all exports with date: {args.date}")
+        logging.info(f"Running all exports with date range: {args.date} to {end_date}")
         if args.mode == 'parallel':
-            scheduler.run_all_exports_parallel(args.date, args.date)
+            scheduler.run_all_exports_parallel(args.date, end_date)
         else:
-            scheduler.run_all_exports_sequential(args.date, args.date)
+            scheduler.run_all_exports_sequential(args.date, end_date)
     else:
         # Default: run daily exports for yesterday
         scheduler.run_daily_exports()
\ No newline at end of file
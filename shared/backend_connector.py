@@ -4,16 +4,20 @@ Backend connection and navigation logic shared across all exports
 
 import logging
 import time
-from datetime import datetime
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from .config import ExportConfig
+from .session_cache import SessionCache
+from .wait_conditions import PageWaiter
+from .cdp_events import CdpEventReader, DownloadProgressTracker
+from .request_blocker import RequestBlocker
+from .driver_resolver import ChromeDriverResolver
+from .download_staging import DownloadStaging
+from .excel_reader import ExcelReader
 
 class BackendConnector:
     """Handles backend login and navigation for all export types"""
@@ -25,125 +29,128 @@ class BackendConnector:
         self.login_selectors = ExportConfig.LOGIN_SELECTORS
         self.logger = logging.getLogger(__name__)
         self.driver = None
-        self.wait = None
+        self.waiter = None
+        self.logged_in = False
+        self.session_cache = SessionCache()
+        self.request_blocker = RequestBlocker()
+        self.download_tracker = DownloadProgressTracker()
+        self.download_config = ExportConfig.DOWNLOAD_CONFIG
+        self.cdp_events = None
         
         # Setup directories
         self.download_folder = Path(ExportConfig.DOWNLOADS_FOLDER)
         self.download_folder.mkdir(exist_ok=True)
         
+        # Each download goes to its own run folder so parallel exports cannot collide
+        self.download_staging = DownloadStaging()
+        self.active_download_folder = self.download_folder
+        
+    def set_export_type(self, export_type: str):
+        """Retarget this connector to another export (used when the session is shared)"""
+        self.export_type = export_type
+        self.export_config = ExportConfig.get_export_config(export_type)
+        self.logger.info(f"Connector switched to {self.export_config['name']}")
+        
+        # Re-apply the blocking profile with this export's allowlist
+        if self.driver:
+            self.request_blocker.apply_to_selenium(self.driver, self.export_type)
+
+    def is_session_active(self):
+        """Check that the browser is alive and not sitting on the login page"""
+        if not self.driver or not self.logged_in:
+            return False
+
+        try:
+            return "login" not in self.driver.current_url.lower()
+        except Exception as e:
+            self.logger.warning(f"Browser session is no longer responsive: {str(e)}")
+            return False
+
+    def ensure_logged_in(self):
+        """Start the browser and login only if there is no usable session yet"""
+        if self.is_session_active():
+            self.logger.info("Reusing existing authenticated browser session")
+            return True
+
+        if self.driver:
+            try:
+                # Browser is still responsive - only the login has expired
+                self.driver.current_url
+                self.logger.info("Session expired - logging in again")
+                return self.login_to_backend(use_cache=False)
+            except Exception:
+                self.logger.warning("Browser crashed - restarting shared session")
+                self.cleanup()
+
+        self.setup_browser()
+        return self.login_to_backend()
+
+    def _build_chrome_options(self, chrome_binary=None):
+        """Build Chrome options once for the resolved browser binary"""
+        chrome_options = Options()
+        
+        if self.browser_config["headless"]:
+            chrome_options.add_argument("--headless")
+        
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-plugins")
+        chrome_options.add_argument("--disable-web-security")
+        chrome_options.add_argument("--allow-running-insecure-content")
+        
+        # Download preferences
+        prefs = {
+            "download.default_directory": str(self.download_folder.absolute()),
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "safebrowsing.enabled": True
+        }
+        chrome_options.add_experimental_option("prefs", prefs)
+        CdpEventReader.enable_on_options(chrome_options)
+        
+        if chrome_binary:
+            chrome_options.binary_location = chrome_binary
+            self.logger.info(f"Using browser binary at: {chrome_binary}")
+        
+        return chrome_options
+    
     def setup_browser(self):
-        """Setup Selenium WebDriver with robust Chrome detection"""
+        """Setup Selenium WebDriver from the cached Chrome/ChromeDriver resolution"""
         self.logger.info(f"Setting up browser for {self.export_config['name']}...")
         
         try:
-            # Setup Chrome options
-            chrome_options = Options()
-            
-            if self.browser_config["headless"]:
-                chrome_options.add_argument("--headless")
-            
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--disable-plugins")
-            chrome_options.add_argument("--disable-web-security")
-            chrome_options.add_argument("--allow-running-insecure-content")
-            
-            # Download preferences
-            prefs = {
-                "download.default_directory": str(self.download_folder.absolute()),
-                "download.prompt_for_download": False,
-                "download.directory_upgrade": True,
-                "safebrowsing.enabled": True
-            }
-            chrome_options.add_experimental_option("prefs", prefs)
-            
-            # For cloud deployment, try to find Chrome/Chromium binary
-            import os
-            chrome_paths = [
-                "/usr/bin/google-chrome-stable",
-                "/usr/bin/google-chrome", 
-                "/usr/bin/chromium-browser",
-                "/usr/bin/chromium",
-                "/snap/bin/chromium",  # Snap-installed Chromium
-                "/var/lib/snapd/snap/bin/chromium"  # Alternative snap path
-            ]
+            resolver = ChromeDriverResolver()
+            resolution = resolver.resolve()
             
-            chrome_found = False
-            for chrome_path in chrome_paths:
-                if os.path.exists(chrome_path):
-                    chrome_options.binary_location = chrome_path
-                    self.logger.info(f"Using browser binary at: {chrome_path}")
-                    chrome_found = True
-                    break
-            
-            if not chrome_found:
-                self.logger.warning("No Chrome/Chromium binary found, using system default")
-            
-            # Use ChromeDriverManager with enhanced error handling
-            driver_initialized = False
-            
-            # Strategy 1: Try with detected browser binary
-            if chrome_found:
+            try:
+                self.driver = self._start_driver(resolution)
+            except Exception as e:
+                # Cached driver may be stale (e.g. Chrome upgraded in place) - resolve again once
+                self.logger.warning(f"WebDriver start failed with cached resolution: {str(e)}")
+                resolver.invalidate()
+                resolution = resolver.resolve(force_refresh=True)
                 try:
-                    self.logger.info("Attempting ChromeDriver setup with detected browser binary...")
-                    service = Service(ChromeDriverManager().install())
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                    driver_initialized = True
-                    self.logger.info("Chrome WebDriver initialized successfully with binary location")
-                except Exception as e:
-                    self.logger.warning(f"Failed with binary location: {str(e)}")
+                    self.driver = self._start_driver(resolution)
+                except Exception as retry_error:
+                    raise RuntimeError(f"Unable to initialize Chrome WebDriver. Browser installation may have failed. Last error: {str(retry_error)}")
             
-            # Strategy 2: Try without explicit binary location (system PATH)
-            if not driver_initialized:
-                try:
-                    self.logger.info("Attempting ChromeDriver setup without explicit binary...")
-                    chrome_options_system = Options()
-                    
-                    # Re-add all options without binary location
-                    if self.browser_config["headless"]:
-                        chrome_options_system.add_argument("--headless")
-                    
-                    chrome_options_system.add_argument("--no-sandbox")
-                    chrome_options_system.add_argument("--disable-dev-shm-usage")
-                    chrome_options_system.add_argument("--disable-gpu")
-                    chrome_options_system.add_argument("--window-size=1920,1080")
-                    chrome_options_system.add_argument("--disable-extensions")
-                    chrome_options_system.add_argument("--disable-plugins")
-                    chrome_options_system.add_argument("--disable-web-security")
-                    chrome_options_system.add_argument("--allow-running-insecure-content")
-                    chrome_options_system.add_experimental_option("prefs", prefs)
-                    
-                    service = Service(ChromeDriverManager().install())
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options_system)
-                    driver_initialized = True
-                    self.logger.info("Chrome WebDriver initialized successfully without binary location")
-                except Exception as e:
-                    self.logger.warning(f"Failed without binary location: {str(e)}")
+            self.logger.info("Chrome WebDriver initialized successfully")
             
-            # Strategy 3: Try with specific Chrome versions and manual ChromeDriver
-            if not driver_initialized:
-                try:
-                    self.logger.info("Attempting manual ChromeDriver setup...")
-                    # Try to use ChromeDriver that might be pre-installed
-                    service = Service()  # Use system ChromeDriver if available
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options_system)
-                    driver_initialized = True
-                    self.logger.info("Chrome WebDriver initialized with system ChromeDriver")
-                except Exception as e:
-                    self.logger.error(f"All Chrome WebDriver strategies failed: {str(e)}")
-                    raise RuntimeError(f"Unable to initialize Chrome WebDriver. Browser installation may have failed. Last error: {str(e)}")
+            # Explicit named waits replace the global implicit wait and fixed sleeps
+            self.waiter = PageWaiter(self.driver)
+            self.driver.implicitly_wait(0)
             
-            if not driver_initialized:
-                raise RuntimeError("Chrome WebDriver could not be initialized after all attempts")
+            # Block images, fonts, CSS and trackers; collect savings from CDP network events
+            self.cdp_events = CdpEventReader(self.driver)
+            self.cdp_events.subscribe(self.request_blocker.handle_cdp_event)
+            self.request_blocker.apply_to_selenium(self.driver, self.export_type)
             
-            # Setup wait
-            self.wait = WebDriverWait(self.driver, self.browser_config["timeout"] // 1000)
-            
-            # Set implicit wait
-            self.driver.implicitly_wait(10)
+            # Report download progress as CDP events instead of polling the folder
+            self.cdp_events.subscribe(self.download_tracker.handle_cdp_event)
+            self._enable_download_events()
             
             self.logger.info("Browser setup completed")
             
@@ -151,17 +158,57 @@ class BackendConnector:
             self.logger.error(f"Browser setup failed: {str(e)}")
             raise
     
-    def login_to_backend(self):
-        """Login to backend website"""
+    def _start_driver(self, resolution):
+        """Single webdriver.Chrome construction"""
+        chrome_options = self._build_chrome_options(resolution["chrome_binary"])
+        service = Service(resolution["driver_path"]) if resolution["driver_path"] else Service()
+        return webdriver.Chrome(service=service, options=chrome_options)
+    
+    def _enable_download_events(self, folder: Path = None):
+        """Ask Chrome to download into folder and emit Browser.downloadWillBegin/downloadProgress"""
+        folder = folder or self.download_folder
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": str(folder.absolute()),
+                "eventsEnabled": True
+            })
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not enable CDP download events - folder polling will be used: {str(e)}")
+            return False
+    
+    def _restore_cached_session(self):
+        """Inject cookies from the previous run if a probe request confirms they are still valid"""
+        storage_state = self.session_cache.load_valid()
+        if not storage_state:
+            return False
+        
+        try:
+            # CDP sets cookies without first loading a page on the backend domain
+            self.driver.execute_cdp_cmd("Network.setCookies", {
+                "cookies": SessionCache.storage_to_cdp_cookies(storage_state)
+            })
+            self.logged_in = True
+            self.logger.info("Login skipped - restored cached session")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not restore cached session: {str(e)}")
+            return False
+    
+    def login_to_backend(self, use_cache=True):
+        """Login to backend website, reusing the cached session when it is still valid"""
+        if use_cache and self._restore_cached_session():
+            return True
+        
         self.logger.info("Logging in to backend...")
         
         try:
             # Navigate to login page
             self.driver.get(ExportConfig.BACKEND_BASE_URL)
-            time.sleep(3)  # Wait for page to load
             
-            # Fill login form
-            username_field = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.login_selectors["username"])))
+            # Fill login form as soon as it is interactive
+            username_field = self.waiter.login_form_ready(self.login_selectors["username"])
             username_field.clear()
             username_field.send_keys(ExportConfig.USERNAME)
             
@@ -173,13 +220,11 @@ class BackendConnector:
             login_button = self.driver.find_element(By.CSS_SELECTOR, self.login_selectors["submit"])
             login_button.click()
             
-            # Wait for page to load after login
-            time.sleep(5)
-            
-            # Verify login success
-            current_url = self.driver.current_url
-            if "login" not in current_url.lower():
+            # Wait for the post-login redirect instead of a fixed delay
+            if self.waiter.login_redirect_complete():
+                self.logged_in = True
                 self.logger.info("Login successful!")
+                self.session_cache.save_cookies(self.driver.get_cookies())
                 return True
             else:
                 raise Exception("Login failed - still on login page")
@@ -196,7 +241,28 @@ class BackendConnector:
         try:
             # Navigate to export page
             self.driver.get(self.export_config["url"])
-            time.sleep(3)  # Wait for page to load
+            self.waiter.document_ready()
+            
+            # Redirected to the login page means the shared session has expired
+            if "login" in self.driver.current_url.lower():
+                self.logger.warning("Session expired during navigation - re-logging in")
+                self.logged_in = False
+                self.session_cache.clear()
+                self.login_to_backend(use_cache=False)
+                self.driver.get(self.export_config["url"])
+                self.waiter.document_ready()
+            
+            # Export page is ready once its date inputs accept input
+            date_selectors = [
+                selector for key, selector in self.export_config["selectors"].items()
+                if key in ("start_date", "end_date") and selector
+            ]
+            if self.export_config["requires_date_filter"] and date_selectors:
+                self.waiter.date_inputs_interactive(date_selectors)
+            
+            # Drain CDP network events so the performance log buffer stays small
+            if self.cdp_events:
+                self.cdp_events.poll()
             
             self.logger.info(f"Successfully navigated to {self.export_config['name']} page")
             
@@ -209,9 +275,14 @@ class BackendConnector:
         """Download export file from current page with enhanced validation"""
         self.logger.info(f"ENHANCED DOWNLOAD: {self.export_config['name']} for dates {start_date} to {end_date}")
         
+        run_folder = None
         try:
-            # Clear download folder first to avoid confusion
-            self._clear_download_folder()
+            # Download into a fresh run folder instead of clearing the shared one
+            run_folder = self.download_staging.create_run_folder(self.export_type)
+            if self._enable_download_events(run_folder):
+                self.active_download_folder = run_folder
+            else:
+                self.logger.warning("Per-export download folder unavailable - using shared downloads folder")
             
             # Handle date filtering if required
             if self.export_config["requires_date_filter"] and start_date and end_date:
@@ -221,7 +292,12 @@ class BackendConnector:
             self.driver.save_screenshot(f"before_download_{self.export_type}.png")
             
             # Get initial file count
-            initial_files = list(self.download_folder.glob("*.xlsx"))
+            initial_files = list(self.active_download_folder.glob("*.xlsx"))
+            
+            # Drop download events from earlier exports in this session
+            if self.cdp_events:
+                self.cdp_events.poll()
+            self.download_tracker.reset()
             
             # Try export button selectors from config first, then fallbacks
             config_selector = self.export_config["selectors"].get("export_button")
@@ -247,6 +323,13 @@ class BackendConnector:
                 '.btn-primary'
             ])
             
+            # Wait for the configured button to become clickable before probing selectors
+            if config_selector:
+                try:
+                    self.waiter.export_button_enabled((By.CSS_SELECTOR, config_selector))
+                except Exception:
+                    self.logger.warning(f"Configured export button '{config_selector}' not clickable - trying fallbacks")
+            
             export_clicked = False
             clicked_selector = None
             
@@ -280,10 +363,9 @@ class BackendConnector:
                     
                     # Scroll to element and ensure it's clickable
                     self.driver.execute_script("arguments[0].scrollIntoView();", element)
-                    time.sleep(1)
-                    
-                    # Check if element is actually clickable
-                    if not element.is_enabled():
+                    try:
+                        self.waiter.export_button_enabled(element)
+                    except Exception:
                         self.logger.warning(f"Element with selector {selector} is not enabled/clickable")
                         continue
                     
@@ -293,9 +375,6 @@ class BackendConnector:
                         export_clicked = True
                         clicked_selector = selector
                         self.logger.info(f"Successfully clicked export button: {selector}")
-                        
-                        # Give the system time to process the export request
-                        time.sleep(3)
                         break
                         
                     except Exception as click_error:
@@ -306,9 +385,6 @@ class BackendConnector:
                             export_clicked = True
                             clicked_selector = selector
                             self.logger.info(f"Successfully clicked export button using JavaScript: {selector}")
-                            
-                            # Give the system time to process the export request
-                            time.sleep(3)
                             break
                             
                         except Exception as js_click_error:
@@ -337,7 +413,7 @@ class BackendConnector:
             self.logger.info(f"Export initiated using selector: {clicked_selector}")
             
             # Enhanced download detection with longer wait and better validation
-            downloaded_file = self._wait_for_download_completion_enhanced(initial_files)
+            downloaded_file = self._wait_for_download_cdp(initial_files)
             
             # Comprehensive file validation
             file_size = downloaded_file.stat().st_size
@@ -354,24 +430,18 @@ class BackendConnector:
                 
                 # Try to read the file to check content
                 try:
-                    import pandas as pd
-                    test_df = pd.read_excel(downloaded_file)
-                    if len(test_df) == 0:
+                    row_count = ExcelReader().count_rows(downloaded_file)
+                    if row_count == 0:
                         self.logger.warning(f"File contains headers but no data rows - this may be expected for date {start_date}")
                     else:
-                        self.logger.info(f"File validation: {len(test_df)} data rows found")
+                        self.logger.info(f"File validation: {row_count} data rows found")
                 except Exception as read_error:
                     self.logger.error(f"Could not validate file content: {read_error}")
             
             self.logger.info(f"Download completed - File size: {file_size} bytes")
             
-            # Generate new filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            new_filename = f"{self.export_config['file_prefix']}_{timestamp}.xlsx"
-            new_file_path = self.download_folder / new_filename
-            
-            # Rename file
-            downloaded_file.rename(new_file_path)
+            # Atomic move to a deterministic name: {file_prefix}_{start}_{end}.xlsx
+            new_file_path = self.download_staging.finalize(downloaded_file, self.export_config, start_date, end_date)
             
             self.logger.info(f"File downloaded successfully: {new_file_path} ({file_size} bytes)")
             return new_file_path
@@ -380,15 +450,11 @@ class BackendConnector:
             self.logger.error(f"Download failed: {str(e)}")
             self.driver.save_screenshot(f"download_error_{self.export_type}.png")
             raise
-    
-    def _clear_download_folder(self):
-        """Clear download folder of any existing Excel files"""
-        try:
-            for file_path in self.download_folder.glob("*.xlsx"):
-                file_path.unlink()
-                self.logger.info(f"Cleared existing file: {file_path.name}")
-        except Exception as e:
-            self.logger.warning(f"Could not clear download folder: {str(e)}")
+        
+        finally:
+            if run_folder:
+                self.download_staging.discard_run_folder(run_folder)
+            self.active_download_folder = self.download_folder
     
     def _validate_and_format_date(self, date_input):
         """Validate and format date input to YYYY-MM-DD"""
@@ -436,9 +502,7 @@ class BackendConnector:
             
             # Method 1: Clear and send keys
             field_element.clear()
-            time.sleep(0.2)
             field_element.send_keys(date_value)
-            time.sleep(0.2)
             
             # Method 2: JavaScript value setting with comprehensive events
             self.driver.execute_script("""
@@ -454,8 +518,8 @@ class BackendConnector:
                 console.log('Date field value after setting:', arguments[0].value);
             """, field_element, date_value)
             
-            # Give time for any JavaScript validation/processing
-            time.sleep(1)
+            # Wait until JavaScript validation/processing has applied the value
+            self.waiter.date_value_applied(field_element, date_value)
             
             # Verify the value was set correctly with multiple checks
             for attempt in range(3):
@@ -471,7 +535,7 @@ class BackendConnector:
                 else:
                     # Try force setting again
                     self.driver.execute_script("arguments[0].value = arguments[1];", field_element, date_value)
-                    time.sleep(0.5)
+                    self.waiter.date_value_applied(field_element, date_value)
             
             # Final verification
             final_value = field_element.get_attribute('value')
@@ -483,75 +547,65 @@ class BackendConnector:
             self.logger.error(f"Failed to set {field_type} date field: {str(e)}")
             raise
     
-    def _wait_for_download_completion_enhanced(self, initial_files):
-        """Enhanced download completion detection with comprehensive validation"""
-        self.logger.info("ENHANCED DOWNLOAD DETECTION: Waiting for file completion...")
-        timeout = 90  # Extended timeout for slow networks
+    def _finished_download(self, initial_files):
+        """Newest new .xlsx in this run's download folder, once Chrome has no partial download left
+
+        Chrome writes to a .crdownload file and renames it only when the download completed,
+        so a new .xlsx next to no .crdownload is a finished download.
+        """
+        if any(self.active_download_folder.glob("*.crdownload")):
+            return None
+        new_files = [f for f in self.active_download_folder.glob("*.xlsx") if f not in initial_files]
+        if not new_files:
+            return None
+        return max(new_files, key=lambda f: f.stat().st_mtime)
+    
+    def _wait_for_download_cdp(self, initial_files):
+        """Return as soon as the download completed - from CDP download events or the run's folder
+
+        ChromeDriver's performance log only carries Network/Page events, so Browser.download*
+        events often never arrive; the folder is checked on every poll instead of after a grace period.
+        """
+        self.logger.info("DOWNLOAD DETECTION: Waiting for download events / completed file...")
+        timeout = self.download_config["timeout"]
         start_time = time.time()
-        
-        downloaded_file = None
-        check_interval = 2  # Check every 2 seconds
+        last_logged_bytes = -1
         
         while time.time() - start_time < timeout:
-            current_files = list(self.download_folder.glob("*.xlsx"))
-            
-            # Check for new files
-            new_files = [f for f in current_files if f not in initial_files]
-            if new_files:
-                # Found new file(s), get the most recent
-                newest_file = max(new_files, key=lambda x: x.stat().st_mtime)
-                file_size = newest_file.stat().st_size
+            download = None
+            if self.cdp_events:
+                self.cdp_events.poll()
+                download = self.download_tracker.latest()
+            
+            if download is not None:
+                if download["state"] == "completed" and download.get("filename"):
+                    file_path = self.active_download_folder / download["filename"]
+                    if file_path.exists():
+                        elapsed = time.time() - start_time
+                        self.logger.info(f"CDP DOWNLOAD: {file_path.name} completed ({download['received_bytes']} bytes) in {elapsed:.2f}s")
+                        return file_path
                 
-                self.logger.info(f"DETECTION: Found file {newest_file.name}, size: {file_size} bytes")
+                elif download["state"] == "canceled":
+                    raise Exception(f"Download was canceled by the browser: {download.get('filename')}")
                 
-                # Enhanced stability check - wait for file to stop growing
-                stable_checks = 6  # Check stability for 12 seconds (6 * 2s intervals)
-                stable_count = 0
-                last_size = -1
-                
-                for stability_check in range(stable_checks):
-                    time.sleep(check_interval)
-                    current_size = newest_file.stat().st_size
-                    
-                    self.logger.info(f"Stability check {stability_check + 1}/{stable_checks}: size {current_size} bytes")
-                    
-                    if current_size == last_size and current_size > 0:
-                        stable_count += 1
-                        if stable_count >= 3:  # File stable for 3 consecutive checks (6 seconds)
-                            self.logger.info(f"STABLE: File {newest_file.name} stable at {current_size} bytes")
-                            downloaded_file = newest_file
-                            break
-                    else:
-                        stable_count = 0
-                        if current_size > last_size:
-                            self.logger.info(f"GROWING: File size increased from {last_size} to {current_size}")
-                    
-                    last_size = current_size
-                
-                if downloaded_file:
-                    break
-                else:
-                    self.logger.warning(f"File {newest_file.name} did not stabilize, continuing to wait...")
-            
-            time.sleep(check_interval)
-        
-        if not downloaded_file:
-            # Enhanced error reporting
-            final_files = list(self.download_folder.glob("*.xlsx"))
-            self.logger.error(f"TIMEOUT: No stable download found after {timeout} seconds")
-            self.logger.error(f"Initial files: {[f.name for f in initial_files]}")
-            self.logger.error(f"Final files: {[f.name for f in final_files]}")
-            
-            # Check if any files were created but not stable
-            if final_files:
-                for f in final_files:
-                    if f not in initial_files:
-                        size = f.stat().st_size
-                        self.logger.error(f"Unstable file found: {f.name} ({size} bytes)")
-            
-            raise Exception(f"Download timeout after {timeout} seconds - no stable file found")
+                elif download["received_bytes"] != last_logged_bytes:
+                    # Byte-level progress for large exports
+                    last_logged_bytes = download["received_bytes"]
+                    total = download["total_bytes"]
+                    percent = f" ({last_logged_bytes * 100 // total}%)" if total else ""
+                    self.logger.info(f"CDP DOWNLOAD: {download.get('filename')} {last_logged_bytes}/{total or '?'} bytes{percent}")
+            
+            finished = self._finished_download(initial_files)
+            if finished:
+                elapsed = time.time() - start_time
+                self.logger.info(f"DOWNLOAD: {finished.name} completed ({finished.stat().st_size} bytes) in {elapsed:.2f}s")
+                return finished
+            
+            time.sleep(self.download_config["poll_interval"])
         
-        return downloaded_file
+        download = self.download_tracker.latest() or {}
+        self.logger.error(f"TIMEOUT: Download {download.get('filename')} stuck at {download.get('received_bytes', 0)} bytes after {timeout} seconds")
+        raise Exception(f"Download timeout after {timeout} seconds - download did not complete")
     
     def _set_date_filters_enhanced(self, start_date, end_date):
         """Enhanced date filter setting with validation and debugging"""
@@ -587,8 +641,7 @@ class BackendConnector:
             # Take screenshot after setting dates
             self.driver.save_screenshot(f"after_date_set_{self.export_type}.png")
             
-            # Wait for any dynamic content to load
-            time.sleep(2)
+            # Dynamic content readiness is covered by the export button wait in download_export_file
             
         except Exception as e:
             self.logger.error(f"Enhanced date filter setup failed: {str(e)}")
@@ -662,8 +715,8 @@ class BackendConnector:
                 arguments[0].dispatchEvent(new Event('blur', { bubbles: true }));
             """, field_element, date_value)
             
-            # Give time for any JavaScript validation
-            time.sleep(0.5)
+            # Wait for any JavaScript validation to apply the value
+            self.waiter.date_value_applied(field_element, date_value)
             
             # Verify the value was set correctly
             actual_value = field_element.get_attribute('value')
@@ -681,11 +734,21 @@ class BackendConnector:
     def cleanup(self):
         """Clean up browser resources"""
         try:
+            if self.waiter:
+                self.waiter.log_summary()
+            if self.cdp_events:
+                self.cdp_events.poll()
+                self.request_blocker.log_report()
             if self.driver:
                 self.driver.quit()
             self.logger.info("Browser cleanup completed")
         except Exception as e:
             self.logger.warning(f"Cleanup warning: {str(e)}")
+        finally:
+            self.driver = None
+            self.waiter = None
+            self.cdp_events = None
+            self.logged_in = False
 
     def cleanup_old_files(self, days_to_keep=None):
         """Clean up old downloaded files"""
@@ -0,0 +1,84 @@
+"""
+Checkpoints for historical backfills
+Every date window records how far it got (downloaded / parsed / uploaded) so a crashed backfill resumes where it stopped
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import ExportConfig
+from .run_state import RunStateStore
+
+class BackfillCheckpoint:
+    """JSON checkpoint of {export_type: {window: {stage, file, content_hash, records, error, updated_at}}}"""
+
+    STAGES = ("downloaded", "parsed", "uploaded")
+
+    def __init__(self, start_date: str, end_date: str, window_days: int, config: Dict = None):
+        self.config = config or ExportConfig.BACKFILL_CONFIG
+        self.logger = logging.getLogger(__name__)
+        # One file per range and window size - rerunning the same command resumes it
+        self.path = Path(self.config["folder"]) / f"backfill_{start_date}_{end_date}_{window_days}d.json"
+        self.state = self._load()
+        self.state.setdefault("created_at", datetime.now().isoformat())
+        self.state.setdefault("exports", {})
+
+    def _load(self) -> Dict:
+        try:
+            if self.path.exists():
+                return json.loads(self.path.read_text())
+        except Exception as e:
+            self.logger.warning(f"Could not read backfill checkpoint {self.path}: {str(e)} - starting fresh")
+        return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(self.state, indent=2))
+        os.replace(temp_file, self.path)
+
+    def reset(self):
+        """Forget all progress (backfill --restart)"""
+        self.state = {"created_at": datetime.now().isoformat(), "exports": {}}
+        self._save()
+
+    def get(self, export_type: str, start_date: str, end_date: str) -> Dict:
+        """Checkpoint entry for a window ({} when never started)"""
+        return self.state["exports"].get(export_type, {}).get(RunStateStore.window_key(start_date, end_date), {})
+
+    def is_uploaded(self, export_type: str, start_date: str, end_date: str) -> bool:
+        return self.get(export_type, start_date, end_date).get("stage") == "uploaded"
+
+    def reusable_file(self, export_type: str, start_date: str, end_date: str) -> Optional[Path]:
+        """Download kept from an interrupted attempt, if it is still on disk"""
+        entry = self.get(export_type, start_date, end_date)
+        if entry.get("stage") in ("downloaded", "parsed") and entry.get("file"):
+            file_path = Path(entry["file"])
+            if file_path.exists():
+                return file_path
+        return None
+
+    def mark(self, export_type: str, start_date: str, end_date: str, stage: str, **details):
+        """Record that a window reached stage (written to disk immediately)"""
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown backfill stage: {stage}")
+
+        windows = self.state["exports"].setdefault(export_type, {})
+        entry = windows.setdefault(RunStateStore.window_key(start_date, end_date), {})
+        entry.update(details)
+        entry["stage"] = stage
+        entry.pop("error", None)
+        entry["updated_at"] = datetime.now().isoformat()
+        self._save()
+
+    def mark_failed(self, export_type: str, start_date: str, end_date: str, error: str):
+        """Keep the last reached stage and remember why the window failed"""
+        windows = self.state["exports"].setdefault(export_type, {})
+        entry = windows.setdefault(RunStateStore.window_key(start_date, end_date), {})
+        entry["error"] = error
+        entry["updated_at"] = datetime.now().isoformat()
+        self._save()
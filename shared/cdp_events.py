@@ -0,0 +1,91 @@
+"""
+Chrome DevTools event reader for Selenium
+Drains the performance log once and dispatches CDP events to every subscriber
+"""
+
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+
+class CdpEventReader:
+    """Reads CDP events from Chrome's performance log (requires goog:loggingPrefs performance=ALL)"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.subscribers: List[Callable[[str, Dict], None]] = []
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def enable_on_options(chrome_options):
+        """Turn on performance logging so CDP events become readable"""
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    def subscribe(self, callback: Callable[[str, Dict], None]):
+        """Register callback(method, params) for every CDP event"""
+        self.subscribers.append(callback)
+
+    def poll(self) -> int:
+        """Drain pending events and dispatch them; returns number of events read"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            self.logger.debug(f"Performance log unavailable: {str(e)}")
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get("method", "")
+            params = message.get("params", {})
+            for callback in self.subscribers:
+                try:
+                    callback(method, params)
+                except Exception as e:
+                    self.logger.warning(f"CDP event subscriber failed on {method}: {str(e)}")
+
+        return len(entries)
+
+class DownloadProgressTracker:
+    """Follows downloads through CDP downloadWillBegin/downloadProgress events
+
+    Progress reporting only: the performance log records Network/Page events, so Browser.*
+    download events may never arrive - completion is also detected from the download folder.
+    """
+
+    # Chrome emits the Browser.* variants when eventsEnabled is set, older builds the Page.* ones
+    BEGIN_EVENTS = ("Browser.downloadWillBegin", "Page.downloadWillBegin")
+    PROGRESS_EVENTS = ("Browser.downloadProgress", "Page.downloadProgress")
+
+    def __init__(self):
+        self.downloads: Dict[str, Dict] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def reset(self):
+        """Forget downloads from previous exports"""
+        self.downloads = {}
+
+    def handle_cdp_event(self, method: str, params: Dict):
+        """CdpEventReader subscriber"""
+        if method in self.BEGIN_EVENTS:
+            self.downloads[params["guid"]] = {
+                "filename": params.get("suggestedFilename"),
+                "url": params.get("url"),
+                "state": "inProgress",
+                "received_bytes": 0,
+                "total_bytes": 0
+            }
+            self.logger.info(f"CDP DOWNLOAD: started {params.get('suggestedFilename')}")
+        elif method in self.PROGRESS_EVENTS:
+            download = self.downloads.setdefault(params["guid"], {"filename": None, "url": None})
+            download["state"] = params.get("state", "inProgress")
+            download["received_bytes"] = int(params.get("receivedBytes", 0))
+            download["total_bytes"] = int(params.get("totalBytes", 0))
+
+    def latest(self) -> Optional[Dict]:
+        """Most recently started download, if any"""
+        if not self.downloads:
+            return None
+        return list(self.downloads.values())[-1]
@@ -311,15 +311,27 @@ class ExportConfig:
     BACKEND_BASE_URL = "https://backend.andalanatk.com"
     
     # Export configurations - ALL EXPORTS ENABLED
+    # "schema" declares column dtypes (see shared/export_schema.py); columns missing from a download are ignored
     EXPORTS = {
         "transaksi": {
             "name": "Transaction Export",
             "url": f"{BACKEND_BASE_URL}/transaksi/index-export",
             "google_sheet_url": "https://docs.google.com/spreadsheets/d/1dhLTUzUQ1ug4KPjU0Q8A8x38IioW5ZwKvVEIYHqf7aw",
             "unique_key": "Transaksi ID",
+            "schema": {
+                "Transaksi ID": {"dtype": "string", "nullable": False},
+                "Cabang": {"dtype": "category"},
+                "Status": {"dtype": "category"}
+            },
             "requires_date_filter": True,
             "file_prefix": "export_transaksi",
             "file_type": "excel",
+            "http_export": {
+                "enabled": True,       # Try the direct HTTP form submit before the browser
+                "form_action": None,   # None = discover from the export page form
+                "method": None         # None = use the form's method
+            },
+            "request_allowlist": [],   # URL patterns never blocked on this export page
             "selectors": {
                 "start_date": 'input[name="start_date"]',
                 "end_date": 'input[name="end_date"]',
@@ -334,9 +346,28 @@ class ExportConfig:
             "google_sheet_url": "https://docs.google.com/spreadsheets/d/1sI_89ZVXa7zgxVuCwSLc3Q7eBZtZqOhGVPMjQCJ51wU",
             "unique_key": "Nomor Transaksi QRCODE",  # Legacy fallback
             "composite_key_columns": ["Nomor Transaksi QRCODE", "Cabang", "Checker", "Nama", "Tipe", "Jumlah Total Belanja", "Jumlah", "Tanggal Belanja", "Tanggal Scan", "Status", "Alasan Batal"],
+            "schema": {
+                "Nomor Transaksi QRCODE": {"dtype": "string", "nullable": False},
+                "Cabang": {"dtype": "category"},
+                "Checker": {"dtype": "category"},
+                "Nama": {"dtype": "string"},
+                "Tipe": {"dtype": "category"},
+                "Jumlah Total Belanja": {"dtype": "int"},
+                "Jumlah": {"dtype": "int"},
+                "Tanggal Belanja": {"dtype": "datetime", "format": "%Y-%m-%d %H:%M:%S"},
+                "Tanggal Scan": {"dtype": "datetime", "format": "%Y-%m-%d %H:%M:%S"},
+                "Status": {"dtype": "category"},
+                "Alasan Batal": {"dtype": "category"}
+            },
             "requires_date_filter": True,
             "file_prefix": "export_point_trx",
             "file_type": "excel",
+            "http_export": {
+                "enabled": True,       # Try the direct HTTP form submit before the browser
+                "form_action": None,   # None = discover from the export page form
+                "method": None         # None = use the form's method
+            },
+            "request_allowlist": [],   # URL patterns never blocked on this export page
             "selectors": {
                 "start_date": 'input[name="start"]',
                 "end_date": 'input[name="end"]',
@@ -350,9 +381,19 @@ class ExportConfig:
             "google_sheet_url": "https://docs.google.com/spreadsheets/d/1CLKjcByabVe6-8hTTcP6JtE56WulHIEOPkyHTQ2l0e8",
             "unique_key": "User ID",  # Legacy fallback
             "composite_key_columns": ["#ID/ Nama", "Email"],  # User specified composite key
+            "schema": {
+                "#ID/ Nama": {"dtype": "string", "nullable": False},
+                "Email": {"dtype": "string"}
+            },
             "requires_date_filter": True,
             "file_prefix": "export_user",
             "file_type": "excel",
+            "http_export": {
+                "enabled": True,       # Try the direct HTTP form submit before the browser
+                "form_action": None,   # None = discover from the export page form
+                "method": None         # None = use the form's method
+            },
+            "request_allowlist": [],   # URL patterns never blocked on this export page
             "selectors": {
                 "start_date": 'input[id="filter-start"]',
                 "end_date": 'input[id="filter-end"]',
@@ -368,9 +409,19 @@ class ExportConfig:
             "google_sheet_url": "https://docs.google.com/spreadsheets/d/1KWEMz3R5N1EnlS9NdJS9NiQRUsBuTAIfEoaYpS2NhAk",
             "unique_key": "Payment ID",  # Legacy fallback
             "composite_key_columns": "ALL_EXCEPT_NO",  # Special marker to use all columns except "No"
+            "schema": {
+                "Cabang": {"dtype": "category"},
+                "Status": {"dtype": "category"}
+            },
             "requires_date_filter": True,
             "file_prefix": "export_pembayaran_koin",
             "file_type": "excel",
+            "http_export": {
+                "enabled": True,       # Try the direct HTTP form submit before the browser
+                "form_action": None,   # None = discover from the export page form
+                "method": None         # None = use the form's method
+            },
+            "request_allowlist": [],   # URL patterns never blocked on this export page
             "selectors": {
                 "start_date": 'input[id="filter-start"]',
                 "end_date": 'input[id="filter-end"]',
@@ -407,6 +458,38 @@ class ExportConfig:
         "timeout": 90000    # Default timeout
     }
     
+    # Chrome/ChromeDriver resolution - resolved once and cached on disk per Chrome version
+    CHROME_DRIVER_CONFIG = {
+        "cache_file": "state/chromedriver_cache.json",
+        "offline": os.getenv('CHROMEDRIVER_OFFLINE') == 'true',  # Never contact the network for drivers
+        "chrome_paths": [
+            "/usr/bin/google-chrome-stable",
+            "/usr/bin/google-chrome",
+            "/usr/bin/chromium-browser",
+            "/usr/bin/chromium",
+            "/snap/bin/chromium",  # Snap-installed Chromium
+            "/var/lib/snapd/snap/bin/chromium"  # Alternative snap path
+        ]
+    }
+    
+    # Download detection (CDP download events when Chrome reports them, the run's download folder on every poll)
+    DOWNLOAD_CONFIG = {
+        "timeout": 90,               # Seconds to wait for a completed download
+        "poll_interval": 0.2         # Seconds between CDP event reads / folder checks
+    }
+    
+    # Explicit wait timeouts in seconds, per readiness condition (replaces fixed sleeps)
+    WAIT_TIMEOUTS = {
+        "default": 30,
+        "poll_frequency": 0.1,             # Seconds between condition checks
+        "document_ready": 30,
+        "login_form_ready": 30,
+        "login_redirect_complete": 30,
+        "date_inputs_interactive": 15,
+        "date_value_applied": 3,
+        "export_button_enabled": 15
+    }
+    
     # Development override settings
     DEBUG_BROWSER_CONFIG = {
         "headless": False,  # Show browser for debugging
@@ -435,9 +518,142 @@ class ExportConfig:
     
     # File management
     DOWNLOADS_FOLDER = "downloads"
+    DOWNLOAD_STAGING_FOLDER = ".staging"  # Per-export run folders inside DOWNLOADS_FOLDER
     LOGS_FOLDER = "logs"
+    STATE_FOLDER = "state"  # Persistent state kept between cron runs
     CLEANUP_DAYS = 7
     
+    # Direct HTTP export settings - bypasses the browser once authenticated
+    HTTP_EXPORT_CONFIG = {
+        "enabled": os.getenv('DISABLE_HTTP_EXPORT') != 'true',
+        "pool_size": 4,          # Pooled connections shared by all exports
+        "timeout": 120,          # Seconds per request (export generation can be slow)
+        "max_retries": 2,        # Retries on 502/503/504
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    }
+    
+    # Resource blocking on export pages - only the HTML forms and the xlsx response are needed
+    REQUEST_BLOCKING_CONFIG = {
+        "enabled": os.getenv('DISABLE_REQUEST_BLOCKING') != 'true',
+        "blocked_resource_types": ["image", "font", "stylesheet", "media"],  # Playwright/CDP resource types
+        "block_third_party_scripts": False,  # Backend pages may load jQuery/date pickers from CDNs
+        "blocked_url_patterns": [            # Analytics and trackers (both engines)
+            "*google-analytics.com*",
+            "*googletagmanager.com*",
+            "*doubleclick.net*",
+            "*facebook.net*",
+            "*hotjar.com*"
+        ],
+        "selenium_blocked_url_patterns": [   # CDP cannot block by resource type, so match by extension (and *.ext?*)
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+            "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+            "*.css", "*.mp4", "*.webm"
+        ],
+        "estimated_bytes_per_type": {        # Used to estimate bytes saved by blocked requests
+            "image": 40000,
+            "font": 60000,
+            "stylesheet": 30000,
+            "media": 250000,
+            "script": 50000,
+            "other": 10000
+        }
+    }
+    
+    # Concurrent export settings (Playwright single session engine)
+    CONCURRENCY_CONFIG = {
+        "max_concurrent_exports": int(os.getenv('MAX_CONCURRENT_EXPORTS', '4'))  # Pages exporting at the same time
+    }
+    
+    # Date-range splitting - multi-day ranges are fetched as N-day windows in parallel and merged before upload
+    WINDOWED_EXPORT_CONFIG = {
+        "enabled": os.getenv('SPLIT_DATE_RANGES') == 'true',
+        "window_days": int(os.getenv('EXPORT_WINDOW_DAYS', '1')),
+        "max_concurrent_windows": int(os.getenv('MAX_CONCURRENT_WINDOWS', '4')),
+        "window_retries": 2,   # Extra attempts per window before it counts as failed
+        "retry_delay": 5       # Seconds, multiplied by the attempt number
+    }
+    
+    # xlsx reader engine: auto (calamine if installed, else openpyxl_streaming), calamine, openpyxl_streaming, pandas
+    EXCEL_READER_CONFIG = {
+        "engine": os.getenv('EXCEL_READER_ENGINE', 'auto')
+    }
+    
+    # Parsed exports cached as Parquet next to the downloads (needs pyarrow)
+    PARSED_CACHE_CONFIG = {
+        "enabled": os.getenv('DISABLE_PARSED_CACHE') != 'true',
+        "folder": ".parsed",           # Inside DOWNLOADS_FOLDER
+        "max_age_days": CLEANUP_DAYS,  # Same retention as the raw downloads
+        "max_size_mb": 500
+    }
+    
+    # Streaming upload - bounded memory for large ranges (chunked read, key-set dedupe, chunked append)
+    STREAMING_UPLOAD_CONFIG = {
+        "enabled": os.getenv('STREAMING_UPLOAD') == 'true',
+        "auto_above_mb": 20,       # Larger downloads always stream
+        "chunk_rows": 5000,        # Export rows parsed and appended per chunk
+        "sheet_page_rows": 10000   # Existing sheet rows read per API call
+    }
+    
+    # In-memory capture - export bytes go straight to the parser, the disk copy is written in the background
+    IN_MEMORY_CAPTURE_CONFIG = {
+        "enabled": os.getenv('IN_MEMORY_CAPTURE') == 'true',
+        "persist_to_disk": os.getenv('PERSIST_DOWNLOADS') != 'false'  # Keep a copy in downloads/ for debugging/replay
+    }
+    
+    # Persisted login state - lets a run skip the login form when the last session is still valid
+    SESSION_CACHE_CONFIG = {
+        "enabled": os.getenv('DISABLE_SESSION_CACHE') != 'true',
+        "file": "state/session_state.json",
+        "encryption_key": os.getenv('SESSION_CACHE_KEY'),  # Fernet key - encrypts the cache at rest when set
+        "max_age_hours": 24,                               # Never reuse state older than this
+        "probe_url": f"{BACKEND_BASE_URL}/transaksi/index-export",  # Authenticated page used as a cheap probe
+        "probe_timeout": 15                                # Seconds
+    }
+    
+    # Last uploaded content per export/date window - identical downloads skip parse, validation and upload
+    RUN_STATE_CONFIG = {
+        "enabled": os.getenv('DISABLE_RUN_STATE') != 'true',
+        "file": "state/run_state.json",
+        "max_windows_per_export": 200   # Oldest windows are forgotten beyond this
+    }
+    
+    # Historical backfill - per-window checkpoints so an interrupted backfill resumes where it stopped
+    BACKFILL_CONFIG = {
+        "folder": "state/backfill",
+        "window_days": int(os.getenv('BACKFILL_WINDOW_DAYS', '1'))
+    }
+    
+    # Duplicate detection - fingerprint mode keeps existing keys as sorted uint64 hashes instead of a set of strings
+    DEDUP_CONFIG = {
+        "fingerprint_keys": os.getenv('FINGERPRINT_KEYS') == 'true',
+        "fingerprint_slice_rows": 50000   # Key strings built (then hashed and dropped) this many rows at a time
+    }
+    
+    # Local key index per destination sheet - uploads dedupe against SQLite instead of reading the whole sheet
+    SHEET_KEY_INDEX_CONFIG = {
+        "enabled": os.getenv('DISABLE_SHEET_KEY_INDEX') != 'true',
+        "folder": "state/key_index",
+        "reconcile_hours": int(os.getenv('KEY_INDEX_RECONCILE_HOURS', '24')),  # Full sheet read at least this often
+        "probe_sample_rows": 20,  # Random indexed rows compared with the sheet before the index is trusted
+        "read_back_ranges": 200   # Updated row ranges read back per batch_get (ranges go in the request URL)
+    }
+    
+    # In-place updates of changed rows - all changed ranges go out in values.batchUpdate calls of bounded size
+    ROW_UPDATE_CONFIG = {
+        "enabled": os.getenv('DISABLE_ROW_UPDATES') != 'true',
+        "max_payload_kb": int(os.getenv('ROW_UPDATE_MAX_PAYLOAD_KB', '2048')),  # Request body per batchUpdate call
+        "max_ranges": 1000        # Ranges per batchUpdate call
+    }
+    
+    # Raw download archive - content-addressed, compressed copies indexed by export, date window and run (for --replay)
+    RAW_ARCHIVE_CONFIG = {
+        "enabled": os.getenv('DISABLE_RAW_ARCHIVE') != 'true',
+        "folder": "state/archive",
+        "compression": os.getenv('RAW_ARCHIVE_COMPRESSION', 'zstd'),  # zstd (needs zstandard) or gzip
+        "zstd_level": 3,         # Cheap level - xlsx is already zip-compressed, higher levels gain little
+        "max_size_mb": int(os.getenv('RAW_ARCHIVE_MAX_MB', '2000'))     # Oldest blobs are deleted beyond this
+    }
+    
     # Selectors (common across exports)
     LOGIN_SELECTORS = {
         "username": '[name="email"]',
@@ -1,14 +1,71 @@
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Tuple, Any
+import math
+from typing import Callable, Dict, List, Tuple, Any
+
+from .config import ExportConfig
+
+class KeyFingerprintIndex:
+    """Existing keys as sorted 64-bit fingerprints instead of a set of key strings
+
+    A fingerprint match is confirmed against the full key, fetched through
+    key_lookup(existing row positions) only for the rows that matched.
+    """
+
+    def __init__(self, fingerprints: np.ndarray, key_lookup: Callable[[np.ndarray], np.ndarray]):
+        self.order = np.argsort(fingerprints, kind="stable")
+        self.fingerprints = fingerprints[self.order]
+        self.key_lookup = key_lookup
+        self.collisions = 0
+        self.logger = logging.getLogger(__name__)
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    @property
+    def nbytes(self) -> int:
+        return self.fingerprints.nbytes + self.order.nbytes
+
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        """Boolean mask of keys present in the index"""
+        keys = np.asarray(keys, dtype=object)
+        fingerprints = DataValidator.key_fingerprints(keys)
+        left = np.searchsorted(self.fingerprints, fingerprints, side="left")
+        right = np.searchsorted(self.fingerprints, fingerprints, side="right")
+
+        found = np.zeros(len(keys), dtype=bool)
+        candidates = np.flatnonzero(right > left)
+        if candidates.size == 0:
+            return found
+
+        # Usually the first row with the same fingerprint holds the same key
+        same = self.key_lookup(self.order[left[candidates]]) == keys[candidates]
+        found[candidates[same]] = True
+
+        # Otherwise a later row with that fingerprint may (sheet duplicates), or it is a real collision
+        for position in candidates[~same]:
+            others = self.order[left[position] + 1:right[position]]
+            if others.size and (self.key_lookup(others) == keys[position]).any():
+                found[position] = True
+            else:
+                self.collisions += 1
+                self.logger.warning(f"Key fingerprint collision resolved by full key comparison: {keys[position]}")
+        return found
 
 class DataValidator:
     """Smart data validation and management for Google Sheets automation"""
 
-    def __init__(self, unique_key: str = "Transaksi ID", composite_key_columns: List[str] = None):
+    # Spellings of booleans in uploads (str(True)) and in the sheet (TRUE) - digests treat them alike
+    BOOLEAN_TEXTS = ("TRUE", "FALSE", "True", "False", "true", "false")
+
+    def __init__(self, unique_key: str = "Transaksi ID", composite_key_columns: List[str] = None,
+                 fingerprint_keys: bool = None):
         self.unique_key = unique_key
         self.composite_key_columns = composite_key_columns
         self.use_composite_key = composite_key_columns is not None
+        # Duplicate detection against fingerprints instead of a set of key strings (DEDUP_CONFIG)
+        self.fingerprint_keys = ExportConfig.DEDUP_CONFIG["fingerprint_keys"] if fingerprint_keys is None else fingerprint_keys
         self.logger = logging.getLogger(__name__)
 
     def create_composite_key(self, df: pd.DataFrame) -> pd.Series:
@@ -35,19 +92,133 @@ class DataValidator:
 
         self.logger.info(f"Creating composite keys from columns: {available_columns}")
 
-        composite_keys = []
-        for _, row in df.iterrows():
-            # Concatenate all specified columns with null-safe handling
-            key_parts = []
-            for col in available_columns:
-                value = str(row[col]) if pd.notna(row[col]) and row[col] != '' else 'NULL'
-                key_parts.append(value)
-
-            composite_key = "||".join(key_parts)  # Use || as separator to avoid conflicts
-            composite_keys.append(composite_key)
+        row_dtype = self._row_dtype(df)
+        key_parts = [self._key_part(self._row_values(df[col], row_dtype)) for col in available_columns]
 
+        # Use || as separator to avoid conflicts
+        composite_keys = ["||".join(parts) for parts in zip(*key_parts)]
         return pd.Series(composite_keys, index=df.index)
 
+    @staticmethod
+    def _row_dtype(df: pd.DataFrame) -> np.dtype:
+        """Common dtype a row of df has (what iterrows() / df.iloc[i] return)"""
+        return df.iloc[:0].to_numpy().dtype
+
+    @staticmethod
+    def _row_values(values: pd.Series, row_dtype: np.dtype) -> pd.Series:
+        """A column as seen through rows - int columns next to float columns became floats ("5.0")"""
+        if row_dtype != object and values.dtype != row_dtype:
+            return values.astype(row_dtype)
+        return values
+
+    @staticmethod
+    def _cell_strings(values: pd.Series) -> list:
+        """str() of every cell in one column"""
+        # Nullable extension dtypes (Int64, boolean, ...) take the object path
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "iufb":
+            return list(map(str, values.to_numpy().tolist()))
+        return list(map(str, values.to_numpy(dtype=object).tolist()))
+
+    @classmethod
+    def _key_part(cls, values: pd.Series) -> list:
+        """str() of every cell in one key column, 'NULL' for missing or empty cells"""
+        parts = cls._cell_strings(values)
+        kind = values.dtype.kind if isinstance(values.dtype, np.dtype) else "O"
+        if kind in "iub":
+            return parts
+
+        if kind == "f":
+            empty = np.isnan(values.to_numpy())
+        else:
+            array = values.to_numpy(dtype=object)
+            empty = values.isna().to_numpy(copy=True)
+            # Only present cells are compared - pd.NA has no truth value
+            present = ~empty
+            if present.any():
+                empty[present] = array[present] == ''
+
+        for position in np.flatnonzero(empty):
+            parts[position] = 'NULL'
+        return parts
+
+    @staticmethod
+    def key_fingerprints(keys) -> np.ndarray:
+        """Stable uint64 fingerprint per key (SipHash with pandas' fixed key - identical across runs)"""
+        return pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False)
+
+    @staticmethod
+    def _canonical_cell(text: str) -> str:
+        """One spelling per displayed value: numbers as the sheet shows them ("5.0", "005" -> "5")"""
+        stripped = text.strip()
+        try:
+            return str(int(stripped))  # Exact at any length (long numeric IDs)
+        except ValueError:
+            pass
+        try:
+            number = float(stripped)
+        except ValueError:
+            return stripped.upper() if text in DataValidator.BOOLEAN_TEXTS else text
+        if not math.isfinite(number):
+            return text
+        if number.is_integer() and abs(number) < 1e15:
+            return str(int(number))
+        return format(number, ".15g")
+
+    @classmethod
+    def _normalized_cells(cls, values: pd.Series) -> np.ndarray:
+        """Canonical text of every cell in one column ('' for missing cells)"""
+        array = values.to_numpy(dtype=object)
+        text = np.empty(len(array), dtype=object)
+        text[:] = list(map(str, array.tolist()))
+        text[pd.isna(array)] = ''
+        # Columns repeat values - canonicalize each distinct text once, and only those that
+        # can be numbers or booleans (to_numeric/isin scan the rest in C)
+        codes, uniques = pd.factorize(text)
+        if not len(uniques):
+            return text
+        distinct = pd.Series(uniques, dtype=object)
+        candidates = pd.to_numeric(distinct, errors="coerce").notna() | distinct.isin(cls.BOOLEAN_TEXTS)
+        canonical = np.asarray(uniques, dtype=object).copy()
+        for position in np.flatnonzero(candidates.to_numpy()):
+            canonical[position] = cls._canonical_cell(canonical[position])
+        return canonical[codes]
+
+    @classmethod
+    def row_digests(cls, cells: pd.DataFrame) -> np.ndarray:
+        """Stable int64 content digest per row over the normalized cells (columns in order)
+
+        The same row gives the same digest whether it comes from the sheet as displayed text
+        (get_all_values) or from a cleaned upload frame about to be written.
+        """
+        normalized = pd.DataFrame({
+            position: cls._normalized_cells(cells.iloc[:, position]) for position in range(cells.shape[1])
+        }, index=range(len(cells)))
+        return pd.util.hash_pandas_object(normalized, index=False, categorize=False).to_numpy().view(np.int64)
+
+    def _uses_row_positions(self, df: pd.DataFrame) -> bool:
+        """True when create_composite_key falls back to row positions (no key column present)"""
+        if not self.use_composite_key:
+            return self.unique_key not in df.columns
+        if self.composite_key_columns == "ALL_EXCEPT_NO":
+            return not any(col.lower() != "no" for col in df.columns)
+        return not any(col in self.composite_key_columns for col in df.columns)
+
+    def build_fingerprint_index(self, df: pd.DataFrame) -> KeyFingerprintIndex:
+        """Fingerprint every row's key, building key strings one slice at a time"""
+        if self._uses_row_positions(df):
+            fingerprints = self.key_fingerprints(self.create_composite_key(df).astype(str))
+            return KeyFingerprintIndex(fingerprints, lambda positions: np.array([str(p) for p in positions], dtype=object))
+
+        slice_rows = ExportConfig.DEDUP_CONFIG["fingerprint_slice_rows"]
+        parts = [
+            self.key_fingerprints(self.create_composite_key(df.iloc[start:start + slice_rows]).astype(str))
+            for start in range(0, len(df), slice_rows)
+        ]
+        fingerprints = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+        return KeyFingerprintIndex(
+            fingerprints, lambda positions: self.create_composite_key(df.iloc[positions]).astype(str).to_numpy(dtype=object)
+        )
+
     def read_existing_sheet_data(self, sheet) -> pd.DataFrame:
         """Read existing data from Google Sheets"""
         try:
@@ -63,15 +234,35 @@ class DataValidator:
             self.logger.warning(f"Could not read existing sheet data: {str(e)}")
             return pd.DataFrame()
     
-    def identify_duplicates(self, new_data: pd.DataFrame, existing_data: pd.DataFrame) -> Dict[str, List[int]]:
-        """Identify duplicate records based on unique key (single or composite)"""
+    def identify_duplicates(self, new_data: pd.DataFrame, existing_data: pd.DataFrame,
+                            new_keys: pd.Series = None, existing_keys: pd.Series = None) -> Dict[str, List[int]]:
+        """Identify duplicate records based on unique key (single or composite)
+
+        Pass keys already built with create_composite_key to avoid building them again.
+        """
         if existing_data.empty:
             return {"duplicates": [], "new": list(range(len(new_data)))}
 
+        if self.fingerprint_keys and existing_keys is None:
+            try:
+                existing_index = self.build_fingerprint_index(existing_data)
+                is_duplicate = existing_index.contains(
+                    (new_keys if new_keys is not None else self.create_composite_key(new_data)).astype(str)
+                )
+            except Exception as e:
+                self.logger.warning(f"Error creating composite keys: {e}")
+                return {"duplicates": [], "new": list(range(len(new_data)))}
+
+            duplicates = np.flatnonzero(is_duplicate).tolist()
+            new_records = np.flatnonzero(~is_duplicate).tolist()
+            self.logger.info(f"Found {len(duplicates)} duplicates, {len(new_records)} new records "
+                             f"(fingerprint index: {len(existing_index)} keys, {existing_index.nbytes / 1024 / 1024:.1f} MB)")
+            return {"duplicates": duplicates, "new": new_records}
+
         # Create composite keys for both datasets
         try:
-            existing_keys = set(self.create_composite_key(existing_data))
-            new_keys = self.create_composite_key(new_data)
+            existing_keys = set(existing_keys if existing_keys is not None else self.create_composite_key(existing_data))
+            new_keys = new_keys if new_keys is not None else self.create_composite_key(new_data)
         except Exception as e:
             self.logger.warning(f"Error creating composite keys: {e}")
             return {"duplicates": [], "new": list(range(len(new_data)))}
@@ -88,82 +279,117 @@ class DataValidator:
         self.logger.info(f"Found {len(duplicates)} duplicates, {len(new_records)} new records")
         return {"duplicates": duplicates, "new": new_records}
     
-    def compare_data_changes(self, new_data: pd.DataFrame, existing_data: pd.DataFrame) -> Dict[str, List[int]]:
-        """Compare data to find updates in existing records"""
-        if existing_data.empty:
-            return {"updated": [], "unchanged": []}
+    def compare_data_changes(self, new_data: pd.DataFrame, existing_data: pd.DataFrame,
+                             new_keys: pd.Series = None, existing_keys: pd.Series = None) -> Dict[str, List[int]]:
+        """Compare data to find updates in existing records
 
-        updated = []
-        unchanged = []
+        One keyed merge pairs each new row with the existing row of the same key (the last
+        one when the sheet repeats a key), then str() of every shared column is compared
+        column by column over all pairs. updated_existing / unchanged_existing hold the
+        paired existing row positions.
+        """
+        empty_result = {"updated": [], "unchanged": [], "updated_existing": [], "unchanged_existing": []}
+        if existing_data.empty:
+            return empty_result
 
         try:
-            # Create composite keys for lookup
-            existing_keys = self.create_composite_key(existing_data)
-            new_keys = self.create_composite_key(new_data)
-
-            # Create lookup for existing data using composite keys
-            existing_lookup = {}
-            for idx, key in enumerate(existing_keys):
-                existing_lookup[str(key)] = existing_data.iloc[idx].to_dict()
-
-            # Compare new data with existing
-            for idx, key in enumerate(new_keys):
-                key_str = str(key)
-                if key_str in existing_lookup:
-                    # Compare row content (excluding index)
-                    new_row_dict = new_data.iloc[idx].to_dict()
-                    existing_row_dict = existing_lookup[key_str]
-
-                    # Check if any values are different
-                    has_changes = False
-                    for col in new_row_dict.keys():
-                        if col in existing_row_dict:
-                            if str(new_row_dict[col]) != str(existing_row_dict[col]):
-                                has_changes = True
-                                break
-
-                    if has_changes:
-                        updated.append(idx)
-                    else:
-                        unchanged.append(idx)
+            # Create composite keys for lookup (unless the caller already has them)
+            if existing_keys is None:
+                existing_keys = self.create_composite_key(existing_data)
+            if new_keys is None:
+                new_keys = self.create_composite_key(new_data)
+
+            existing_side = pd.DataFrame({
+                "key": np.asarray(existing_keys.astype(str), dtype=object),
+                "existing_row": np.arange(len(existing_data))
+            }).drop_duplicates("key", keep="last")
+            new_side = pd.DataFrame({
+                "key": np.asarray(new_keys.astype(str), dtype=object),
+                "new_row": np.arange(len(new_data))
+            })
+            pairs = new_side.merge(existing_side, on="key", how="inner").sort_values("new_row")
+            new_rows = pairs["new_row"].to_numpy()
+            existing_rows = pairs["existing_row"].to_numpy()
+
+            # Values as the rows showed them (str() of row.to_dict() values)
+            new_row_dtype = self._row_dtype(new_data)
+            existing_row_dtype = self._row_dtype(existing_data)
+            changed = np.zeros(len(pairs), dtype=bool)
+            for col in dict.fromkeys(new_data.columns):
+                if col not in existing_data.columns:
+                    continue
+                new_values = self._row_values(new_data[col].iloc[new_rows], new_row_dtype)
+                existing_values = self._row_values(existing_data[col].iloc[existing_rows], existing_row_dtype)
+                new_strings = np.empty(len(pairs), dtype=object)
+                new_strings[:] = self._cell_strings(new_values)
+                existing_strings = np.empty(len(pairs), dtype=object)
+                existing_strings[:] = self._cell_strings(existing_values)
+                changed |= new_strings != existing_strings
+
+            updated = new_rows[changed].tolist()
+            unchanged = new_rows[~changed].tolist()
 
         except Exception as e:
             self.logger.warning(f"Error comparing data changes: {e}")
-            return {"updated": [], "unchanged": []}
+            return empty_result
 
         self.logger.info(f"Found {len(updated)} updated records, {len(unchanged)} unchanged records")
-        return {"updated": updated, "unchanged": unchanged}
+        return {"updated": updated, "unchanged": unchanged,
+                "updated_existing": existing_rows[changed].tolist(), "unchanged_existing": existing_rows[~changed].tolist()}
     
     def categorize_data(self, new_data: pd.DataFrame, existing_data: pd.DataFrame) -> Dict[str, Any]:
         """Categorize new data: new, duplicate, updated, unchanged"""
-        duplicate_analysis = self.identify_duplicates(new_data, existing_data)
+        # Keys are built once per frame and shared by both steps (on failure each step reports it)
+        new_keys = existing_keys = None
+        if not existing_data.empty:
+            try:
+                new_keys = self.create_composite_key(new_data)
+                existing_keys = self.create_composite_key(existing_data)
+            except Exception:
+                new_keys = existing_keys = None
+
+        duplicate_analysis = self.identify_duplicates(
+            new_data, existing_data, new_keys, None if self.fingerprint_keys else existing_keys
+        )
         
         # For duplicate records, check if they have updates
         duplicate_indices = duplicate_analysis["duplicates"]
         if duplicate_indices:
             duplicate_subset = new_data.iloc[duplicate_indices]
-            change_analysis = self.compare_data_changes(duplicate_subset, existing_data)
+            change_analysis = self.compare_data_changes(
+                duplicate_subset, existing_data,
+                new_keys.iloc[duplicate_indices] if new_keys is not None else None, existing_keys
+            )
 
             # FIXED: Map back to original indices safely
             updated = []
             unchanged = []
+            updated_existing = []
+            unchanged_existing = []
 
-            for i in change_analysis["updated"]:
+            for i, existing in zip(change_analysis["updated"], change_analysis["updated_existing"]):
                 if i < len(duplicate_indices):
                     updated.append(duplicate_indices[i])
+                    updated_existing.append(existing)
 
-            for i in change_analysis["unchanged"]:
+            for i, existing in zip(change_analysis["unchanged"], change_analysis["unchanged_existing"]):
                 if i < len(duplicate_indices):
                     unchanged.append(duplicate_indices[i])
+                    unchanged_existing.append(existing)
         else:
             updated = []
             unchanged = []
+            updated_existing = []
+            unchanged_existing = []
         
         categorization = {
             "new": duplicate_analysis["new"],
             "duplicates": duplicate_indices,
             "updated": updated,
             "unchanged": unchanged,
+            # Existing row positions (in existing_data) the updated / unchanged records matched
+            "updated_existing": updated_existing,
+            "unchanged_existing": unchanged_existing,
             "summary": {
                 "total_records": len(new_data),
                 "new_count": len(duplicate_analysis["new"]),
@@ -176,14 +402,78 @@ class DataValidator:
         self.logger.info(f"Data categorization: {categorization['summary']}")
         return categorization
     
+    def prepare_indexed_upload_data(self, new_data: pd.DataFrame, is_duplicate: np.ndarray,
+                                    is_changed: np.ndarray = None, sheet_rows: np.ndarray = None) -> Dict[str, Any]:
+        """Upload plan from a key index lookup (SheetKeyIndex)
+
+        Duplicates whose row digest differs from the indexed one (is_changed) are updates of
+        the sheet rows in sheet_rows; without digests every duplicate is skipped.
+        """
+        if is_changed is None:
+            is_changed = np.zeros(len(new_data), dtype=bool)
+        is_unchanged = is_duplicate & ~is_changed
+
+        upload_plan = {
+            "append_data": new_data[~is_duplicate],
+            "update_data": new_data[is_changed],
+            "update_rows": np.asarray(sheet_rows)[is_changed].tolist() if sheet_rows is not None else [],
+            "skip_data": new_data[is_unchanged],
+            "operations": []
+        }
+        if not upload_plan["append_data"].empty:
+            upload_plan["operations"].append(f"APPEND {len(upload_plan['append_data'])} new records")
+        if not upload_plan["update_data"].empty:
+            upload_plan["operations"].append(f"UPDATE {len(upload_plan['update_data'])} changed records (row digest)")
+        if not upload_plan["skip_data"].empty:
+            upload_plan["operations"].append(f"SKIP {len(upload_plan['skip_data'])} unchanged duplicates already in the key index")
+
+        self.logger.info(f"Found {int(is_duplicate.sum())} duplicates, {int((~is_duplicate).sum())} new records, "
+                         f"{int(is_changed.sum())} changed records (key index)")
+        return upload_plan
+
+    def digest_changes(self, new_rows: pd.DataFrame, existing_rows: pd.DataFrame) -> np.ndarray:
+        """Mask of paired rows whose content digests differ, or None when the column sets differ
+
+        Digests normalize numbers, so a cleaned '66.0' and a sheet value of 66 are the same cell -
+        the str() comparison of compare_data_changes reports those as changed.
+        """
+        columns = list(existing_rows.columns)
+        if len(set(columns)) != len(columns) or set(new_rows.columns) != set(columns) or len(new_rows.columns) != len(columns):
+            return None
+        return self.row_digests(new_rows[columns]) != self.row_digests(existing_rows)
+
     def prepare_smart_upload_data(self, new_data: pd.DataFrame, existing_data: pd.DataFrame, 
                                  handle_duplicates: str = "skip") -> Dict[str, Any]:
-        """Prepare data for smart upload based on categorization"""
+        """Prepare data for smart upload based on categorization
+
+        Only records whose row digest differs from their sheet row get update_rows (in-place
+        writes); str() differences with equal digests are skipped as unchanged.
+        """
         categorization = self.categorize_data(new_data, existing_data)
+        updated = categorization["updated"]
+        updated_existing = categorization["updated_existing"]
+        unchanged = list(categorization["unchanged"])
+        unchanged_existing = list(categorization["unchanged_existing"])
+
+        update_rows = []
+        rows_known = True  # False when the sheet rows of update_data cannot be written safely
+        if updated:
+            changed = self.digest_changes(new_data.iloc[updated], existing_data.iloc[updated_existing])
+            if changed is None:
+                rows_known = False
+                self.logger.warning("Upload columns differ from the sheet - changed records are not written in place")
+            else:
+                unchanged += [position for position, flag in zip(updated, changed) if not flag]
+                unchanged_existing += [position for position, flag in zip(updated_existing, changed) if not flag]
+                updated = [position for position, flag in zip(updated, changed) if flag]
+                updated_existing = [position for position, flag in zip(updated_existing, changed) if flag]
+                # existing_data comes from get_all_records(): record i is sheet row i + 2
+                update_rows = [position + 2 for position in updated_existing]
         
         upload_plan = {
             "append_data": pd.DataFrame(),
             "update_data": pd.DataFrame(), 
+            "update_rows": [],  # Sheet row of each update_data record (empty - not written in place)
             "skip_data": pd.DataFrame(),
             "operations": []
         }
@@ -194,18 +484,22 @@ class DataValidator:
             upload_plan["operations"].append(f"APPEND {len(categorization['new'])} new records")
         
         # Handle updated records
-        if categorization["updated"]:
-            upload_plan["update_data"] = new_data.iloc[categorization["updated"]]
-            upload_plan["operations"].append(f"UPDATE {len(categorization['updated'])} changed records")
+        if updated:
+            upload_plan["update_data"] = new_data.iloc[updated]
+            upload_plan["update_rows"] = update_rows
+            upload_plan["operations"].append(f"UPDATE {len(updated)} changed records")
         
         # Handle duplicates based on strategy
-        if categorization["unchanged"]:
+        if unchanged:
             if handle_duplicates == "skip":
-                upload_plan["skip_data"] = new_data.iloc[categorization["unchanged"]]
-                upload_plan["operations"].append(f"SKIP {len(categorization['unchanged'])} unchanged duplicates")
+                upload_plan["skip_data"] = new_data.iloc[unchanged]
+                upload_plan["operations"].append(f"SKIP {len(unchanged)} unchanged duplicates")
             elif handle_duplicates == "force_update":
                 upload_plan["update_data"] = pd.concat([upload_plan["update_data"], 
-                                                       new_data.iloc[categorization["unchanged"]]])
-                upload_plan["operations"].append(f"FORCE UPDATE {len(categorization['unchanged'])} duplicates")
+                                                       new_data.iloc[unchanged]])
+                # Explicitly requested rewrite of every duplicate
+                if rows_known:
+                    upload_plan["update_rows"] = update_rows + [position + 2 for position in unchanged_existing]
+                upload_plan["operations"].append(f"FORCE UPDATE {len(unchanged)} duplicates")
         
-        return upload_plan
\ No newline at end of file
+        return upload_plan
@@ -0,0 +1,76 @@
+"""
+Per-export download staging directories
+Each export run downloads into its own folder, so concurrent exports never see each other's files
+"""
+
+import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from .config import ExportConfig
+
+# Background writer for in-memory downloads; worker threads are joined at interpreter exit
+_persist_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="download-persist")
+
+class DownloadStaging:
+    """Creates isolated run folders and finalizes files atomically under deterministic names"""
+
+    def __init__(self, base_folder: str = None):
+        self.base_folder = Path(base_folder or ExportConfig.DOWNLOADS_FOLDER)
+        self.staging_root = self.base_folder / ExportConfig.DOWNLOAD_STAGING_FOLDER
+        self.staging_root.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+    def create_run_folder(self, export_type: str) -> Path:
+        """New empty folder for one export run"""
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        run_folder = self.staging_root / f"{export_type}_{run_id}"
+        run_folder.mkdir(parents=True)
+        self.logger.info(f"Download staging folder: {run_folder}")
+        return run_folder
+
+    @staticmethod
+    def file_extension(export_config: Dict) -> str:
+        return ".pdf" if export_config.get("file_type") == "pdf" else ".xlsx"
+
+    def final_path(self, export_config: Dict, start_date: str = None, end_date: str = None) -> Path:
+        """Deterministic file name for an export and date window"""
+        return self.base_folder / (
+            f"{export_config['file_prefix']}_{start_date or 'all'}_{end_date or 'all'}{self.file_extension(export_config)}"
+        )
+
+    def finalize(self, staged_file: Path, export_config: Dict, start_date: str = None, end_date: str = None) -> Path:
+        """Atomically move a completed download to its final name (same filesystem, so os.replace is atomic)"""
+        final_path = self.final_path(export_config, start_date, end_date)
+        os.replace(staged_file, final_path)
+        self.logger.info(f"Finalized download: {final_path}")
+        return final_path
+
+    def write_bytes(self, content: bytes, export_config: Dict, start_date: str = None, end_date: str = None) -> Path:
+        """Write downloaded bytes through a private staging file, then finalize"""
+        staged_file = self.staging_root / f"{export_config['file_prefix']}_{uuid.uuid4().hex}.part"
+        staged_file.write_bytes(content)
+        return self.finalize(staged_file, export_config, start_date, end_date)
+
+    def persist_async(self, content: bytes, export_config: Dict, start_date: str = None, end_date: str = None) -> Future:
+        """Write in-memory export bytes to disk without blocking the caller"""
+        future = _persist_executor.submit(self.write_bytes, content, export_config, start_date, end_date)
+
+        def log_failure(done: Future):
+            if done.exception():
+                self.logger.warning(f"Background save of {export_config['file_prefix']} failed: {done.exception()}")
+
+        future.add_done_callback(log_failure)
+        return future
+
+    def discard_run_folder(self, run_folder: Path):
+        """Remove a run folder and anything left in it (partial .crdownload files etc.)"""
+        try:
+            shutil.rmtree(run_folder, ignore_errors=True)
+        except Exception as e:
+            self.logger.warning(f"Could not remove staging folder {run_folder}: {str(e)}")
@@ -0,0 +1,159 @@
+"""
+Chrome binary and ChromeDriver resolution with an on-disk cache
+Detects and validates both once, then reuses the result until Chrome is upgraded
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import ExportConfig
+
+class ChromeDriverResolver:
+    """Resolves (chrome_binary, driver_path) once and caches it keyed by Chrome version"""
+
+    # In-process cache so every connector in a run shares one resolution
+    _resolved: Optional[Dict] = None
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.CHROME_DRIVER_CONFIG
+        self.cache_file = Path(self.config["cache_file"])
+        self.offline = self.config.get("offline", False)
+        self.logger = logging.getLogger(__name__)
+
+    def detect_chrome_binary(self) -> Optional[str]:
+        """Find the Chrome/Chromium binary from environment variables, known paths or PATH"""
+        for env_var in ("CHROME_BIN", "CHROME_PATH"):
+            candidate = os.getenv(env_var)
+            if candidate and os.path.exists(candidate):
+                return candidate
+
+        for candidate in self.config["chrome_paths"]:
+            if os.path.exists(candidate):
+                return candidate
+
+        for name in ("google-chrome-stable", "google-chrome", "chromium-browser", "chromium"):
+            candidate = shutil.which(name)
+            if candidate:
+                return candidate
+
+        return None
+
+    @staticmethod
+    def _read_version(executable: str) -> Optional[str]:
+        """Run '<executable> --version' and extract the dotted version number"""
+        try:
+            output = subprocess.run(
+                [executable, "--version"], capture_output=True, text=True, timeout=15
+            ).stdout
+            match = re.search(r"(\d+\.\d+\.\d+\.\d+|\d+\.\d+\.\d+)", output)
+            return match.group(1) if match else None
+        except Exception:
+            return None
+
+    def _load_cache(self) -> Dict:
+        try:
+            if self.cache_file.exists():
+                return json.loads(self.cache_file.read_text())
+        except Exception as e:
+            self.logger.warning(f"Could not read driver cache: {str(e)}")
+        return {}
+
+    def _save_cache(self, cache: Dict):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps(cache, indent=2))
+        except Exception as e:
+            self.logger.warning(f"Could not write driver cache: {str(e)}")
+
+    def _validate_driver(self, driver_path: str, chrome_version: Optional[str]) -> bool:
+        """Driver exists, runs, and matches Chrome's major version"""
+        if not driver_path or not os.path.exists(driver_path) or not os.access(driver_path, os.X_OK):
+            return False
+
+        driver_version = self._read_version(driver_path)
+        if not driver_version:
+            return False
+
+        if chrome_version and driver_version.split(".")[0] != chrome_version.split(".")[0]:
+            self.logger.warning(f"ChromeDriver {driver_version} does not match Chrome {chrome_version}")
+            return False
+
+        return True
+
+    def _download_driver(self) -> Optional[str]:
+        """Ask webdriver-manager for a matching driver (network access)"""
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        self.logger.info("Resolving ChromeDriver with webdriver-manager (network)...")
+        return ChromeDriverManager().install()
+
+    def resolve(self, force_refresh: bool = False) -> Dict:
+        """Return {'chrome_binary', 'chrome_version', 'driver_path'}; driver_path None means Selenium default"""
+        if ChromeDriverResolver._resolved and not force_refresh:
+            return ChromeDriverResolver._resolved
+
+        start = time.perf_counter()
+        chrome_binary = self.detect_chrome_binary()
+        chrome_version = self._read_version(chrome_binary) if chrome_binary else None
+
+        if not chrome_binary:
+            self.logger.warning("No Chrome/Chromium binary found, using system default")
+
+        cache = self._load_cache()
+        cache_key = chrome_version or "unknown"
+        cached = cache.get(cache_key)
+
+        driver_path = None
+        if cached and not force_refresh and cached.get("chrome_binary") == chrome_binary \
+                and self._validate_driver(cached.get("driver_path"), chrome_version):
+            driver_path = cached["driver_path"]
+            self.logger.info(f"Using cached ChromeDriver for Chrome {cache_key}: {driver_path}")
+        else:
+            # A chromedriver on PATH avoids the network entirely
+            system_driver = shutil.which("chromedriver")
+            if self._validate_driver(system_driver, chrome_version):
+                driver_path = system_driver
+            elif not self.offline:
+                try:
+                    downloaded = self._download_driver()
+                    if self._validate_driver(downloaded, chrome_version):
+                        driver_path = downloaded
+                except Exception as e:
+                    self.logger.warning(f"webdriver-manager failed: {str(e)}")
+            else:
+                self.logger.info("Offline mode - skipping webdriver-manager")
+
+            if driver_path:
+                cache[cache_key] = {
+                    "chrome_binary": chrome_binary,
+                    "driver_path": driver_path,
+                    "resolved_at": time.time()
+                }
+                self._save_cache(cache)
+            elif self.offline:
+                raise RuntimeError("Offline mode: no cached or system ChromeDriver matches the installed Chrome")
+
+        ChromeDriverResolver._resolved = {
+            "chrome_binary": chrome_binary,
+            "chrome_version": chrome_version,
+            "driver_path": driver_path
+        }
+        self.logger.info(f"Chrome resolution took {time.perf_counter() - start:.2f}s: {ChromeDriverResolver._resolved}")
+        return ChromeDriverResolver._resolved
+
+    def invalidate(self):
+        """Forget the current resolution (e.g. after the driver failed to start)"""
+        resolved = ChromeDriverResolver._resolved
+        ChromeDriverResolver._resolved = None
+
+        cache = self._load_cache()
+        if resolved and resolved.get("chrome_version") in cache:
+            del cache[resolved["chrome_version"]]
+            self._save_cache(cache)
@@ -0,0 +1,190 @@
+"""
+Pluggable xlsx reader for export files
+Streams cells with openpyxl read_only (or calamine when installed) and counts rows without building a DataFrame
+"""
+
+import io
+import logging
+from datetime import date, timedelta
+from typing import List
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .config import ExportConfig
+
+try:
+    import python_calamine
+except ImportError:  # Optional fast engine
+    python_calamine = None
+
+class ExcelReader:
+    """Reads the first sheet of an export into the same DataFrame pd.read_excel would produce"""
+
+    # "pandas" is plain pd.read_excel, kept as the reference engine
+    ENGINES = ("calamine", "openpyxl_streaming", "pandas")
+
+    def __init__(self, engine: str = None, schema=None):
+        self.logger = logging.getLogger(__name__)
+        # Optional ExportSchema - read() returns its compact dtypes
+        self.schema = schema
+        requested = engine or ExportConfig.EXCEL_READER_CONFIG["engine"]
+
+        if requested == "auto":
+            requested = "calamine" if python_calamine else "openpyxl_streaming"
+        elif requested == "calamine" and not python_calamine:
+            self.logger.warning("python-calamine not installed - using openpyxl streaming reader")
+            requested = "openpyxl_streaming"
+        elif requested not in self.ENGINES:
+            raise ValueError(f"Unknown Excel reader engine: {requested}")
+
+        self.engine = requested
+
+    @staticmethod
+    def available_engines() -> List[str]:
+        return [engine for engine in ExcelReader.ENGINES if engine != "calamine" or python_calamine]
+
+    @staticmethod
+    def _as_readable(source):
+        """Path, raw bytes or file-like buffer -> something the engines can open"""
+        if isinstance(source, (bytes, bytearray)):
+            return io.BytesIO(source)
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source
+
+    # ---- Cell streams ----
+
+    @staticmethod
+    def _openpyxl_rows(source):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+        try:
+            sheet = workbook.worksheets[0]
+            # Exports often carry a wrong <dimension>, same reset pandas does
+            sheet.reset_dimensions()
+            for row in sheet.iter_rows(values_only=True):
+                yield [ExcelReader._convert_openpyxl_value(value) for value in row]
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _convert_openpyxl_value(value):
+        """Mirror pandas' openpyxl cell conversion (empty -> "", whole floats -> int)"""
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            as_int = int(value)
+            return as_int if as_int == value else value
+        return value
+
+    @staticmethod
+    def _calamine_rows(source):
+        workbook = python_calamine.load_workbook(source)
+        for row in workbook.get_sheet_by_index(0).to_python(skip_empty_area=False):
+            yield [ExcelReader._convert_calamine_value(value) for value in row]
+
+    @staticmethod
+    def _convert_calamine_value(value):
+        """Mirror pandas' calamine cell conversion"""
+        if isinstance(value, float):
+            as_int = int(value)
+            return as_int if as_int == value else value
+        if isinstance(value, date):
+            return pd.Timestamp(value)
+        if isinstance(value, timedelta):
+            return pd.Timedelta(value)
+        return value
+
+    def _iter_rows(self, source):
+        source = self._as_readable(source)
+        if self.engine == "calamine":
+            return self._calamine_rows(source)
+        return self._openpyxl_rows(source)
+
+    @staticmethod
+    def _trimmed_sheet_data(rows) -> List[list]:
+        """Trim trailing empty cells/rows and pad to a rectangle, as pandas' readers do"""
+        data = []
+        last_row_with_data = -1
+        for row_number, row in enumerate(rows):
+            while row and row[-1] == "":
+                row.pop()
+            if row:
+                last_row_with_data = row_number
+            data.append(row)
+
+        data = data[: last_row_with_data + 1]
+        if data:
+            max_width = max(len(row) for row in data)
+            data = [row + [""] * (max_width - len(row)) for row in data]
+        return data
+
+    # ---- Public API ----
+
+    def read(self, source) -> pd.DataFrame:
+        """Load the export into a DataFrame (first row is the header)"""
+        if self.engine == "pandas":
+            df = pd.read_excel(self._as_readable(source))
+        else:
+            data = self._trimmed_sheet_data(self._iter_rows(source))
+            if not data:
+                return pd.DataFrame()
+
+            # Same parser pd.read_excel hands the cell grid to, so dtypes and NaN handling match
+            df = TextParser(data, header=0).read()
+
+        return self.schema.apply(df) if self.schema else df
+
+    def iter_row_chunks(self, source, chunk_rows: int):
+        """Stream the export as (header, raw_rows) chunks of at most chunk_rows non-blank rows
+
+        Rows are raw cell values; turn a chunk into a DataFrame with parse_rows().
+        Nothing is yielded for a workbook without a header row.
+        """
+        rows = self._iter_rows(source)
+        header = None
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+            if row:
+                header = row
+                break
+
+        if header is None:
+            return
+
+        chunk = []
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+            if not row:
+                continue  # Blank rows are skipped by the parser anyway
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield header, chunk
+                chunk = []
+
+        # Always yield once so header-only exports still report their columns
+        yield header, chunk
+
+    @staticmethod
+    def parse_rows(header: list, rows: List[list], object_columns=()) -> pd.DataFrame:
+        """Parse raw rows with the same parser read() uses; object_columns skip numeric inference"""
+        width = max([len(header)] + [len(row) for row in rows])
+        grid = [row + [""] * (width - len(row)) for row in [list(header)] + rows]
+        dtype = {column: object for column in object_columns} or None
+        return TextParser(grid, header=0, dtype=dtype).read()
+
+    def count_rows(self, source) -> int:
+        """Number of data rows (excluding the header) without materializing a DataFrame"""
+        if self.engine == "pandas":
+            return len(pd.read_excel(self._as_readable(source)))
+
+        # Blank rows are skipped by the parser, so only rows with a value count
+        non_blank_rows = sum(
+            1 for row in self._iter_rows(source)
+            if any(value != "" for value in row)
+        )
+        return max(non_blank_rows - 1, 0)
@@ -0,0 +1,69 @@
+"""
+Download path shared by the Selenium export automations
+Direct HTTP export first, the Selenium browser as fallback; long ranges are fetched as merged date windows
+"""
+
+from .backend_connector import BackendConnector
+from .http_exporter import HttpExportFetcher
+from .windowed_export import WindowedExportFetcher
+
+class ExportDownloadMixin:
+    """Connector ownership plus the HTTP / browser download of one export (the class sets self.logger)"""
+
+    def _setup_download(self, export_type: str, connector: BackendConnector = None,
+                        http_fetcher: HttpExportFetcher = None, windowed_fetcher: WindowedExportFetcher = None):
+        self.export_type = export_type
+        # A shared connector is owned (and cleaned up) by the caller
+        self.owns_connector = connector is None
+        self.connector = connector or BackendConnector(self.export_type)
+        if not self.owns_connector:
+            self.connector.set_export_type(self.export_type)
+        self.http_fetcher = http_fetcher
+        self.windowed_fetcher = windowed_fetcher or WindowedExportFetcher()
+
+    def _fetch_over_http(self, start_date, end_date):
+        """Direct HTTP export; None when unavailable so the browser can take over"""
+        if not self.http_fetcher:
+            return None
+        return self.http_fetcher.fetch_export(self.export_type, start_date, end_date)
+
+    def _download_via_browser(self, start_date, end_date):
+        """Download the export through the Selenium browser"""
+        if self.owns_connector and self.connector.driver is None:
+            # Setup browser
+            self.connector.setup_browser()
+
+            # Login to backend
+            self.connector.login_to_backend()
+        else:
+            # Reuse the shared session, re-login only if it expired
+            self.connector.ensure_logged_in()
+
+        # Navigate to export page
+        self.connector.navigate_to_export_page()
+
+        # Hand the browser's fresh cookies to the HTTP fetcher for the next exports - the HTTP
+        # fetch may have failed on stale cookies it still considered authenticated
+        if self.http_fetcher:
+            self.http_fetcher.load_cookies(self.connector.driver.get_cookies())
+
+        # Download export file
+        return self.connector.download_export_file(start_date, end_date)
+
+    def download_export(self, start_date, end_date):
+        """Download one export file - direct HTTP first, no browser needed when it works"""
+        downloaded_file = self._fetch_over_http(start_date, end_date)
+        if downloaded_file is None:
+            downloaded_file = self._download_via_browser(start_date, end_date)
+        return downloaded_file
+
+    def fetch_source(self, start_date, end_date):
+        """Upload source for a date range: one download, or a long range's merged date windows"""
+        if self.windowed_fetcher.should_split(start_date, end_date):
+            # Long range: N-day windows fetched in parallel over HTTP, merged into one DataFrame
+            return self.windowed_fetcher.fetch_merged(
+                self.export_type, start_date, end_date,
+                fetch_window=self._fetch_over_http if self.http_fetcher else None,
+                fallback=self._download_via_browser
+            )
+        return self.download_export(start_date, end_date)
@@ -0,0 +1,77 @@
+"""
+Per-export column schemas
+Compact dtypes after parsing; SheetsSerializer turns them back into the original cell values
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict
+
+import pandas as pd
+
+from .config import ExportConfig
+
+class ExportSchema:
+    """Applies the "schema" declared in ExportConfig.EXPORTS to parsed exports
+
+    Column spec keys:
+        dtype     - "category" (low-cardinality text), "datetime" (text dates, needs format),
+                    "string", "int" or "float" (checked only - the parser's dtype is kept)
+        format    - strftime format of a datetime column, used to parse and to serialize back
+        nullable  - False logs a warning when the column has empty cells
+
+    Conversions are lossless: uploads serialize exactly the values the sheet already holds,
+    so composite keys keep matching existing rows. Key columns stay in composite_key_columns.
+    """
+
+    def __init__(self, export_type: str = None, columns: Dict = None):
+        self.export_type = export_type
+        if columns is None:
+            columns = ExportConfig.get_export_config(export_type).get("schema", {}) if export_type else {}
+        self.columns = columns
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def version(self) -> str:
+        """Short hash of the column declarations - changes whenever parsed dtypes would"""
+        spec = json.dumps(self.columns, sort_keys=True, default=str)
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:12]
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert declared columns to compact dtypes (undeclared or absent columns are untouched)"""
+        for column, spec in self.columns.items():
+            if column not in df.columns:
+                continue
+            values = df[column]
+
+            if spec.get("nullable", True) is False and values.isna().any():
+                self.logger.warning(f"{self.export_type}: column '{column}' has {int(values.isna().sum())} empty cells but is declared non-nullable")
+
+            dtype = spec.get("dtype")
+            if dtype == "category" and self._is_text(values):
+                df[column] = values.astype("category")
+            elif dtype == "datetime" and spec.get("format") and self._is_text(values):
+                parsed = self._parse_dates(values, spec["format"])
+                if parsed is not None:
+                    df[column] = parsed
+                else:
+                    self.logger.info(f"{self.export_type}: column '{column}' does not round-trip through {spec['format']} - kept as text")
+        return df
+
+    @staticmethod
+    def _is_text(values: pd.Series) -> bool:
+        return values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+
+    @staticmethod
+    def _parse_dates(values: pd.Series, date_format: str):
+        """datetime64 column, or None unless every value formats back to the identical string"""
+        present = values.notna()
+        if not values[present].map(lambda value: isinstance(value, str)).all():
+            return None
+        parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+        if not (parsed.notna() == present).all():
+            return None
+        if not (parsed[present].dt.strftime(date_format) == values[present]).all():
+            return None
+        return parsed
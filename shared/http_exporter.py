@@ -0,0 +1,283 @@
+"""
+Direct HTTP export fetcher - downloads exports with a pooled requests.Session
+Submits the same export forms the browser would, so Chrome is only needed as a fallback
+"""
+
+import logging
+import re
+import threading
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import ExportConfig
+from .session_cache import SessionCache
+from .download_staging import DownloadStaging
+
+class HttpExportError(Exception):
+    """Raised when a direct HTTP export cannot be completed"""
+
+class _FormParser(HTMLParser):
+    """Collects forms with their inputs and buttons from an HTML page"""
+
+    def __init__(self):
+        super().__init__()
+        self.forms = []
+        self._current_form = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self._current_form = {
+                "action": attrs.get("action") or "",
+                "method": (attrs.get("method") or "get").lower(),
+                "inputs": [],
+                "buttons": []
+            }
+            self.forms.append(self._current_form)
+        elif self._current_form is not None and tag in ("input", "select", "textarea"):
+            self._current_form["inputs"].append(attrs)
+        elif self._current_form is not None and tag == "button":
+            self._current_form["buttons"].append(attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._current_form = None
+
+class HttpExportFetcher:
+    """Downloads export files over HTTP using one authenticated, pooled session"""
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.HTTP_EXPORT_CONFIG
+        self.logger = logging.getLogger(__name__)
+        self.session_cache = SessionCache()
+        self.authenticated = False
+        # Date windows fetch concurrently - only one of them may log in
+        self._auth_lock = threading.Lock()
+
+        # Pooled session reused by every export in the run
+        self.session = requests.Session()
+        retry = Retry(
+            total=self.config["max_retries"],
+            backoff_factor=1,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET", "POST"]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config["pool_size"],
+            pool_maxsize=self.config["pool_size"],
+            max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": self.config["user_agent"]})
+
+        self.download_staging = DownloadStaging()
+        self.capture_config = ExportConfig.IN_MEMORY_CAPTURE_CONFIG
+
+    @staticmethod
+    def _parse_selector(selector: str):
+        """Extract (attribute, value) from selectors like input[name="start"] or [id="filter-end"]"""
+        match = re.search(r'\[(name|id)="([^"]+)"\]', selector or "")
+        return (match.group(1), match.group(2)) if match else (None, None)
+
+    @staticmethod
+    def _find_input(inputs: List[Dict], selector: str) -> Optional[Dict]:
+        """Find the form input a CSS selector from ExportConfig refers to"""
+        attr, value = HttpExportFetcher._parse_selector(selector)
+        if not attr:
+            return None
+        for field in inputs:
+            if field.get(attr) == value:
+                return field
+        return None
+
+    def _get_forms(self, url: str) -> List[Dict]:
+        """Load a page and parse its forms"""
+        response = self.session.get(url, timeout=self.config["timeout"])
+        response.raise_for_status()
+
+        parser = _FormParser()
+        parser.feed(response.text)
+
+        for form in parser.forms:
+            form["action"] = urljoin(response.url, form["action"] or response.url)
+        return parser.forms
+
+    @staticmethod
+    def _form_payload(form: Dict) -> Dict:
+        """Start a payload from the form's hidden/default values (e.g. CSRF token)"""
+        payload = {}
+        for field in form["inputs"]:
+            name = field.get("name")
+            if name and field.get("type", "text").lower() not in ("submit", "button", "checkbox", "radio"):
+                payload[name] = field.get("value", "")
+        return payload
+
+    def load_cookies(self, cookies) -> None:
+        """Adopt cookies from a browser login (Selenium cookie list or Playwright storage state)"""
+        if isinstance(cookies, dict):
+            cookies = cookies.get("cookies", [])
+
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
+
+        self.authenticated = bool(cookies)
+        self.logger.info(f"HTTP session adopted {len(cookies)} cookies from browser login")
+
+    def login(self) -> bool:
+        """Pure HTTP login using the backend login form"""
+        self.logger.info("Logging in to backend over HTTP...")
+
+        try:
+            username_attr, username_name = self._parse_selector(ExportConfig.LOGIN_SELECTORS["username"])
+            password_attr, password_name = self._parse_selector(ExportConfig.LOGIN_SELECTORS["password"])
+
+            forms = self._get_forms(ExportConfig.BACKEND_BASE_URL)
+            login_form = next((f for f in forms if self._find_input(f["inputs"], ExportConfig.LOGIN_SELECTORS["password"])), None)
+            if not login_form:
+                raise HttpExportError("Login form not found on backend page")
+
+            payload = self._form_payload(login_form)
+            payload[username_name] = ExportConfig.USERNAME
+            payload[password_name] = ExportConfig.PASSWORD
+
+            response = self.session.post(login_form["action"], data=payload, timeout=self.config["timeout"])
+            response.raise_for_status()
+
+            if "login" in response.url.lower():
+                raise HttpExportError("Login failed - still on login page")
+
+            self.authenticated = True
+            self.logger.info("HTTP login successful!")
+
+            # Share the fresh session with the browser engines and the next run
+            self.session_cache.save_storage_state({
+                "cookies": [
+                    {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                     "expires": c.expires or -1, "httpOnly": False, "secure": c.secure}
+                    for c in self.session.cookies
+                ],
+                "origins": []
+            })
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"HTTP login failed: {str(e)}")
+            self.authenticated = False
+            return False
+
+    def _expire_session(self):
+        """Forget the current cookies so the next export re-authenticates (or adopts the browser's)"""
+        self.authenticated = False
+        self.session.cookies.clear()
+        self.session_cache.clear()
+
+    def ensure_authenticated(self) -> bool:
+        """Reuse cached/browser cookies when possible, otherwise login over HTTP"""
+        if self.authenticated:
+            return True
+
+        with self._auth_lock:
+            if self.authenticated:
+                return True
+
+            storage_state = self.session_cache.load_valid()
+            if storage_state:
+                self.load_cookies(storage_state)
+                return True
+
+            return self.login()
+
+    def fetch_export_bytes(self, export_type: str, start_date: str = None, end_date: str = None) -> bytes:
+        """Submit the export form over HTTP and return the xlsx bytes"""
+        export_config = ExportConfig.get_export_config(export_type)
+        http_config = export_config.get("http_export", {})
+        selectors = export_config["selectors"]
+
+        if not self.ensure_authenticated():
+            raise HttpExportError("Not authenticated")
+
+        # Discover the export form (action, method, CSRF token, date field names)
+        forms = self._get_forms(export_config["url"])
+        export_form = next((f for f in forms if self._find_input(f["inputs"], selectors.get("start_date"))), None)
+        if not export_form:
+            # Usually stale cookies - the page served the login form instead
+            self._expire_session()
+            raise HttpExportError(f"Export form not found on {export_config['url']} - session reset")
+
+        action = http_config.get("form_action") or export_form["action"]
+        method = (http_config.get("method") or export_form["method"]).lower()
+        payload = self._form_payload(export_form)
+
+        for selector_key, date_value in (("start_date", start_date), ("end_date", end_date)):
+            field = self._find_input(export_form["inputs"], selectors.get(selector_key))
+            if not field or not field.get("name"):
+                raise HttpExportError(f"Date field '{selectors.get(selector_key)}' has no submittable name")
+            if date_value:
+                payload[field["name"]] = date_value
+
+        # Include the export button's own name/value when the form relies on it
+        for button in export_form["buttons"]:
+            if button.get("name"):
+                payload[button["name"]] = button.get("value", "")
+                break
+
+        self.logger.info(f"HTTP EXPORT: {method.upper()} {action} for {export_type} ({start_date} to {end_date})")
+
+        if method == "post":
+            response = self.session.post(action, data=payload, timeout=self.config["timeout"])
+        else:
+            response = self.session.get(action, params=payload, timeout=self.config["timeout"])
+        response.raise_for_status()
+
+        if "login" in response.url.lower():
+            self._expire_session()
+            raise HttpExportError("Session expired - export redirected to login page")
+
+        # xlsx files are zip archives
+        if not response.content.startswith(b"PK"):
+            content_type = response.headers.get("Content-Type", "unknown")
+            raise HttpExportError(f"Response is not an xlsx file (Content-Type: {content_type}, {len(response.content)} bytes)")
+
+        return response.content
+
+    def fetch_export(self, export_type: str, start_date: str = None, end_date: str = None) -> Optional[Union[Path, bytes]]:
+        """Download an export; returns None so callers can fall back to the browser
+
+        Returns the file path, or the raw xlsx bytes when in-memory capture is enabled
+        (the disk copy is then written in the background).
+        """
+        export_config = ExportConfig.get_export_config(export_type)
+        if not self.config["enabled"] or not export_config.get("http_export", {}).get("enabled", False):
+            return None
+
+        try:
+            content = self.fetch_export_bytes(export_type, start_date, end_date)
+
+            if self.capture_config["enabled"]:
+                if self.capture_config["persist_to_disk"]:
+                    self.download_staging.persist_async(content, export_config, start_date, end_date)
+                self.logger.info(f"HTTP export captured in memory: {export_type} ({len(content)} bytes)")
+                return content
+
+            file_path = self.download_staging.write_bytes(content, export_config, start_date, end_date)
+
+            self.logger.info(f"HTTP export downloaded: {file_path} ({len(content)} bytes)")
+            return file_path
+
+        except Exception as e:
+            self.logger.warning(f"HTTP export failed for {export_type}, falling back to browser: {str(e)}")
+            return None
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
@@ -0,0 +1,150 @@
+"""
+Parse-once columnar cache for downloaded exports
+Each parsed workbook is stored as Parquet keyed by the SHA-256 of the raw download plus
+the reader engine and schema version that produced the frame
+"""
+
+import hashlib
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import ExportConfig
+
+try:
+    import pyarrow  # noqa: F401 - Parquet engine
+except ImportError:  # Optional - cache is disabled without it
+    pyarrow = None
+
+class ParsedExportCache:
+    """Stores parsed exports as Parquet so validation, uploads and retries skip xlsx parsing"""
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.PARSED_CACHE_CONFIG
+        self.folder = Path(ExportConfig.DOWNLOADS_FOLDER) / self.config["folder"]
+        self.enabled = self.config.get("enabled", True) and pyarrow is not None
+        self.logger = logging.getLogger(__name__)
+
+        if self.enabled:
+            self.folder.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def content_hash(source) -> str:
+        """SHA-256 of a download given as a path, raw bytes or file-like buffer"""
+        digest = hashlib.sha256()
+        if isinstance(source, (bytes, bytearray)):
+            digest.update(source)
+        elif hasattr(source, "getbuffer"):
+            digest.update(source.getbuffer())
+        else:
+            with open(source, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def variant(reader) -> str:
+        """Reader engine and schema version - the same bytes parse to different dtypes per variant"""
+        schema = getattr(reader, "schema", None)
+        return f"{reader.engine}-{schema.version if schema is not None else 'raw'}"
+
+    def path_for(self, digest: str, variant: str) -> Path:
+        return self.folder / f"{digest}.{variant}.parquet"
+
+    def get(self, digest: str, variant: str) -> Optional[pd.DataFrame]:
+        """Cached DataFrame for a content hash parsed by one reader variant, or None"""
+        if not self.enabled:
+            return None
+
+        cache_path = self.path_for(digest, variant)
+        if not cache_path.exists():
+            return None
+
+        try:
+            df = pd.read_parquet(cache_path)
+            # Parquet nulls come back as None in object columns; the parser produced NaN
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].where(df[column].notna(), np.nan)
+            os.utime(cache_path)  # Recently used entries survive size eviction
+            return df
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable parsed cache {cache_path.name}: {str(e)}")
+            return None
+
+    def put(self, digest: str, variant: str, df: pd.DataFrame):
+        """Store a parsed export; columns Parquet cannot represent just skip caching"""
+        if not self.enabled:
+            return
+
+        cache_path = self.path_for(digest, variant)
+        temp_path = self.folder / f".{digest}.{uuid.uuid4().hex}.tmp"
+        try:
+            df.to_parquet(temp_path, index=False)
+            os.replace(temp_path, cache_path)
+            self.logger.info(f"Parsed export cached: {cache_path}")
+        except Exception as e:
+            temp_path.unlink(missing_ok=True)
+            self.logger.warning(f"Could not cache parsed export: {str(e)}")
+            return
+
+        self.evict()
+
+    def load(self, source, reader, digest: str = None) -> pd.DataFrame:
+        """Read a download through the cache - parses with reader only on a miss"""
+        if not self.enabled:
+            return reader.read(source)
+
+        digest = digest or self.content_hash(source)
+        variant = self.variant(reader)
+        start = time.perf_counter()
+        df = self.get(digest, variant)
+        if df is not None:
+            self.logger.info(f"Parsed cache hit {digest[:12]} ({len(df)} rows in {time.perf_counter() - start:.2f}s)")
+            return df
+
+        df = reader.read(source)
+        self.logger.info(f"Parsed {len(df)} rows with {reader.engine} in {time.perf_counter() - start:.2f}s")
+        self.put(digest, variant, df)
+        return df
+
+    def cached_row_count(self, source, reader) -> Optional[int]:
+        """Row count from the cache when the download was already parsed by this reader variant"""
+        if not self.enabled:
+            return None
+        df = self.get(self.content_hash(source), self.variant(reader))
+        return None if df is None else len(df)
+
+    def evict(self):
+        """Drop entries older than max_age_days, then oldest-used ones beyond max_size_mb"""
+        if not self.enabled:
+            return
+
+        try:
+            entries = [(p, p.stat()) for p in self.folder.glob("*.parquet")]
+            cutoff = time.time() - self.config["max_age_days"] * 86400
+
+            kept = []
+            for cache_path, stat in entries:
+                if stat.st_mtime < cutoff:
+                    cache_path.unlink(missing_ok=True)
+                    self.logger.info(f"Evicted expired parsed cache: {cache_path.name}")
+                else:
+                    kept.append((cache_path, stat))
+
+            max_bytes = self.config["max_size_mb"] * 1024 * 1024
+            total = sum(stat.st_size for _, stat in kept)
+            for cache_path, stat in sorted(kept, key=lambda entry: entry[1].st_mtime):
+                if total <= max_bytes:
+                    break
+                cache_path.unlink(missing_ok=True)
+                total -= stat.st_size
+                self.logger.info(f"Evicted parsed cache over size limit: {cache_path.name}")
+
+        except Exception as e:
+            self.logger.warning(f"Parsed cache eviction failed: {str(e)}")
@@ -0,0 +1,220 @@
+"""
+Content-addressed archive of raw export downloads
+Every download is stored once, compressed, under its SHA-256; an index maps export, date window and run to the blob
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import ExportConfig
+from .parsed_cache import ParsedExportCache
+from .run_state import RunStateStore
+
+try:
+    import zstandard
+except ImportError:  # Optional - blobs are gzip-compressed without it
+    zstandard = None
+
+# Background archiver so compression stays off the upload path; worker threads are joined at interpreter exit
+_archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw-archive")
+
+class RawExportArchive:
+    """Compressed blobs in {folder}/blobs/ plus index.json:
+
+    {"blobs": {sha256: {file, size, raw_size, stored_at}},
+     "exports": {export_type: {window: [{run_id, content_hash, archived_at}, ...]}}}
+
+    Identical downloads share one blob; the oldest blobs go first when the archive
+    grows beyond max_size_mb.
+    """
+
+    # One ID per process - every export archived by the same scheduler run shares it
+    RUN_ID = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+    # Concurrent exports archive from worker threads and share the index
+    _lock = threading.Lock()
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.RAW_ARCHIVE_CONFIG
+        self.folder = Path(self.config["folder"])
+        self.blob_folder = self.folder / "blobs"
+        self.index_file = self.folder / "index.json"
+        self.enabled = self.config.get("enabled", True)
+        self.codec = "zstd" if self.config["compression"] == "zstd" and zstandard is not None else "gzip"
+        self.logger = logging.getLogger(__name__)
+
+    def _load_index(self) -> Dict:
+        try:
+            if self.index_file.exists():
+                index = json.loads(self.index_file.read_text())
+                index.setdefault("blobs", {})
+                index.setdefault("exports", {})
+                return index
+        except Exception as e:
+            self.logger.warning(f"Could not read archive index: {str(e)}")
+        return {"blobs": {}, "exports": {}}
+
+    def _save_index(self, index: Dict):
+        temp_file = self.index_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(index, indent=2))
+        os.replace(temp_file, self.index_file)
+
+    @staticmethod
+    def _read_source(source) -> bytes:
+        if isinstance(source, (bytes, bytearray)):
+            return bytes(source)
+        if hasattr(source, "getbuffer"):
+            return bytes(source.getbuffer())
+        return Path(source).read_bytes()
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.config["zstd_level"]).compress(content)
+        return gzip.compress(content, compresslevel=6)
+
+    @staticmethod
+    def _decompress(blob_file: Path) -> bytes:
+        if blob_file.suffix == ".zst":
+            if zstandard is None:
+                raise Exception(f"{blob_file.name} is zstd-compressed but the zstandard package is not installed")
+            with open(blob_file, "rb") as fh:
+                return zstandard.ZstdDecompressor().stream_reader(fh).read()
+        return gzip.decompress(blob_file.read_bytes())
+
+    def store(self, export_type: str, source, start_date: str = None, end_date: str = None,
+              content_hash: str = None, run_id: str = None) -> Optional[str]:
+        """Archive a download (path, bytes or buffer); returns its content hash, or None when disabled/failed"""
+        if not self.enabled:
+            return None
+
+        try:
+            content_hash = content_hash or ParsedExportCache.content_hash(source)
+            run_id = run_id or self.RUN_ID
+            window = RunStateStore.window_key(start_date, end_date)
+
+            with self._lock:
+                index = self._load_index()
+                stored = content_hash in index["blobs"] and (self.blob_folder / index["blobs"][content_hash]["file"]).exists()
+
+            blob = None
+            if stored:
+                self.logger.info(f"Archive: {export_type} {window} identical to stored blob {content_hash[:12]} - not stored again")
+            else:
+                # Compress outside the lock - the blob name is the content hash, so a racing writer stores the same bytes
+                content = self._read_source(source)
+                compressed = self._compress(content)
+                blob_name = f"{content_hash}.{'zst' if self.codec == 'zstd' else 'gz'}"
+                self.blob_folder.mkdir(parents=True, exist_ok=True)
+                temp_file = self.blob_folder / f".{blob_name}.{uuid.uuid4().hex}.tmp"
+                temp_file.write_bytes(compressed)
+                os.replace(temp_file, self.blob_folder / blob_name)
+                blob = {
+                    "file": blob_name,
+                    "size": len(compressed),
+                    "raw_size": len(content),
+                    "stored_at": datetime.now().isoformat()
+                }
+                self.logger.info(f"Archive: stored {export_type} {window} as {blob_name} "
+                                 f"({len(content)} -> {len(compressed)} bytes, {self.codec})")
+
+            with self._lock:
+                index = self._load_index()
+                if blob is not None:
+                    index["blobs"][content_hash] = blob
+                runs = index["exports"].setdefault(export_type, {}).setdefault(window, [])
+                if not any(run["run_id"] == run_id and run["content_hash"] == content_hash for run in runs):
+                    runs.append({"run_id": run_id, "content_hash": content_hash, "archived_at": datetime.now().isoformat()})
+
+                self._enforce_retention(index)
+                self._save_index(index)
+            return content_hash
+
+        except Exception as e:
+            self.logger.warning(f"Could not archive {export_type} download: {str(e)}")
+            return None
+
+    def store_async(self, export_type: str, source, start_date: str = None, end_date: str = None,
+                    content_hash: str = None, run_id: str = None) -> Optional[Future]:
+        """Archive a download on the background archiver without blocking the caller; None when disabled"""
+        if not self.enabled:
+            return None
+
+        # Buffers may be read or closed by the upload meanwhile - hand the worker its own bytes
+        if not isinstance(source, (str, Path)):
+            source = self._read_source(source)
+        content_hash = content_hash or ParsedExportCache.content_hash(source)
+        run_id = run_id or self.RUN_ID
+        return _archive_executor.submit(self.store, export_type, source, start_date, end_date, content_hash, run_id)
+
+    def _enforce_retention(self, index: Dict):
+        """Delete least recently archived blobs (and their index entries) beyond max_size_mb"""
+        max_bytes = self.config["max_size_mb"] * 1024 * 1024
+        total = sum(blob["size"] for blob in index["blobs"].values())
+        if total <= max_bytes:
+            return
+
+        # A blob is as recent as the last run that archived it
+        last_archived = {}
+        for windows in index["exports"].values():
+            for runs in windows.values():
+                for run in runs:
+                    last_archived[run["content_hash"]] = max(last_archived.get(run["content_hash"], ""), run["archived_at"])
+
+        evicted = set()
+        for content_hash in sorted(index["blobs"], key=lambda h: last_archived.get(h, index["blobs"][h]["stored_at"])):
+            if total <= max_bytes:
+                break
+            blob = index["blobs"].pop(content_hash)
+            (self.blob_folder / blob["file"]).unlink(missing_ok=True)
+            total -= blob["size"]
+            evicted.add(content_hash)
+            self.logger.info(f"Archive: evicted {blob['file']} over size limit")
+
+        for export_type, windows in list(index["exports"].items()):
+            for window in list(windows):
+                windows[window] = [run for run in windows[window] if run["content_hash"] not in evicted]
+                if not windows[window]:
+                    del windows[window]
+            if not windows:
+                del index["exports"][export_type]
+
+    def runs(self, export_type: str, start_date: str = None, end_date: str = None) -> List[Dict]:
+        """Archived runs of one export window, oldest first"""
+        with self._lock:
+            index = self._load_index()
+        return index["exports"].get(export_type, {}).get(RunStateStore.window_key(start_date, end_date), [])
+
+    def lookup(self, export_type: str, start_date: str = None, end_date: str = None, run_id: str = None) -> Optional[Dict]:
+        """Index entry of the latest (or the given) run for a window, or None"""
+        runs = self.runs(export_type, start_date, end_date)
+        if run_id:
+            runs = [run for run in runs if run["run_id"] == run_id]
+        return runs[-1] if runs else None
+
+    def read(self, content_hash: str) -> bytes:
+        """Original download bytes of an archived blob"""
+        with self._lock:
+            blob = self._load_index()["blobs"].get(content_hash)
+        if blob is None:
+            raise Exception(f"Blob {content_hash[:12]} is not in the archive")
+        content = self._decompress(self.blob_folder / blob["file"])
+        if ParsedExportCache.content_hash(content) != content_hash:
+            raise Exception(f"Archived blob {blob['file']} is corrupted (hash mismatch)")
+        return content
+
+    def replay_source(self, export_type: str, start_date: str = None, end_date: str = None,
+                      run_id: str = None) -> Optional[io.BytesIO]:
+        """Archived download as an in-memory buffer the upload can read, or None when not archived"""
+        entry = self.lookup(export_type, start_date, end_date, run_id)
+        if entry is None:
+            return None
+        return io.BytesIO(self.read(entry["content_hash"]))
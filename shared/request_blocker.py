@@ -0,0 +1,163 @@
+"""
+Resource blocking for export pages in both browser engines
+Playwright uses page.route, Selenium uses CDP Network.setBlockedURLs
+"""
+
+import fnmatch
+import logging
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from .config import ExportConfig
+
+class RequestBlocker:
+    """Blocks images, fonts, CSS, analytics etc. and reports what was saved"""
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.REQUEST_BLOCKING_CONFIG
+        self.enabled = self.config.get("enabled", True)
+        self.backend_host = urlparse(ExportConfig.BACKEND_BASE_URL).hostname
+        self.logger = logging.getLogger(__name__)
+
+        # Statistics
+        self.blocked_counts: Dict[str, int] = {}
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+
+        # Selenium requestId -> resource type, filled from Network.requestWillBeSent
+        self._request_types: Dict[str, str] = {}
+
+    @staticmethod
+    def get_allowlist(export_type: str = None) -> List[str]:
+        """URL patterns that must never be blocked (one export, or all exports when None)"""
+        if export_type:
+            return ExportConfig.get_export_config(export_type).get("request_allowlist", [])
+
+        allowlist = []
+        for export_config in ExportConfig.EXPORTS.values():
+            allowlist.extend(export_config.get("request_allowlist", []))
+        return allowlist
+
+    @staticmethod
+    def _matches(url: str, pattern: str) -> bool:
+        """Match the full URL, or the URL without its query string / fragment (app.css?v=123 is *.css)"""
+        return fnmatch.fnmatch(url, pattern) or fnmatch.fnmatch(url.split("#", 1)[0].split("?", 1)[0], pattern)
+
+    @staticmethod
+    def _with_query_variants(patterns: List[str]) -> List[str]:
+        """CDP matches the full URL - every *.ext pattern also blocks *.ext?* (cache-busting query strings)"""
+        expanded = []
+        for pattern in patterns:
+            expanded.append(pattern)
+            if pattern.startswith("*.") and not pattern.endswith("*"):
+                expanded.append(f"{pattern}?*")
+        return expanded
+
+    def _is_allowlisted(self, url: str, allowlist: List[str]) -> bool:
+        return any(self._matches(url, pattern) for pattern in allowlist)
+
+    def should_block(self, url: str, resource_type: str, allowlist: List[str]) -> bool:
+        """Decide whether a request is unnecessary for the export forms"""
+        if self._is_allowlisted(url, allowlist):
+            return False
+
+        if resource_type in self.config["blocked_resource_types"]:
+            return True
+
+        if self.config.get("block_third_party_scripts") and resource_type == "script":
+            if urlparse(url).hostname != self.backend_host:
+                return True
+
+        return any(self._matches(url, pattern) for pattern in self.config["blocked_url_patterns"])
+
+    def _record_blocked(self, resource_type: str):
+        self.blocked_counts[resource_type] = self.blocked_counts.get(resource_type, 0) + 1
+
+    # ---- Playwright ----
+
+    async def attach_to_page(self, page, export_type: str = None):
+        """Install a route handler on a Playwright page"""
+        if not self.enabled:
+            return
+
+        allowlist = self.get_allowlist(export_type)
+
+        async def handle_route(route, request):
+            if self.should_block(request.url, request.resource_type, allowlist):
+                self._record_blocked(request.resource_type)
+                await route.abort()
+            else:
+                await route.continue_()
+
+        async def handle_finished(request):
+            self.allowed_requests += 1
+            try:
+                sizes = await request.sizes()
+                self.loaded_bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+            except Exception:
+                pass
+
+        await page.route("**/*", handle_route)
+        page.on("requestfinished", handle_finished)
+        self.logger.info(f"Request blocking enabled on page ({'all exports' if not export_type else export_type} allowlist: {len(allowlist)} patterns)")
+
+    # ---- Selenium ----
+
+    def apply_to_selenium(self, driver, export_type: str = None):
+        """Block URL patterns through Chrome DevTools; allowlisted patterns are removed from the blocklist"""
+        if not self.enabled:
+            return
+
+        allowlist = self.get_allowlist(export_type)
+        blocked_patterns = [
+            pattern for pattern in self._with_query_variants(
+                self.config["selenium_blocked_url_patterns"] + self.config["blocked_url_patterns"]
+            )
+            if not any(fnmatch.fnmatch(pattern, allowed) or pattern == allowed for allowed in allowlist)
+        ]
+
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns})
+            self.logger.info(f"Request blocking enabled via CDP ({len(blocked_patterns)} URL patterns)")
+        except Exception as e:
+            self.logger.warning(f"Could not enable CDP request blocking: {str(e)}")
+
+    def handle_cdp_event(self, method: str, params: Dict):
+        """CdpEventReader subscriber that collects blocked/loaded statistics"""
+        if method == "Network.requestWillBeSent":
+            self._request_types[params["requestId"]] = params.get("type", "Other").lower()
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            self._record_blocked(self._request_types.pop(params["requestId"], params.get("type", "other").lower()))
+        elif method == "Network.loadingFinished":
+            self._request_types.pop(params["requestId"], None)
+            self.allowed_requests += 1
+            self.loaded_bytes += int(params.get("encodedDataLength", 0))
+
+    # ---- Reporting ----
+
+    def get_stats(self) -> Dict:
+        """Blocked request counts plus an estimate of bytes saved"""
+        estimates = self.config["estimated_bytes_per_type"]
+        estimated_saved = sum(
+            count * estimates.get(resource_type, estimates["other"])
+            for resource_type, count in self.blocked_counts.items()
+        )
+        return {
+            "blocked_requests": sum(self.blocked_counts.values()),
+            "blocked_by_type": dict(self.blocked_counts),
+            "allowed_requests": self.allowed_requests,
+            "loaded_bytes": self.loaded_bytes,
+            "estimated_saved_bytes": estimated_saved
+        }
+
+    def log_report(self):
+        """Log how many requests and bytes the blocking profile saved"""
+        if not self.enabled:
+            return
+
+        stats = self.get_stats()
+        self.logger.info("=== Request Blocking Report ===")
+        self.logger.info(f"Blocked {stats['blocked_requests']} requests: {stats['blocked_by_type']}")
+        self.logger.info(f"Loaded {stats['allowed_requests']} requests, {stats['loaded_bytes'] / 1024:.1f} KB")
+        self.logger.info(f"Estimated savings: {stats['estimated_saved_bytes'] / 1024:.1f} KB")
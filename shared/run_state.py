@@ -0,0 +1,91 @@
+"""
+Run state between cron runs - last uploaded content per export and date window
+Lets an identical download skip parsing, validation and upload
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import ExportConfig
+
+class RunStateStore:
+    """JSON record of {export_type: {window: {content_hash, row_set_hash, records, uploaded_at}}}"""
+
+    # Concurrent exports upload from worker threads and share the file
+    _lock = threading.Lock()
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.RUN_STATE_CONFIG
+        self.state_file = Path(self.config["file"])
+        self.enabled = self.config.get("enabled", True)
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def window_key(start_date: str = None, end_date: str = None) -> str:
+        return f"{start_date or 'all'}_{end_date or 'all'}"
+
+    @staticmethod
+    def row_set_hash(df: pd.DataFrame) -> str:
+        """Order-independent hash of the header and the multiset of rows"""
+        return RunStateStore.row_set_hash_from(df.columns, pd.util.hash_pandas_object(df, index=False).to_numpy())
+
+    @staticmethod
+    def row_set_hash_from(columns, row_hashes: np.ndarray) -> str:
+        """row_set_hash from per-row uint64 hashes (lets chunked readers hash without the full frame)"""
+        digest = hashlib.sha256("\x1f".join(str(column) for column in columns).encode("utf-8"))
+        digest.update(np.sort(row_hashes).tobytes())
+        return digest.hexdigest()
+
+    def _load(self) -> Dict:
+        try:
+            if self.state_file.exists():
+                return json.loads(self.state_file.read_text())
+        except Exception as e:
+            self.logger.warning(f"Could not read run state: {str(e)}")
+        return {}
+
+    def get(self, export_type: str, start_date: str = None, end_date: str = None) -> Optional[Dict]:
+        """Last successful upload for this export and window"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._load().get(export_type, {}).get(self.window_key(start_date, end_date))
+
+    def record(self, export_type: str, start_date: str, end_date: str,
+               content_hash: str, row_set_hash: str, records: int):
+        """Remember what was uploaded (call only after the upload succeeded)"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            state = self._load()
+            windows = state.setdefault(export_type, {})
+            windows[self.window_key(start_date, end_date)] = {
+                "content_hash": content_hash,
+                "row_set_hash": row_set_hash,
+                "records": records,
+                "uploaded_at": datetime.now().isoformat()
+            }
+
+            # Keep the file small - old windows are never downloaded again
+            max_windows = self.config["max_windows_per_export"]
+            if len(windows) > max_windows:
+                for key in sorted(windows, key=lambda k: windows[k]["uploaded_at"])[:-max_windows]:
+                    del windows[key]
+
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.state_file.with_suffix(".tmp")
+                temp_file.write_text(json.dumps(state, indent=2))
+                os.replace(temp_file, self.state_file)
+            except Exception as e:
+                self.logger.warning(f"Could not write run state: {str(e)}")
@@ -0,0 +1,186 @@
+"""
+Persisted login state shared by the Selenium and Playwright engines
+Saves session cookies after a successful login and restores them on the next run
+"""
+
+import importlib.util
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from .config import ExportConfig
+
+class SessionCache:
+    """Stores backend session cookies on disk (optionally encrypted) between cron runs"""
+
+    def __init__(self, config: Dict = None):
+        self.config = config or ExportConfig.SESSION_CACHE_CONFIG
+        self.enabled = self.config.get("enabled", True)
+        self.cache_file = Path(self.config["file"])
+        self.encryption_key = self.config.get("encryption_key")
+        self.logger = logging.getLogger(__name__)
+
+        # Never fall back to a plaintext cache when encryption was asked for
+        if self.enabled and self.encryption_key and importlib.util.find_spec("cryptography") is None:
+            self.logger.error("SESSION_CACHE_KEY is set but the 'cryptography' package is not installed - "
+                              "session cache disabled (pip install cryptography)")
+            self.enabled = False
+
+    def _get_cipher(self):
+        """Get Fernet cipher when encryption at rest is configured"""
+        if not self.encryption_key:
+            return None
+
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            raise RuntimeError("SESSION_CACHE_KEY is set but the 'cryptography' package is not installed")
+
+        return Fernet(self.encryption_key.encode() if isinstance(self.encryption_key, str) else self.encryption_key)
+
+    def save_storage_state(self, storage_state: Dict) -> bool:
+        """Save Playwright storage state (the canonical on-disk format)"""
+        if not self.enabled:
+            return False
+
+        try:
+            payload = json.dumps({"saved_at": time.time(), "storage_state": storage_state}).encode("utf-8")
+
+            cipher = self._get_cipher()
+            if cipher:
+                payload = cipher.encrypt(payload)
+
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cache_file.with_suffix(".tmp")
+            temp_file.write_bytes(payload)
+            os.chmod(temp_file, 0o600)
+            os.replace(temp_file, self.cache_file)
+
+            self.logger.info(f"Session state saved to {self.cache_file} ({'encrypted' if cipher else 'plain'})")
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"Could not save session state: {str(e)}")
+            return False
+
+    def save_cookies(self, cookies: List[Dict]) -> bool:
+        """Save Selenium cookies (converted to Playwright storage state format)"""
+        return self.save_storage_state({"cookies": self.selenium_to_storage_cookies(cookies), "origins": []})
+
+    def load(self) -> Optional[Dict]:
+        """Load cached storage state, or None if missing, expired or unreadable"""
+        if not self.enabled or not self.cache_file.exists():
+            return None
+
+        try:
+            payload = self.cache_file.read_bytes()
+
+            cipher = self._get_cipher()
+            if cipher:
+                payload = cipher.decrypt(payload)
+
+            cached = json.loads(payload.decode("utf-8"))
+            age_hours = (time.time() - cached.get("saved_at", 0)) / 3600
+
+            if age_hours > self.config.get("max_age_hours", 24):
+                self.logger.info(f"Cached session is {age_hours:.1f} hours old - ignoring")
+                return None
+
+            self.logger.info(f"Loaded cached session state ({age_hours:.1f} hours old)")
+            return cached["storage_state"]
+
+        except Exception as e:
+            self.logger.warning(f"Could not load cached session state: {str(e)}")
+            return None
+
+    def clear(self):
+        """Remove the cached session (e.g. after the backend rejected it)"""
+        try:
+            if self.cache_file.exists():
+                self.cache_file.unlink()
+                self.logger.info("Cached session state cleared")
+        except Exception as e:
+            self.logger.warning(f"Could not clear cached session state: {str(e)}")
+
+    def probe(self, storage_state: Dict) -> bool:
+        """Validate cached cookies with one authenticated request (no browser needed)"""
+        if not storage_state or not storage_state.get("cookies"):
+            return False
+
+        try:
+            session = requests.Session()
+            for cookie in storage_state["cookies"]:
+                session.cookies.set(
+                    cookie["name"], cookie["value"],
+                    domain=cookie.get("domain"), path=cookie.get("path", "/")
+                )
+
+            response = session.get(
+                self.config["probe_url"],
+                allow_redirects=False,
+                timeout=self.config.get("probe_timeout", 15)
+            )
+
+            # An expired session is redirected to the login page
+            location = response.headers.get("Location", "")
+            is_valid = response.status_code == 200 and "login" not in response.url.lower() and "login" not in location.lower()
+
+            self.logger.info(f"Session probe: HTTP {response.status_code} - {'valid' if is_valid else 'expired'}")
+            return is_valid
+
+        except Exception as e:
+            self.logger.warning(f"Session probe failed: {str(e)}")
+            return False
+
+    def load_valid(self) -> Optional[Dict]:
+        """Load cached state and return it only if the probe confirms it is still logged in"""
+        storage_state = self.load()
+        if storage_state and self.probe(storage_state):
+            return storage_state
+
+        if storage_state:
+            self.clear()
+        return None
+
+    @staticmethod
+    def selenium_to_storage_cookies(cookies: List[Dict]) -> List[Dict]:
+        """Convert Selenium get_cookies() output to Playwright storage state cookies"""
+        converted = []
+        for cookie in cookies:
+            converted.append({
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain", ""),
+                "path": cookie.get("path", "/"),
+                "expires": cookie.get("expiry", -1),
+                "httpOnly": cookie.get("httpOnly", False),
+                "secure": cookie.get("secure", False),
+                "sameSite": cookie.get("sameSite", "Lax")
+            })
+        return converted
+
+    @staticmethod
+    def storage_to_cdp_cookies(storage_state: Dict) -> List[Dict]:
+        """Convert storage state cookies to Chrome DevTools Network.setCookies parameters"""
+        converted = []
+        for cookie in storage_state.get("cookies", []):
+            cdp_cookie = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain", ""),
+                "path": cookie.get("path", "/"),
+                "httpOnly": cookie.get("httpOnly", False),
+                "secure": cookie.get("secure", False)
+            }
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                cdp_cookie["sameSite"] = cookie["sameSite"]
+            expires = cookie.get("expires", -1)
+            if expires and expires > 0:
+                cdp_cookie["expires"] = expires
+            converted.append(cdp_cookie)
+        return converted
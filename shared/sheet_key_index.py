@@ -0,0 +1,373 @@
+"""
+Persistent key index per destination sheet
+Composite key -> sheet row, row hash and content digest in SQLite, so uploads dedupe and
+detect changed rows without reading the whole sheet
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import ExportConfig
+from .streaming_upload import sheet_records_parser
+
+class SheetKeyIndex:
+    """One SQLite file per export: rows(row, key, row_hash, digest) plus meta (header, dtypes, used_rows, ...)
+
+    Keys are exactly those DataValidator builds from DataFrame(sheet.get_all_records()).
+    digest is DataValidator.row_digests over the row's normalized cells: a new row with the
+    same key but another digest changed in the backend since it was uploaded.
+    A full read (reconcile) rebuilds the index; appended rows are read back - only their
+    range - and added. Before the index is trusted, one batch read of the header, the
+    last row, the row after it and a random sample of rows must match; any difference
+    (a manual edit) or an index older than reconcile_hours triggers a full reconcile.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, key TEXT NOT NULL, row_hash TEXT NOT NULL, digest INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS rows_key ON rows (key)",
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    )
+    LOOKUP_BATCH = 500  # Keys per "IN (...)" query (below SQLite's variable limit)
+    DIGEST_VERSION = "digest-1"  # Bump when DataValidator.row_digests normalizes cells differently
+
+    def __init__(self, sheets_manager, validator, config: Dict = None):
+        self.sheets_manager = sheets_manager
+        self.validator = validator
+        self.config = config or ExportConfig.SHEET_KEY_INDEX_CONFIG
+        self.enabled = self.config.get("enabled", True)
+        self.path = Path(self.config["folder"]) / f"{sheets_manager.export_type}.sqlite"
+        # Keys built with other key columns (or rows without digests) are useless - a change forces a rebuild
+        self.key_signature = [validator.unique_key, validator.composite_key_columns, self.DIGEST_VERSION]
+        self.reconciled = False  # Set once reconcile() rebuilt the index in this run
+        self.logger = logging.getLogger(__name__)
+
+    # ---- Storage ----
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    def _meta(self) -> Dict:
+        with closing(self._connect()) as connection:
+            return {name: json.loads(value) for name, value in connection.execute("SELECT name, value FROM meta")}
+
+    @staticmethod
+    def _set_meta(connection: sqlite3.Connection, **values):
+        connection.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [(name, json.dumps(value)) for name, value in values.items()]
+        )
+
+    @staticmethod
+    def row_hash(row: List, width: int) -> str:
+        """Hash of a sheet row's displayed cells, padded/truncated to the header width"""
+        cells = (list(row) + [""] * width)[:width]
+        return hashlib.blake2b("\x1f".join(map(str, cells)).encode("utf-8"), digest_size=8).hexdigest()
+
+    def row_digests(self, rows: List[list], width: int) -> List[int]:
+        """Content digests of sheet rows (displayed cells, padded/truncated to the header width)"""
+        cells = pd.DataFrame([(list(row) + [""] * width)[:width] for row in rows], columns=range(width), dtype=object)
+        return self.validator.row_digests(cells).tolist()
+
+    def digests_for(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Digests of a cleaned upload frame in sheet column order, or None when its columns are not the sheet's"""
+        header = self._meta().get("header", [])
+        if len(set(header)) != len(header) or set(df.columns) != set(header) or len(df.columns) != len(header):
+            self.logger.info("KEY INDEX: upload columns differ from the sheet header - changed rows are not detected")
+            return None
+        return self.validator.row_digests(df[header])
+
+    @property
+    def used_rows(self) -> int:
+        """Header plus data rows the index covers (0 = empty sheet)"""
+        return self._meta().get("used_rows", 0)
+
+    def invalidate(self, reason: str):
+        """Force a full reconcile on the next upload"""
+        if not self.enabled:
+            return
+        try:
+            with closing(self._connect()) as connection, connection:
+                self._set_meta(connection, stale=reason)
+            self.logger.info(f"KEY INDEX: {self.sheets_manager.export_type} invalidated ({reason})")
+        except Exception as e:
+            self.logger.warning(f"Could not invalidate key index {self.path}: {str(e)}")
+
+    # ---- Trust checks ----
+
+    def is_current(self, sheet) -> bool:
+        """True when uploads may dedupe against the index without reading the sheet"""
+        if not self.enabled:
+            return False
+
+        try:
+            meta = self._meta()
+            if not meta.get("reconciled_at"):
+                return False
+            if meta.get("stale"):
+                self.logger.info(f"KEY INDEX: stale ({meta['stale']}) - reconciling with the sheet")
+                return False
+            if meta.get("key_signature") != self.key_signature:
+                self.logger.info("KEY INDEX: key columns changed - reconciling with the sheet")
+                return False
+            if datetime.now() - datetime.fromisoformat(meta["reconciled_at"]) > timedelta(hours=self.config["reconcile_hours"]):
+                self.logger.info(f"KEY INDEX: last reconciled {meta['reconciled_at']} - periodic reconcile")
+                return False
+            return self._probe(sheet, meta)
+        except Exception as e:
+            self.logger.warning(f"KEY INDEX: check failed ({str(e)}) - reconciling with the sheet")
+            return False
+
+    def _probe(self, sheet, meta: Dict) -> bool:
+        """One batch read: header, sampled rows, the last indexed row and the row after it"""
+        header = meta["header"]
+        used_rows = meta["used_rows"]
+        with closing(self._connect()) as connection:
+            sampled = [row for (row,) in connection.execute(
+                "SELECT row FROM rows ORDER BY RANDOM() LIMIT ?", (self.config["probe_sample_rows"],)
+            )]
+            rows = sorted(set(sampled) | ({used_rows} if used_rows > 1 else set()))
+            expected = dict(connection.execute(
+                f"SELECT row, row_hash FROM rows WHERE row IN ({','.join('?' * len(rows))})", rows
+            )) if rows else {}
+
+        ranges = ["1:1"] + [f"{row}:{row}" for row in rows] + [f"{used_rows + 1}:{used_rows + 1}"]
+        results = self.sheets_manager._execute_with_retry("Probe sheet for key index", lambda: sheet.batch_get(ranges))
+        values = [list(result[0]) if result else [] for result in results]
+
+        def trimmed(cells):
+            cells = list(cells)
+            while cells and cells[-1] == "":
+                cells.pop()
+            return cells
+
+        if trimmed(values[0]) != trimmed(header):
+            self.logger.info("KEY INDEX: sheet header changed - reconciling with the sheet")
+            return False
+        for row, cells in zip(rows, values[1:-1]):
+            if self.row_hash(cells, len(header)) != expected.get(row):
+                self.logger.info(f"KEY INDEX: row {row} edited in the sheet - reconciling with the sheet")
+                return False
+        if any(cell != "" for cell in values[-1]):
+            self.logger.info(f"KEY INDEX: rows added after row {used_rows} outside this automation - reconciling with the sheet")
+            return False
+        return True
+
+    # ---- Updates ----
+
+    def reconcile(self, sheet) -> Optional[pd.DataFrame]:
+        """Read the whole sheet once, rebuild the index and return the sheet as get_all_records() would
+
+        Returns None when the sheet could not be read (the caller falls back to its own read).
+        """
+        try:
+            values = self.sheets_manager._execute_with_retry("Read existing sheet data", lambda: sheet.get_all_values())
+        except Exception as e:
+            self.logger.warning(f"Could not read existing sheet data: {str(e)}")
+            return None
+
+        header = values[0] if values else []
+        rows = values[1:]
+        existing_df = sheet_records_parser(header)(rows, ()) if rows else pd.DataFrame()
+        self.logger.info(f"Read {len(existing_df)} existing records from sheet")
+
+        if not self.enabled:
+            return existing_df
+
+        try:
+            keys = self.validator.create_composite_key(existing_df).astype(str).tolist() if rows else []
+            with closing(self._connect()) as connection, connection:
+                # Recreated - an index from before a schema change has fewer columns
+                connection.execute("DROP TABLE IF EXISTS rows")
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+                connection.executemany(
+                    "INSERT INTO rows (row, key, row_hash, digest) VALUES (?, ?, ?, ?)",
+                    ((number, key, self.row_hash(row, len(header)), digest) for number, key, row, digest
+                     in zip(range(2, len(rows) + 2), keys, rows, self.row_digests(rows, len(header))))
+                )
+                connection.execute("DELETE FROM meta")
+                self._set_meta(
+                    connection,
+                    header=header,
+                    dtypes={str(column): str(dtype) for column, dtype in existing_df.dtypes.items()},
+                    row_dtype=str(existing_df.iloc[:0].to_numpy().dtype) if rows else "object",
+                    used_rows=len(rows) + 1 if header else 0,
+                    key_signature=self.key_signature,
+                    reconciled_at=datetime.now().isoformat()
+                )
+            self.reconciled = True
+            self.logger.info(f"KEY INDEX: rebuilt {self.path} with {len(rows)} sheet rows")
+        except Exception as e:
+            self.logger.warning(f"Could not rebuild key index {self.path}: {str(e)}")
+        return existing_df
+
+    def lookup(self, keys: pd.Series) -> Dict[str, tuple]:
+        """key -> (sheet row, digest) for keys already in the sheet (the last row when a key repeats)"""
+        unique_keys = list(dict.fromkeys(str(key) for key in keys))
+        found = {}
+        with closing(self._connect()) as connection:
+            for start in range(0, len(unique_keys), self.LOOKUP_BATCH):
+                batch = unique_keys[start:start + self.LOOKUP_BATCH]
+                for key, row, digest in connection.execute(
+                    f"SELECT key, MAX(row), digest FROM rows WHERE key IN ({','.join('?' * len(batch))}) GROUP BY key", batch
+                ):
+                    found[key] = (row, digest)
+        return found
+
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        """Boolean mask of keys already in the sheet"""
+        found = self.lookup(keys)
+        return np.fromiter((str(key) in found for key in keys), dtype=bool, count=len(keys))
+
+    def match(self, keys: pd.Series, digests: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Masks of keys already in the sheet and of those whose row digest differs (changed rows),
+        plus the sheet row of every key (0 when not in the sheet)"""
+        found = self.lookup(keys)
+        entries = [found.get(str(key)) for key in keys]
+        is_duplicate = np.fromiter((entry is not None for entry in entries), dtype=bool, count=len(entries))
+        sheet_rows = np.fromiter((entry[0] if entry else 0 for entry in entries), dtype=np.int64, count=len(entries))
+        is_changed = np.zeros(len(entries), dtype=bool)
+        if digests is not None:
+            indexed = np.fromiter((entry[1] if entry else 0 for entry in entries), dtype=np.int64, count=len(entries))
+            is_changed = is_duplicate & (indexed != digests)
+
+        changed = np.flatnonzero(is_changed)
+        if changed.size:
+            sample = ", ".join(str(keys.iloc[position]) for position in changed[:3])
+            self.logger.info(f"KEY INDEX: {changed.size} rows changed since they were uploaded (e.g. {sample})")
+        return is_duplicate, is_changed, sheet_rows
+
+    def _parse_appended(self, rows: List[list], meta: Dict) -> Optional[pd.DataFrame]:
+        """Read-back rows as a full-sheet read would type them, or None if existing keys would change
+
+        A full read infers one dtype per column over the whole sheet: new rows can turn a column
+        into object (existing numbers keep their text) but int -> float would rewrite every key.
+        """
+        if meta["row_dtype"] != "object":
+            return None  # All-numeric sheet - any change of the common dtype changes every key
+
+        parse = sheet_records_parser(meta["header"])
+        frame = parse(rows, ())
+        dtypes = meta["dtypes"]
+        object_columns = []
+        float_columns = []
+        for column in frame.columns:
+            stored = dtypes.get(str(column))
+            dtype = frame[column].dtype
+            if stored is None:
+                return None
+            if str(dtype) == stored:
+                continue
+            if stored in ("object", "str", "string") or dtype == object or isinstance(dtype, pd.StringDtype):
+                dtypes[str(column)] = "object"  # Mixed text and numbers
+                object_columns.append(column)
+            elif stored == "float64" and dtype.kind == "i":
+                float_columns.append(column)
+            else:
+                return None
+
+        if object_columns:
+            frame = parse(rows, tuple(object_columns))
+        for column in float_columns:
+            frame[column] = frame[column].astype("float64")
+        # Keys of the full sheet are built from object rows
+        return frame.astype(object)
+
+    @staticmethod
+    def row_blocks(rows: List[int]) -> List[tuple]:
+        """Sorted sheet rows as (first, last) runs of consecutive rows"""
+        blocks = []
+        for row in sorted(set(rows)):
+            if blocks and row == blocks[-1][1] + 1:
+                blocks[-1][1] = row
+            else:
+                blocks.append([row, row])
+        return [tuple(block) for block in blocks]
+
+    def record_update(self, sheet, rows: List[int]):
+        """Refresh row hashes and digests of rows rewritten in place (keys are unchanged)"""
+        if not self.enabled or not rows:
+            return
+
+        try:
+            meta = self._meta()
+            if not meta.get("reconciled_at") or meta.get("stale"):
+                return  # The next upload reconciles anyway
+            if meta["row_dtype"] != "object":
+                # All-numeric sheet - new cell text could change the common dtype and with it every key
+                self.invalidate("rows updated in an all-numeric sheet")
+                return
+
+            # Read back (one batch_get per read_back_ranges runs) so hashes match what the sheet displays
+            blocks = self.row_blocks(rows)
+            header = meta["header"]
+            updates = []
+            step = self.config["read_back_ranges"]
+            for start in range(0, len(blocks), step):
+                batch = blocks[start:start + step]
+                results = self.sheets_manager._execute_with_retry(
+                    f"Read back {len(batch)} updated row ranges",
+                    lambda: sheet.batch_get([f"{first}:{last}" for first, last in batch])
+                )
+                for (first, last), result in zip(batch, results):
+                    # The API omits trailing empty rows
+                    block_rows = [list(row) for row in result] + [[] for _ in range(last - first + 1 - len(result))]
+                    updates.extend(
+                        (self.row_hash(row, len(header)), digest, number) for number, row, digest
+                        in zip(range(first, last + 1), block_rows, self.row_digests(block_rows, len(header)))
+                    )
+
+            with closing(self._connect()) as connection, connection:
+                connection.executemany("UPDATE rows SET row_hash = ?, digest = ? WHERE row = ?", updates)
+            self.logger.info(f"KEY INDEX: refreshed {len(updates)} updated rows")
+        except Exception as e:
+            self.logger.warning(f"Could not update key index: {str(e)}")
+            self.invalidate("updated rows not recorded")
+
+    def record_append(self, sheet, first_row: int, count: int):
+        """Add rows just appended at first_row.. (read back so their keys match a full read)"""
+        if not self.enabled or count == 0:
+            return
+
+        try:
+            meta = self._meta()
+            if not meta.get("reconciled_at") or meta.get("stale"):
+                return  # The next upload reconciles anyway
+
+            last_row = first_row + count - 1
+            rows = self.sheets_manager._execute_with_retry(
+                f"Read back rows {first_row}-{last_row}", lambda: sheet.get(f"{first_row}:{last_row}")
+            )
+            # The API omits trailing empty rows
+            rows = [list(row) for row in rows] + [[] for _ in range(count - len(rows))]
+            header = meta["header"]
+            frame = self._parse_appended(rows, meta)
+            if frame is None:
+                self.invalidate("column types changed by appended rows")
+                return
+
+            keys = self.validator.create_composite_key(frame).astype(str).tolist()
+            with closing(self._connect()) as connection, connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO rows (row, key, row_hash, digest) VALUES (?, ?, ?, ?)",
+                    ((number, key, self.row_hash(row, len(header)), digest) for number, key, row, digest
+                     in zip(range(first_row, last_row + 1), keys, rows, self.row_digests(rows, len(header))))
+                )
+                self._set_meta(connection, dtypes=meta["dtypes"], used_rows=max(meta["used_rows"], last_row))
+            self.logger.info(f"KEY INDEX: added rows {first_row}-{last_row}")
+        except Exception as e:
+            self.logger.warning(f"Could not update key index: {str(e)}")
+            self.invalidate("appended rows not recorded")
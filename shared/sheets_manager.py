@@ -4,13 +4,23 @@ Google Sheets management with smart validation for all export types
 
 import pandas as pd
 import gspread
+import json
 import logging
 import time
 import random
 import requests
+from pathlib import Path
 from google.oauth2.service_account import Credentials
 from .data_validator import DataValidator
 from .config import ExportConfig
+from .excel_reader import ExcelReader
+from .export_schema import ExportSchema
+from .sheets_serializer import SheetsSerializer
+from .parsed_cache import ParsedExportCache
+from .raw_archive import RawExportArchive
+from .run_state import RunStateStore
+from .sheet_key_index import SheetKeyIndex
+from .streaming_upload import StreamingSheetUploader, peak_rss_mb
 
 class SheetsManager:
     """Manages Google Sheets operations with smart validation"""
@@ -22,6 +32,14 @@ class SheetsManager:
 
         # Get retry configuration
         self.retry_config = ExportConfig.GOOGLE_SHEETS_RETRY_CONFIG
+        self.schema = ExportSchema(export_type)
+        self.excel_reader = ExcelReader(schema=self.schema)
+        self.serializer = SheetsSerializer(self.schema)
+        self.parsed_cache = ParsedExportCache()
+        self.run_state = RunStateStore()
+        self.archive = RawExportArchive()
+        self.streaming_config = ExportConfig.STREAMING_UPLOAD_CONFIG
+        self.row_update_config = ExportConfig.ROW_UPDATE_CONFIG
 
         # Initialize Google Sheets client
         self._setup_google_client()
@@ -130,25 +148,47 @@ class SheetsManager:
         # This should never be reached, but just in case
         raise Exception(f"{operation_name}: Unexpected retry loop exit")
     
-    def upload_with_smart_validation(self, file_path, use_smart_validation=True):
-        """Upload data with smart validation and duplicate detection"""
+    @staticmethod
+    def _describe_source(source) -> str:
+        """Log-friendly name of an upload source"""
+        if isinstance(source, pd.DataFrame):
+            return f"<merged date windows, {len(source)} rows>"
+        if isinstance(source, (bytes, bytearray)):
+            return f"<in-memory export, {len(source)} bytes>"
+        if hasattr(source, "getbuffer"):
+            return f"<in-memory export, {source.getbuffer().nbytes} bytes>"
+        return str(source)
+
+    def upload_with_smart_validation(self, file_path, use_smart_validation=True, start_date=None, end_date=None,
+                                     skip_unchanged=True):
+        """Upload data with smart validation and duplicate detection
+
+        file_path may also be the export's raw bytes or a BytesIO (in-memory capture),
+        or an already parsed DataFrame (date windows merged by WindowedExportFetcher).
+        With start_date/end_date the upload is skipped ("unchanged") when this window's
+        download matches the last successful upload, unless skip_unchanged is False (replay).
+        """
         self.logger.info(f"Uploading {self.export_config['name']} with smart validation...")
+        in_memory = not isinstance(file_path, (str, Path))
 
         # TEMPORARY: Skip Google Sheets upload to test backend automation
         import os
         if os.getenv('SKIP_GOOGLE_SHEETS') == 'true':
             self.logger.info(f"TEMPORARY: Skipping Google Sheets upload for {self.export_config['name']} - backend testing mode")
-            self.logger.info(f"File downloaded successfully: {file_path}")
+            self.logger.info(f"File downloaded successfully: {self._describe_source(file_path)}")
             # Verify file exists and get record count
-            from pathlib import Path
-            if Path(file_path).exists():
-                file_size = Path(file_path).stat().st_size
-                self.logger.info(f"✅ SUCCESS: Downloaded {file_size} bytes to {file_path}")
+            if in_memory or Path(file_path).exists():
+                if not in_memory:
+                    file_size = Path(file_path).stat().st_size
+                    self.logger.info(f"✅ SUCCESS: Downloaded {file_size} bytes to {file_path}")
 
-                # Get record count from file
+                # Count rows from the parsed cache, or straight from the workbook - no DataFrame needed
                 try:
-                    df = pd.read_excel(file_path)
-                    record_count = len(df)
+                    if isinstance(file_path, pd.DataFrame):
+                        return {"success": True, "records": len(file_path)}
+                    record_count = self.parsed_cache.cached_row_count(file_path, self.excel_reader)
+                    if record_count is None:
+                        record_count = self.excel_reader.count_rows(file_path)
                     self.logger.info(f"File contains {record_count} data rows")
                     return {"success": True, "records": record_count}
                 except Exception as e:
@@ -159,14 +199,30 @@ class SheetsManager:
                 return {"success": False, "records": 0}
 
         try:
-            # Open Google Sheet with retry mechanism
-            sheet = self._execute_with_retry(
-                "Open Google Sheet",
-                lambda: self.gc.open_by_url(self.export_config["google_sheet_url"]).sheet1
-            )
+            # Byte-identical to the last upload of this window - nothing to do
+            # (a merged DataFrame has no download bytes - its row-set hash stands in)
+            if isinstance(file_path, pd.DataFrame):
+                content_hash = self.run_state.row_set_hash(file_path)
+            else:
+                content_hash = self.parsed_cache.content_hash(file_path)
+                # Keep the raw download for replay (merged windows were archived window by window)
+                self.archive.store_async(self.export_type, file_path, start_date, end_date, content_hash=content_hash)
+            track_state = bool(use_smart_validation and (start_date or end_date) and self.run_state.enabled)
+            previous = self.run_state.get(self.export_type, start_date, end_date) if track_state and skip_unchanged else None
+            if previous and previous["content_hash"] == content_hash:
+                self.logger.info(f"UNCHANGED: {self.export_config['name']} download identical to last upload ({previous['uploaded_at']}) - skipping")
+                return {"success": True, "records": previous["records"], "status": "unchanged"}
             
-            # Read Excel file
-            new_df = pd.read_excel(file_path)
+            if use_smart_validation and self._use_streaming(file_path):
+                return self._upload_streaming(file_path, content_hash, track_state, previous, start_date, end_date)
+            
+            # Read Excel file (or in-memory buffer) - parsed once, then served from the Parquet cache
+            if isinstance(file_path, pd.DataFrame):
+                new_df = file_path
+            else:
+                new_df = self.parsed_cache.load(file_path, self.excel_reader, digest=content_hash)
+            # No-op for frames the reader already typed (merged windows and older cache entries are not)
+            new_df = self.schema.apply(new_df)
             
             # Debug file content
             self.logger.info(f"File analysis: {len(new_df)} rows, {len(new_df.columns)} columns")
@@ -191,6 +247,19 @@ class SheetsManager:
             
             self.logger.info(f"New data loaded: {len(new_df)} rows, {len(new_df.columns)} columns")
             
+            # Different bytes but the same rows (e.g. regenerated workbook metadata)
+            row_set_hash = self.run_state.row_set_hash(new_df) if track_state else None
+            if previous and previous["row_set_hash"] == row_set_hash:
+                self.logger.info(f"UNCHANGED: {self.export_config['name']} rows identical to last upload - skipping validation and upload")
+                self.run_state.record(self.export_type, start_date, end_date, content_hash, row_set_hash, len(new_df))
+                return {"success": True, "records": len(new_df), "status": "unchanged"}
+            
+            # Open Google Sheet with retry mechanism
+            sheet = self._execute_with_retry(
+                "Open Google Sheet",
+                lambda: self.gc.open_by_url(self.export_config["google_sheet_url"]).sheet1
+            )
+            
             # Clean data for JSON compliance
             new_df = self._clean_data_for_json(new_df)
             
@@ -199,29 +268,49 @@ class SheetsManager:
                 unique_key = self.export_config.get("unique_key", "ID")
                 composite_key_columns = self.export_config.get("composite_key_columns", None)
                 validator = DataValidator(unique_key=unique_key, composite_key_columns=composite_key_columns)
+                key_index = SheetKeyIndex(self, validator)
                 
-                # Read existing sheet data with retry mechanism
-                existing_df = self._execute_with_retry(
-                    "Read existing sheet data",
-                    lambda: validator.read_existing_sheet_data(sheet)
-                )
+                use_index = key_index.is_current(sheet)
+                if use_index:
+                    # Keys, row count and a probe of the sheet from the local index - the sheet is not read
+                    existing_df = None
+                    existing_rows = max(key_index.used_rows - 1, 0)
+                    self.logger.info(f"KEY INDEX: deduplicating against {existing_rows} indexed sheet rows")
+                else:
+                    # Read existing sheet data (rebuilding the key index) with retry mechanism
+                    existing_df = key_index.reconcile(sheet) if key_index.enabled else None
+                    if existing_df is None:
+                        existing_df = self._execute_with_retry(
+                            "Read existing sheet data",
+                            lambda: validator.read_existing_sheet_data(sheet)
+                        )
+                    existing_rows = len(existing_df)
+                    # A freshly rebuilt index holds the same keys plus row digests
+                    use_index = key_index.reconciled
                 
-                if not existing_df.empty:
+                if existing_rows > 0:
                     # Prepare smart upload data
-                    upload_plan = validator.prepare_smart_upload_data(
-                        new_df, existing_df, handle_duplicates="skip"
-                    )
+                    if use_index:
+                        # Changed rows from stored row digests - no other sheet column is needed
+                        existing_df = None
+                        new_keys = validator.create_composite_key(new_df).astype(str)
+                        is_duplicate, is_changed, sheet_rows = key_index.match(new_keys, key_index.digests_for(new_df))
+                        upload_plan = validator.prepare_indexed_upload_data(new_df, is_duplicate, is_changed, sheet_rows)
+                    else:
+                        upload_plan = validator.prepare_smart_upload_data(
+                            new_df, existing_df, handle_duplicates="skip"
+                        )
                     
                     # Log upload plan
                     self.logger.info("Smart upload plan:")
                     for operation in upload_plan["operations"]:
                         self.logger.info(f"  - {operation}")
                     
-                    # Execute smart upload with retry mechanism
-                    self._execute_with_retry(
-                        "Execute smart upload",
-                        lambda: self._execute_smart_upload(sheet, upload_plan, existing_df)
-                    )
+                    # Execute smart upload - the append and every batchUpdate retry on their own,
+                    # so a failed update never repeats a finished append
+                    updated_rows = self._execute_smart_upload(sheet, upload_plan, existing_rows)
+                    key_index.record_append(sheet, existing_rows + 2, len(upload_plan["append_data"]))
+                    key_index.record_update(sheet, updated_rows)
                 else:
                     # Empty sheet - do normal upload
                     self.logger.info("Sheet is empty - performing initial upload")
@@ -229,6 +318,7 @@ class SheetsManager:
                         "Initial upload to empty sheet",
                         lambda: self._upload_all_data(sheet, new_df)
                     )
+                    key_index.invalidate("initial upload")
             else:
                 # SAFETY CHANGE: Warn before destructive operation
                 self.logger.warning("DESTRUCTIVE MODE: This will clear all existing data!")
@@ -242,9 +332,15 @@ class SheetsManager:
                     "Upload all data (destructive)",
                     lambda: self._upload_all_data(sheet, new_df)
                 )
+                SheetKeyIndex(self, DataValidator(
+                    unique_key=self.export_config.get("unique_key", "ID"),
+                    composite_key_columns=self.export_config.get("composite_key_columns", None)
+                )).invalidate("sheet cleared and rewritten")
             
             self.logger.info(f"Data uploaded to Google Sheets successfully for {self.export_config['name']}!")
-            return {"success": True, "records": len(new_df)}
+            if track_state:
+                self.run_state.record(self.export_type, start_date, end_date, content_hash, row_set_hash, len(new_df))
+            return {"success": True, "records": len(new_df), "status": "uploaded"}
 
         except Exception as e:
             self.logger.error(f"Google Sheets upload failed for {self.export_config['name']}: {str(e)}")
@@ -257,17 +353,53 @@ class SheetsManager:
             else:
                 raise
     
+    def _use_streaming(self, source) -> bool:
+        """Stream when enabled, or when the download is too large to hold comfortably in memory"""
+        if isinstance(source, pd.DataFrame):
+            return False  # Already parsed and in memory
+        size = len(source) if isinstance(source, (bytes, bytearray)) else (
+            source.getbuffer().nbytes if hasattr(source, "getbuffer") else Path(source).stat().st_size
+        )
+        return self.streaming_config["enabled"] or size > self.streaming_config["auto_above_mb"] * 1024 * 1024
+
+    def _upload_streaming(self, source, content_hash, track_state, previous, start_date, end_date):
+        """Chunked dedupe-and-append upload; memory is bounded by chunk size and the key set"""
+        self.logger.info(f"STREAMING UPLOAD: {self.export_config['name']} from {self._describe_source(source)}")
+
+        sheet = self._execute_with_retry(
+            "Open Google Sheet",
+            lambda: self.gc.open_by_url(self.export_config["google_sheet_url"]).sheet1
+        )
+        validator = DataValidator(
+            unique_key=self.export_config.get("unique_key", "ID"),
+            composite_key_columns=self.export_config.get("composite_key_columns", None)
+        )
+
+        result = StreamingSheetUploader(self, validator).upload(
+            source, sheet, self.excel_reader,
+            previous_row_set_hash=previous["row_set_hash"] if previous else None
+        )
+        rss = peak_rss_mb()
+
+        if result["unchanged"]:
+            self.logger.info(f"UNCHANGED: {self.export_config['name']} rows identical to last upload - skipping validation and upload")
+            self.run_state.record(self.export_type, start_date, end_date, content_hash, result["row_set_hash"], result["records"])
+            return {"success": True, "records": result["records"], "status": "unchanged", "peak_rss_mb": rss}
+
+        self.logger.info(
+            f"Streaming upload completed for {self.export_config['name']}: {result['records']} rows, "
+            f"{result['appended']} appended, {result['duplicates']} duplicates skipped, peak RSS {rss:.0f} MB"
+        )
+        if result["appended"]:
+            # The streaming uploader reads the sheet itself - the next indexed upload reconciles
+            SheetKeyIndex(self, validator).invalidate("streaming upload")
+        if track_state and result["row_set_hash"]:
+            self.run_state.record(self.export_type, start_date, end_date, content_hash, result["row_set_hash"], result["records"])
+        return {"success": True, "records": result["records"], "status": "uploaded", "peak_rss_mb": rss}
+
     def _clean_data_for_json(self, df):
-        """Clean dataframe for JSON compliance"""
-        # Replace NaN, inf, -inf values
-        df = df.fillna('')  # Replace NaN with empty string
-        df = df.replace([float('inf'), float('-inf')], '')  # Replace inf values
-        
-        # Convert problematic numeric columns to strings
-        for col in df.select_dtypes(include=['float64', 'int64']).columns:
-            df[col] = df[col].astype(str).replace('nan', '').replace('inf', '').replace('-inf', '')
-        
-        return df
+        """Clean dataframe for JSON compliance (NaN/inf -> '', float64/int64 -> str, schema dtypes back to text)"""
+        return self.serializer.to_frame(df)
     
     def _upload_all_data(self, sheet, df):
         """Upload all data to sheet (original method) with built-in rate limiting"""
@@ -276,7 +408,7 @@ class SheetsManager:
         self.logger.info(f"Checking sheet capacity for {total_rows_needed} total rows...")
         self._check_and_expand_sheet_if_needed(sheet, total_rows_needed)
 
-        data_to_upload = [df.columns.values.tolist()] + df.values.tolist()
+        data_to_upload = self.serializer.to_values(df, include_header=True)
 
         if len(data_to_upload) > 1000:
             self.logger.info("Large dataset detected, uploading in batches...")
@@ -295,41 +427,105 @@ class SheetsManager:
         else:
             sheet.update('A1', data_to_upload)
     
-    def _execute_smart_upload(self, sheet, upload_plan, existing_df):
-        """Execute smart upload plan"""
+    def _execute_smart_upload(self, sheet, upload_plan, existing_rows):
+        """Execute smart upload plan (existing_rows = data rows below the header)
+
+        Each write retries on its own. Returns the sheet rows updated in place.
+        """
         # Check and expand sheet if needed before uploading
         total_new_rows = len(upload_plan["append_data"]) if not upload_plan["append_data"].empty else 0
         if total_new_rows > 0:
             self.logger.info(f"Checking sheet capacity for {total_new_rows} new rows...")
-            self._check_and_expand_sheet_if_needed(sheet, total_new_rows)
+            # Header plus existing rows are known (key index or the earlier full read) - no second sheet read
+            self._check_and_expand_sheet_if_needed(sheet, total_new_rows, used_rows=existing_rows + 1)
 
         # Append new records
         if not upload_plan["append_data"].empty:
             self.logger.info(f"Appending {len(upload_plan['append_data'])} new records...")
 
             # Find the last row with data
-            last_row = len(existing_df) + 2  # +1 for header, +1 for next row
+            last_row = existing_rows + 2  # +1 for header, +1 for next row
 
             # Append new data
-            new_data_values = upload_plan["append_data"].values.tolist()
+            new_data_values = self.serializer.to_values(upload_plan["append_data"])
             if new_data_values:
                 range_name = f'A{last_row}'
-                sheet.update(range_name, new_data_values)
-                time.sleep(self.retry_config["rate_limit_delay"])  # Rate limiting between operations
+                self._execute_with_retry(
+                    "Append new records",
+                    lambda: sheet.update(range_name, new_data_values)
+                )
         
-        # Update existing records (simplified - just log for now)
+        # Update changed records in place
+        updated_rows = []
         if not upload_plan["update_data"].empty:
             self.logger.info(f"Found {len(upload_plan['update_data'])} records to update")
-            self.logger.info("Note: Individual row updates not implemented yet - consider re-running with fresh data")
+            updated_rows = self._update_rows(sheet, upload_plan["update_data"], upload_plan.get("update_rows", []))
         
         # Log skipped records
         if not upload_plan["skip_data"].empty:
             self.logger.info(f"Skipped {len(upload_plan['skip_data'])} unchanged records")
         
         self.logger.info("Smart upload completed!")
+        return updated_rows
+
+    def _update_rows(self, sheet, update_data, update_rows):
+        """Rewrite changed records at their sheet rows with as few values.batchUpdate calls as possible
+
+        Consecutive rows share one range; ranges are packed into calls of at most max_payload_kb
+        (estimated JSON size) and max_ranges. Returns the rows written.
+        """
+        if not self.row_update_config["enabled"]:
+            self.logger.info("Row updates disabled (DISABLE_ROW_UPDATES) - changed records not written")
+            return []
+        if len(update_rows) != len(update_data):
+            self.logger.warning("Sheet rows of the changed records are unknown - changed records not written")
+            return []
+
+        # Several records with the same key target the same row - the last one wins (as appended data would)
+        values_by_row = dict(zip(update_rows, self.serializer.to_values(update_data)))
+        max_bytes = self.row_update_config["max_payload_kb"] * 1024
+        max_ranges = self.row_update_config["max_ranges"]
+
+        batches = [[]]
+        batch_bytes = 0
+        previous_row = None
+        for row in sorted(values_by_row):
+            values = values_by_row[row]
+            row_bytes = len(json.dumps(values, default=str)) + 1
+            batch = batches[-1]
+            if batch and batch_bytes + row_bytes > max_bytes:
+                batch = []
+                batches.append(batch)
+                batch_bytes = 0
+            if batch and row == previous_row + 1:
+                batch[-1]["values"].append(values)
+            else:
+                if len(batch) == max_ranges:
+                    batch = []
+                    batches.append(batch)
+                    batch_bytes = 0
+                batch.append({"range": f"A{row}", "values": [values]})
+                batch_bytes += 40  # Range entry overhead
+            batch_bytes += row_bytes
+            previous_row = row
+
+        for number, batch in enumerate(batches, 1):
+            # Rewriting the same ranges is idempotent - only this batch is retried
+            self._execute_with_retry(
+                f"Update changed rows (batch {number}/{len(batches)})",
+                lambda: sheet.batch_update(batch)
+            )
+            self.logger.info(f"Updated {sum(len(entry['values']) for entry in batch)} rows in {len(batch)} ranges "
+                             f"(batch {number}/{len(batches)})")
+
+        self.logger.info(f"Updated {len(values_by_row)} changed records in place with {len(batches)} batchUpdate calls")
+        return sorted(values_by_row)
+
+    def _check_and_expand_sheet_if_needed(self, sheet, data_rows_to_add, used_rows=None):
+        """Check if sheet has enough space and expand if needed
 
-    def _check_and_expand_sheet_if_needed(self, sheet, data_rows_to_add):
-        """Check if sheet has enough space and expand if needed"""
+        Pass used_rows when already known to avoid reading the whole sheet (streaming mode)
+        """
         try:
             # Get current sheet properties
             spreadsheet = sheet.spreadsheet
@@ -355,8 +551,9 @@ class SheetsManager:
             current_cols = worksheet_properties['gridProperties']['columnCount']
 
             # Check how many rows we have data in
-            all_values = sheet.get_all_values()
-            used_rows = len([row for row in all_values if any(cell.strip() for cell in row)])
+            if used_rows is None:
+                all_values = sheet.get_all_values()
+                used_rows = len([row for row in all_values if any(cell.strip() for cell in row)])
 
             # Calculate space needed (with buffer)
             space_needed = used_rows + data_rows_to_add + 100  # Add 100 row buffer
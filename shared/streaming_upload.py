@@ -0,0 +1,301 @@
+"""
+Bounded-memory streaming upload from xlsx to Google Sheets
+The export and the existing sheet are processed in chunks; only the key index stays in memory
+"""
+
+import logging
+import pickle
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Set
+
+import numpy as np
+import pandas as pd
+from gspread.utils import numericise_all
+
+from .config import ExportConfig
+from .data_validator import KeyFingerprintIndex
+from .run_state import RunStateStore
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def sheet_records_parser(keys: List[str]) -> Callable[[List[list], tuple], pd.DataFrame]:
+    """Rows -> DataFrame exactly as DataFrame(sheet.get_all_records()) builds it"""
+    def parse(rows, object_columns):
+        records = [dict(zip(keys, numericise_all(list(row) + [""] * (len(keys) - len(row))))) for row in rows]
+        df = pd.DataFrame(records, columns=list(dict.fromkeys(keys))) if records else pd.DataFrame(columns=list(dict.fromkeys(keys)))
+        for column in object_columns:
+            # Straight from the cells - astype(object) after inference would keep ints of a float64 column as floats
+            values = np.empty(len(records), dtype=object)
+            values[:] = [record[column] for record in records]
+            df[column] = values
+        return df
+    return parse
+
+class ChunkSpill:
+    """Spills raw row chunks to disk and replays them as DataFrames with whole-frame dtypes
+
+    Parsing chunk by chunk infers dtypes per chunk (int64 here, float64 where another chunk
+    has blanks, object where a value is not numeric). The first pass records every chunk's
+    dtypes; the replay re-parses each chunk forcing the dtype a single parse of all rows
+    would have produced, so cleaned values and composite keys match the non-streaming path.
+    """
+
+    def __init__(self, folder: Path, parse: Callable[[List[list], tuple], pd.DataFrame]):
+        self.folder = folder
+        self.parse = parse
+        self.paths: List[Path] = []
+        self.chunk_rows: List[int] = []
+        self.columns: List = []
+        self.rows = 0
+        self._dtypes: Dict = {}
+        # Typed columns holding NaN/inf somewhere - the whole frame turns these into object when cleaned
+        self.null_columns: Set = set()
+
+    def add(self, rows: List[list]):
+        df = self.parse(rows, ())
+        if not self.columns:
+            self.columns = list(df.columns)
+        if not rows:
+            return
+
+        for column in df.columns:
+            values = df[column]
+            self._dtypes.setdefault(column, []).append((values.dtype, bool(values.isna().all())))
+            if values.dtype.kind in "ifbmM" and (
+                values.isna().any() or (values.dtype.kind == "f" and np.isinf(values.to_numpy()).any())
+            ):
+                self.null_columns.add(column)
+
+        path = self.folder / f"chunk_{len(self.paths):05d}.pkl"
+        with open(path, "wb") as fh:
+            pickle.dump(rows, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        self.paths.append(path)
+        self.chunk_rows.append(len(rows))
+        self.rows += len(rows)
+
+    def _unified_dtype(self, column):
+        seen = self._dtypes[column]
+        informative = [dtype for dtype, all_null in seen if not all_null]
+        has_null_chunk = len(informative) < len(seen)
+        if not informative:
+            return seen[0][0]
+
+        kinds = {dtype.kind for dtype in informative}
+        if len({str(dtype) for dtype in informative}) == 1 and not (has_null_chunk and kinds <= {"i", "b"}):
+            return informative[0]
+        if kinds <= {"i", "f"}:
+            return np.dtype("float64")  # ints next to blanks or floats become float64
+        if kinds == {"M"}:
+            return informative[0]
+        return np.dtype(object)
+
+    def _load(self, path: Path, targets: Dict) -> pd.DataFrame:
+        with open(path, "rb") as fh:
+            rows = pickle.load(fh)
+        df = self.parse(rows, tuple(column for column, dtype in targets.items() if dtype == object))
+        for column, dtype in targets.items():
+            if column in df.columns and df[column].dtype != dtype:
+                df[column] = df[column].astype(dtype)
+        return df
+
+    def iter_frames(self):
+        """Replay the chunks with unified dtypes, one DataFrame at a time"""
+        targets = {column: self._unified_dtype(column) for column in self._dtypes}
+        for path in self.paths:
+            yield self._load(path, targets)
+
+    def frame(self, number: int) -> pd.DataFrame:
+        """One chunk replayed with unified dtypes (rows chunk_rows[:number] come before it)"""
+        return self._load(self.paths[number], {column: self._unified_dtype(column) for column in self._dtypes})
+
+class StreamingSheetUploader:
+    """Dedupe-and-append upload that never holds the full export or the full sheet in memory"""
+
+    def __init__(self, sheets_manager, validator, config: Dict = None):
+        self.sheets_manager = sheets_manager
+        self.validator = validator
+        self.config = config or ExportConfig.STREAMING_UPLOAD_CONFIG
+        self.retry_config = ExportConfig.GOOGLE_SHEETS_RETRY_CONFIG
+        self.logger = logging.getLogger(__name__)
+
+    # ---- Existing sheet ----
+
+    def _read_existing_keys(self, sheet, spill_folder: Path):
+        """Page through the sheet and build the composite key set; returns (keys, header, used_rows)"""
+        page_rows = self.config["sheet_page_rows"]
+        header = self.sheets_manager._execute_with_retry("Read sheet header", lambda: sheet.get("1:1"))
+        header = header[0] if header else []
+        if not header:
+            return set(), [], 0
+
+        spill = ChunkSpill(spill_folder, sheet_records_parser(header))
+        pending_blank_rows = 0
+        last_row = 1
+        total_rows = sheet.row_count
+
+        for start in range(2, total_rows + 1, page_rows):
+            end = min(start + page_rows - 1, total_rows)
+            page = self.sheets_manager._execute_with_retry(
+                f"Read sheet rows {start}-{end}", lambda: sheet.get(f"{start}:{end}")
+            )
+            rows = []
+            for offset, row in enumerate(page):
+                if any(cell != "" for cell in row):
+                    # Blank rows between data rows are records too (get_all_records keeps them)
+                    rows.extend([[] for _ in range(pending_blank_rows)])
+                    pending_blank_rows = 0
+                    rows.append(row)
+                    last_row = start + offset
+                else:
+                    pending_blank_rows += 1
+            pending_blank_rows += (end - start + 1) - len(page)
+            spill.add(rows)
+            time.sleep(self.retry_config["rate_limit_delay"])
+
+        if self.validator.fingerprint_keys:
+            fingerprints = [
+                self.validator.key_fingerprints(self.validator.create_composite_key(frame).astype(str))
+                for frame in spill.iter_frames()
+            ]
+            existing_keys = KeyFingerprintIndex(
+                np.concatenate(fingerprints) if fingerprints else np.empty(0, dtype=np.uint64),
+                lambda positions: self._spilled_keys(spill, positions)
+            )
+        else:
+            existing_keys = set()
+            for frame in spill.iter_frames():
+                existing_keys.update(self.validator.create_composite_key(frame).astype(str))
+
+        self.logger.info(f"STREAMING: indexed {len(existing_keys)} existing keys from {spill.rows} sheet rows (peak RSS {peak_rss_mb():.0f} MB)")
+        return existing_keys, header, last_row
+
+    def _spilled_keys(self, spill: ChunkSpill, positions: np.ndarray) -> np.ndarray:
+        """Full keys of existing rows, rebuilt from the chunks of the sheet spill that hold them"""
+        offsets = np.concatenate([[0], np.cumsum(spill.chunk_rows)])
+        chunks = np.searchsorted(offsets, positions, side="right") - 1
+        keys = np.empty(len(positions), dtype=object)
+        for number in np.unique(chunks):
+            selected = chunks == number
+            frame = spill.frame(number).iloc[positions[selected] - offsets[number]]
+            keys[selected] = self.validator.create_composite_key(frame).astype(str).to_numpy(dtype=object)
+        return keys
+
+    # ---- Upload ----
+
+    @staticmethod
+    def _row_hashes(spill: ChunkSpill) -> np.ndarray:
+        return np.concatenate([pd.util.hash_pandas_object(frame, index=False).to_numpy() for frame in spill.iter_frames()])
+
+    def _clean_chunk(self, chunk: pd.DataFrame, null_columns: Set) -> pd.DataFrame:
+        """_clean_data_for_json with the whole frame's view of which columns contain NaN/inf"""
+        for column in null_columns:
+            if chunk[column].dtype.kind in "ifbmM":
+                # On the full frame fillna('') makes these object columns, keeping float values as floats
+                chunk[column] = chunk[column].astype(object)
+        return self.sheets_manager._clean_data_for_json(chunk)
+
+    def _append(self, sheet, start_row: int, values: List[list]):
+        self.sheets_manager._execute_with_retry(
+            f"Append rows at {start_row}", lambda: sheet.update(f"A{start_row}", values)
+        )
+        time.sleep(self.retry_config["batch_delay"])
+
+    def upload(self, source, sheet, excel_reader, previous_row_set_hash: str = None) -> Dict:
+        """Stream source into the sheet; returns counts and the row-set hash for run state
+
+        With previous_row_set_hash the rows are hashed before the sheet is touched, and an
+        identical row set returns {"unchanged": True} without reading or writing the sheet.
+        """
+        chunk_rows = self.config["chunk_rows"]
+        spill_root = Path(ExportConfig.DOWNLOADS_FOLDER) / ExportConfig.DOWNLOAD_STAGING_FOLDER
+        spill_root.mkdir(parents=True, exist_ok=True)
+        spill_folder = Path(tempfile.mkdtemp(prefix="stream_", dir=spill_root))
+
+        try:
+            # Pass 1: spill the export in raw chunks and profile dtypes
+            header = None
+            new_spill = None
+            for header, rows in excel_reader.iter_row_chunks(source, chunk_rows):
+                if new_spill is None:
+                    new_spill = ChunkSpill(spill_folder / "export", lambda r, obj, h=header: excel_reader.parse_rows(h, r, obj))
+                    new_spill.folder.mkdir()
+                new_spill.add(rows)
+
+            if new_spill is None:
+                raise Exception("Downloaded file is completely empty (no headers or data)!")
+            if new_spill.rows == 0:
+                self.logger.info(f"HEADERS ONLY: {self.sheets_manager.export_config['name']} - no data for this date range (valid state)")
+                return {"records": 0, "appended": 0, "duplicates": 0, "row_set_hash": None, "unchanged": False}
+
+            self.logger.info(f"STREAMING: {new_spill.rows} export rows in {len(new_spill.paths)} chunks of {chunk_rows}")
+
+            row_set_hash = None
+            if previous_row_set_hash:
+                row_set_hash = RunStateStore.row_set_hash_from(new_spill.columns, self._row_hashes(new_spill))
+                if row_set_hash == previous_row_set_hash:
+                    return {"records": new_spill.rows, "appended": 0, "duplicates": 0,
+                            "row_set_hash": row_set_hash, "unchanged": True}
+
+            # Existing sheet -> key set only
+            (spill_folder / "sheet").mkdir()
+            existing_keys, _, used_rows = self._read_existing_keys(sheet, spill_folder / "sheet")
+
+            # Capacity check without re-reading the whole sheet
+            self.sheets_manager._check_and_expand_sheet_if_needed(sheet, new_spill.rows + 1, used_rows=used_rows)
+
+            next_row = used_rows + 1
+            appended = 0
+            duplicates = 0
+            row_hashes = []
+            initial_upload = len(existing_keys) == 0
+            if initial_upload:
+                self.logger.info("Sheet is empty - performing initial streaming upload")
+                next_row = 1
+
+            # Pass 2: dedupe each chunk against the key set and append it
+            for chunk in new_spill.iter_frames():
+                if row_set_hash is None:
+                    row_hashes.append(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+                clean = self._clean_chunk(chunk, new_spill.null_columns)
+
+                if initial_upload:
+                    # Same as the non-streaming initial upload: header at A1 plus every row
+                    if next_row == 1:
+                        self._append(sheet, 1, [clean.columns.values.tolist()])
+                        next_row = 2
+                    to_append = clean
+                else:
+                    keys = self.validator.create_composite_key(clean).astype(str)
+                    if isinstance(existing_keys, KeyFingerprintIndex):
+                        is_duplicate = existing_keys.contains(keys)
+                    else:
+                        is_duplicate = keys.isin(existing_keys).to_numpy()
+                    duplicates += int(is_duplicate.sum())
+                    to_append = clean[~is_duplicate]
+
+                if not to_append.empty:
+                    self._append(sheet, next_row, self.sheets_manager.serializer.to_values(to_append))
+                    next_row += len(to_append)
+                    appended += len(to_append)
+
+                self.logger.info(f"STREAMING: chunk done - {appended} appended, {duplicates} duplicates so far (peak RSS {peak_rss_mb():.0f} MB)")
+
+            if row_set_hash is None:
+                row_set_hash = RunStateStore.row_set_hash_from(new_spill.columns, np.concatenate(row_hashes))
+
+            return {
+                "records": new_spill.rows,
+                "appended": appended,
+                "duplicates": duplicates,
+                "row_set_hash": row_set_hash,
+                "unchanged": False
+            }
+
+        finally:
+            shutil.rmtree(spill_folder, ignore_errors=True)
@@ -78,7 +78,11 @@ class TelegramNotifier:
         """Send daily summary of all exports"""
         successful = [k for k, v in results.items() if v.get("success", False)]
         failed = [k for k, v in results.items() if not v.get("success", False)]
-        total_records = sum(v.get("records", 0) for v in results.values() if v.get("success", False))
+        unchanged = [k for k, v in results.items() if v.get("status") == "unchanged"]
+        # Unchanged exports were not uploaded again, so they do not add to the total
+        total_records = sum(
+            v.get("records", 0) for k, v in results.items() if v.get("success", False) and k not in unchanged
+        )
         
         # Determine emoji based on results
         if len(failed) == 0:
@@ -94,6 +98,8 @@ class TelegramNotifier:
         message = f"{status_emoji} <b>SUMMARY DAILY EXPORT</b>\n"
         message += f"📈 Status: {status_text}\n"
         message += f"📊 Total Records: {total_records}\n"
+        if unchanged:
+            message += f"♻️ Unchanged: {len(unchanged)} (upload skipped)\n"
         message += f"⏱️ Total Waktu: {total_time:.2f} detik\n\n"
         
         # Success details
@@ -101,7 +107,10 @@ class TelegramNotifier:
             message += f"✅ <b>Berhasil ({len(successful)}):</b>\n"
             for export_type in successful:
                 records = results[export_type].get("records", 0)
-                message += f"  • {export_type}: {records} rows\n"
+                if results[export_type].get("status") == "unchanged":
+                    message += f"  • {export_type}: unchanged ({records} rows, upload skipped)\n"
+                else:
+                    message += f"  • {export_type}: {records} rows\n"
         
         # Failure details
         if failed:
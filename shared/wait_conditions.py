@@ -0,0 +1,98 @@
+"""
+Named readiness conditions for Selenium pages
+Replaces fixed sleeps with explicit waits and records how long each wait took
+"""
+
+import logging
+import time
+from typing import Dict, List
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .config import ExportConfig
+
+class PageWaiter:
+    """Explicit waits with per-step timeouts from ExportConfig.WAIT_TIMEOUTS"""
+
+    def __init__(self, driver, timeouts: Dict = None):
+        self.driver = driver
+        self.timeouts = timeouts or ExportConfig.WAIT_TIMEOUTS
+        self.poll_frequency = self.timeouts.get("poll_frequency", 0.1)
+        self.timings: Dict[str, List[float]] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def wait_for(self, name: str, condition, timeout: float = None):
+        """Wait until condition(driver) is truthy; records elapsed time under name"""
+        if timeout is None:
+            timeout = self.timeouts.get(name, self.timeouts["default"])
+
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            self.logger.warning(f"WAIT TIMEOUT: '{name}' not satisfied after {timeout}s")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings.setdefault(name, []).append(elapsed)
+            self.logger.info(f"WAIT: '{name}' took {elapsed:.2f}s")
+
+    def document_ready(self):
+        """Page finished parsing and loading its resources"""
+        return self.wait_for("document_ready", lambda d: d.execute_script("return document.readyState") == "complete")
+
+    def login_form_ready(self, username_selector: str):
+        """Login form is rendered and the username field can be typed into"""
+        return self.wait_for("login_form_ready", EC.element_to_be_clickable((By.CSS_SELECTOR, username_selector)))
+
+    def login_redirect_complete(self) -> bool:
+        """Browser left the login page after submitting credentials"""
+        try:
+            self.wait_for("login_redirect_complete", lambda d: "login" not in d.current_url.lower())
+            self.document_ready()
+            return True
+        except TimeoutException:
+            return False
+
+    def date_inputs_interactive(self, selectors: List[str]):
+        """All date inputs are visible and enabled"""
+        def all_interactive(driver):
+            for selector in selectors:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                if not elements or not elements[0].is_displayed() or not elements[0].is_enabled():
+                    return False
+            return True
+
+        return self.wait_for("date_inputs_interactive", all_interactive)
+
+    def date_value_applied(self, element, expected_value: str) -> bool:
+        """Date input reflects the value that was set"""
+        try:
+            self.wait_for("date_value_applied", lambda d: element.get_attribute("value") == expected_value)
+            return True
+        except TimeoutException:
+            return False
+
+    def export_button_enabled(self, locator):
+        """Export button is visible and enabled; locator is a (By, value) tuple or a WebElement"""
+        return self.wait_for("export_button_enabled", EC.element_to_be_clickable(locator))
+
+    def get_timings(self) -> Dict[str, Dict[str, float]]:
+        """Summary of recorded waits: count, total and max seconds per condition"""
+        return {
+            name: {"count": len(values), "total": sum(values), "max": max(values)}
+            for name, values in self.timings.items()
+        }
+
+    def log_summary(self):
+        """Log wait timings, slowest total first, so slow steps are visible"""
+        timings = self.get_timings()
+        if not timings:
+            return
+
+        self.logger.info("=== Wait Timing Summary ===")
+        for name, stats in sorted(timings.items(), key=lambda item: item[1]["total"], reverse=True):
+            self.logger.info(f"{name}: {stats['count']}x, total {stats['total']:.2f}s, max {stats['max']:.2f}s")
@@ -0,0 +1,156 @@
+"""
+Date-range splitting for multi-day exports
+A long range is fetched as N-day windows in parallel, then merged into one deduplicated DataFrame
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import ExportConfig
+from .data_validator import DataValidator
+from .excel_reader import ExcelReader
+from .parsed_cache import ParsedExportCache
+from .raw_archive import RawExportArchive
+
+def split_date_range(start_date: str, end_date: str, window_days: int) -> List[Tuple[str, str]]:
+    """Inclusive YYYY-MM-DD range -> consecutive, non-overlapping windows of at most window_days days"""
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError(f"End date {end_date} is before start date {start_date}")
+
+    windows = []
+    window_start = start
+    while window_start <= end:
+        window_end = min(window_start + timedelta(days=window_days - 1), end)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + timedelta(days=1)
+    return windows
+
+class WindowedExportFetcher:
+    """Fetches an export as date windows with a concurrency cap and per-window retries"""
+
+    def __init__(self, config: Dict = None, window_days: int = None):
+        self.config = config or ExportConfig.WINDOWED_EXPORT_CONFIG
+        # An explicit window size (e.g. --window-days) turns splitting on for this run
+        self.enabled = self.config["enabled"] or window_days is not None
+        self.window_days = window_days or self.config["window_days"]
+        self.excel_reader = ExcelReader()
+        self.parsed_cache = ParsedExportCache()
+        self.archive = RawExportArchive()
+        self.logger = logging.getLogger(__name__)
+
+    def windows_for(self, start_date: str = None, end_date: str = None) -> List[Tuple[str, str]]:
+        """Windows this range is split into (a single window when splitting does not apply)"""
+        if not self.enabled or not start_date or not end_date:
+            return [(start_date, end_date)]
+        return split_date_range(start_date, end_date, self.window_days)
+
+    def should_split(self, start_date: str = None, end_date: str = None) -> bool:
+        return len(self.windows_for(start_date, end_date)) > 1
+
+    def _fetch_with_retries(self, export_type: str, window: Tuple[str, str], fetch_window: Callable):
+        """One window with its own retries; returns the download or None"""
+        attempts = self.config["window_retries"] + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                source = fetch_window(*window)
+                if source is not None:
+                    return source
+                self.logger.warning(f"{export_type} window {window[0]}..{window[1]}: no download (attempt {attempt}/{attempts})")
+            except Exception as e:
+                self.logger.warning(f"{export_type} window {window[0]}..{window[1]} failed (attempt {attempt}/{attempts}): {str(e)}")
+            if attempt < attempts:
+                time.sleep(self.config["retry_delay"] * attempt)
+        return None
+
+    def fetch_merged(self, export_type: str, start_date: str, end_date: str,
+                     fetch_window: Callable, fallback: Optional[Callable] = None) -> pd.DataFrame:
+        """Fetch every window concurrently with fetch_window(start, end), then merge
+
+        Windows that still fail (or all of them, without fetch_window) are fetched one
+        by one through fallback, e.g. the single Selenium browser, which cannot run
+        windows in parallel.
+        """
+        windows = self.windows_for(start_date, end_date)
+        max_workers = min(self.config["max_concurrent_windows"], len(windows)) if fetch_window else 1
+        self.logger.info(f"WINDOWED EXPORT: {export_type} {start_date}..{end_date} as {len(windows)} windows of {self.window_days} day(s), {max_workers} at a time")
+
+        fetch_start = time.perf_counter()
+        sources = {window: None for window in windows}
+        if fetch_window:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"window-{export_type}") as pool:
+                sources = dict(zip(windows, pool.map(lambda w: self._fetch_with_retries(export_type, w, fetch_window), windows)))
+
+        failed = [window for window in windows if sources[window] is None]
+        if failed and fallback:
+            self.logger.warning(f"{export_type}: {len(failed)} window(s) failed - retrying through fallback: {failed}")
+            for window in failed:
+                sources[window] = self._fetch_with_retries(export_type, window, fallback)
+            failed = [window for window in windows if sources[window] is None]
+
+        if failed:
+            raise Exception(f"{len(failed)} of {len(windows)} date windows failed for {export_type}: {failed}")
+
+        self.logger.info(f"{export_type}: fetched {len(windows)} windows in {time.perf_counter() - fetch_start:.1f}s")
+        for window in windows:
+            self.archive.store_async(export_type, sources[window], *window)
+        return self.merge(export_type, [sources[window] for window in windows])
+
+    def merge(self, export_type: str, sources: List) -> pd.DataFrame:
+        """Parse window downloads (in date order) into one DataFrame
+
+        Rows whose key already appeared in an earlier window are dropped (boundary
+        overlap); duplicates inside one window are left to the upload, as for a
+        single download. A "No" row-number column is renumbered across windows.
+        """
+        frames = [self.parsed_cache.load(source, self.excel_reader) for source in sources]
+        with_columns = [df for df in frames if len(df.columns) > 0]
+        if not with_columns:
+            raise Exception("Downloaded file is completely empty (no headers or data)!")
+
+        export_config = ExportConfig.get_export_config(export_type)
+        validator = DataValidator(
+            unique_key=export_config.get("unique_key", "ID"),
+            composite_key_columns=export_config.get("composite_key_columns", None)
+        )
+
+        kept = []
+        seen_keys = set()
+        overlap = 0
+        for df in with_columns:
+            keys = self._window_keys(validator, df)
+            repeated = keys.isin(seen_keys)
+            overlap += int(repeated.sum())
+            kept.append(df[~repeated.to_numpy()])
+            seen_keys.update(keys)
+
+        # Header-only windows would turn every column into object dtype in the concat
+        kept = [df for df in kept if len(df) > 0] or kept[:1]
+        merged = pd.concat(kept, ignore_index=True) if len(kept) > 1 else kept[0].reset_index(drop=True)
+
+        number_column = next((column for column in merged.columns if str(column).lower() == "no"), None)
+        if number_column is not None and pd.api.types.is_integer_dtype(merged[number_column]):
+            merged[number_column] = range(1, len(merged) + 1)
+
+        self.logger.info(f"{export_type}: merged {len(with_columns)} windows into {len(merged)} rows ({overlap} overlapping rows dropped)")
+        return merged
+
+    @staticmethod
+    def _window_keys(validator: DataValidator, df: pd.DataFrame) -> pd.Series:
+        """Composite keys when the export's key columns are present, otherwise whole rows minus "No"
+
+        The validator falls back to row positions when no key column exists, and positions
+        repeat in every window, so they cannot be used to match rows across windows.
+        """
+        key_columns = validator.composite_key_columns if validator.use_composite_key else [validator.unique_key]
+        if key_columns == "ALL_EXCEPT_NO" or any(column in df.columns for column in key_columns):
+            return validator.create_composite_key(df).astype(str)
+
+        columns = [column for column in df.columns if str(column).lower() != "no"]
+        return pd.util.hash_pandas_object(df[columns], index=False).astype(str)
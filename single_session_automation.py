@@ -13,10 +13,27 @@ from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from shared.config import ExportConfig
 from shared.data_validator import DataValidator
 from shared.sheets_manager import SheetsManager
+from shared.session_cache import SessionCache
+from shared.request_blocker import RequestBlocker
+from shared.download_staging import DownloadStaging
+from shared.windowed_export import WindowedExportFetcher
 
 class SingleSessionAutomation:
     """Single session automation for all exports"""
     
+    # Reads the export button's form (action, method and current field values) for in-memory capture
+    _READ_EXPORT_FORM_JS = """(button) => {
+        const form = button.form || button.closest('form');
+        if (!form) return null;
+        const data = new FormData(form);
+        if (button.name) data.append(button.name, button.value || '');
+        return {
+            action: form.action,
+            method: (form.getAttribute('method') || 'get').toLowerCase(),
+            fields: Array.from(data.entries()).filter(([, value]) => typeof value === 'string')
+        };
+    }"""
+    
     def __init__(self, headless=None, debug=False, production=False):
         self.logger = logging.getLogger(__name__)
         self.browser: Browser = None
@@ -24,6 +41,14 @@ class SingleSessionAutomation:
         self.page: Page = None
         self.config = ExportConfig()
         self.data_validator = DataValidator()
+        self.session_cache = SessionCache()
+        self.session_restored = False
+        self.request_blocker = RequestBlocker()
+        self.download_staging = DownloadStaging()
+        self.capture_config = ExportConfig.IN_MEMORY_CAPTURE_CONFIG
+        self.windowed_fetcher = WindowedExportFetcher()
+        # Caps every page opened at once in concurrent mode - export pages and date-window pages alike
+        self.page_slots: asyncio.Semaphore = None
         # SheetsManager will be initialized per export type
         
         # Get browser configuration with overrides
@@ -33,52 +58,72 @@ class SingleSessionAutomation:
         self.session_start_time = None
         self.login_time = None
         self.export_times = {}
+        self.export_statuses = {}
         
-    async def initialize_browser(self):
-        """Initialize browser and create context"""
+    async def initialize_browser(self, main_page: bool = True):
+        """Initialize browser and create context (and the main page unless every export opens its own)"""
         self.logger.info("Initializing browser session...")
         
         playwright = await async_playwright().start()
         self.browser = await playwright.chromium.launch(**self.browser_config)
-        self.context = await self.browser.new_context()
-        self.page = await self.context.new_page()
         
-        # Set default timeout
-        self.page.set_default_timeout(self.browser_config["timeout"])
+        # Restore the previous run's login when a probe request confirms it is still valid
+        storage_state = self.session_cache.load_valid()
+        self.session_restored = storage_state is not None
+        self.context = await self.browser.new_context(storage_state=storage_state)
+        
+        if main_page:
+            # Skip images, fonts, CSS and trackers - the main page serves every export, so use all allowlists
+            self.page = await self._new_page()
         
         self.logger.info("Browser session initialized successfully")
         
+    async def _new_page(self, export_name: str = None) -> Page:
+        """Open a page in the shared context with the default timeout and request blocking"""
+        page = await self.context.new_page()
+        page.set_default_timeout(self.browser_config["timeout"])
+        await self.request_blocker.attach_to_page(page, export_name)
+        return page
+        
     async def login_to_backend(self):
         """Login to backend system once"""
-        self.logger.info("Logging in to backend system...")
         login_start = datetime.now()
         
+        if self.session_restored:
+            self.login_time = (datetime.now() - login_start).total_seconds()
+            self.logger.info("Login skipped - restored cached session state")
+            return True
+        
+        self.logger.info("Logging in to backend system...")
+        # Concurrent mode has no main page - log in on a temporary one
+        page = self.page or await self._new_page()
+        
         try:
             # Navigate to login page
-            await self.page.goto(self.config.BACKEND_BASE_URL)
-            await self.page.wait_for_load_state('networkidle', timeout=60000)
+            await page.goto(self.config.BACKEND_BASE_URL)
+            await page.wait_for_load_state('networkidle', timeout=60000)
             
             # Give page time to fully load
-            await self.page.wait_for_timeout(2000)
+            await page.wait_for_timeout(2000)
             
             # Fill login form
-            await self.page.fill(self.config.LOGIN_SELECTORS["username"], self.config.USERNAME)
-            await self.page.fill(self.config.LOGIN_SELECTORS["password"], self.config.PASSWORD)
+            await page.fill(self.config.LOGIN_SELECTORS["username"], self.config.USERNAME)
+            await page.fill(self.config.LOGIN_SELECTORS["password"], self.config.PASSWORD)
             
             # Wait a bit before clicking submit
-            await self.page.wait_for_timeout(1000)
+            await page.wait_for_timeout(1000)
             
             # Click login button
-            await self.page.click(self.config.LOGIN_SELECTORS["submit"])
+            await page.click(self.config.LOGIN_SELECTORS["submit"])
             
             # Wait for login response with longer timeout
-            await self.page.wait_for_load_state('networkidle', timeout=90000)
+            await page.wait_for_load_state('networkidle', timeout=90000)
             
             # Verify login success (check for dashboard or logged-in indicator)
             try:
                 # Wait for dashboard or any post-login element
-                await self.page.wait_for_timeout(5000)  # Give time for redirect
-                current_url = self.page.url
+                await page.wait_for_timeout(5000)  # Give time for redirect
+                current_url = page.url
                 
                 if "login" in current_url.lower():
                     raise Exception("Login failed - still on login page")
@@ -86,52 +131,183 @@ class SingleSessionAutomation:
                 self.logger.info(f"Login successful - redirected to: {current_url}")
                     
             except Exception as e:
-                await self.page.screenshot(path="login_failed.png")
+                await page.screenshot(path="login_failed.png")
                 raise Exception(f"Login verification failed: {str(e)}")
             
             self.login_time = (datetime.now() - login_start).total_seconds()
             self.logger.info(f"Login successful in {self.login_time:.2f} seconds")
             
+            # Persist storage state so the next run can skip this flow
+            self.session_cache.save_storage_state(await self.context.storage_state())
+            
             return True
             
         except Exception as e:
             self.logger.error(f"Login failed: {str(e)}")
-            await self.page.screenshot(path="login_error.png")
+            await page.screenshot(path="login_error.png")
             return False
             
-    async def export_transaksi(self, start_date: str, end_date: str):
+        finally:
+            if page is not self.page:
+                await page.close()
+            
+    async def _save_download(self, download, export_name: str, start_date: str, end_date: str) -> Path:
+        """Save a Playwright download into a private run folder, then move it atomically to its final name"""
+        config = self.config.get_export_config(export_name)
+        run_folder = self.download_staging.create_run_folder(export_name)
+        try:
+            staged_file = run_folder / (download.suggested_filename or f"{export_name}.download")
+            await download.save_as(str(staged_file))
+            return self.download_staging.finalize(staged_file, config, start_date, end_date)
+        finally:
+            self.download_staging.discard_run_folder(run_folder)
+        
+    def _record_upload_status(self, export_name: str, upload_result):
+        """Remember whether an export was uploaded or skipped as unchanged"""
+        if isinstance(upload_result, dict):
+            self.export_statuses[export_name] = upload_result.get("status", "uploaded")
+            if upload_result.get("status") == "unchanged":
+                self.logger.info(f"{export_name}: download unchanged since last run - upload skipped")
+    
+    async def _capture_export_bytes(self, page: Page, export_name: str, button_selector: str):
+        """Submit the filled export form through the context's request client and return the xlsx bytes
+
+        Returns None when the form cannot be replayed, so the caller can use a regular download.
+        """
+        try:
+            form = await page.locator(button_selector).first.evaluate(self._READ_EXPORT_FORM_JS)
+            if not form:
+                self.logger.info(f"{export_name}: export button is not inside a form - using browser download")
+                return None
+            
+            fields = dict(form["fields"])
+            if form["method"] == "post":
+                response = await self.context.request.post(form["action"], form=fields)
+            else:
+                response = await self.context.request.get(form["action"], params=fields)
+            
+            body = await response.body()
+            # xlsx files are zip archives
+            if not response.ok or not body.startswith(b"PK"):
+                self.logger.warning(f"{export_name}: in-memory capture got HTTP {response.status}, {len(body)} bytes - using browser download")
+                return None
+            
+            self.logger.info(f"{export_name}: captured {len(body)} bytes in memory")
+            return body
+            
+        except Exception as e:
+            self.logger.warning(f"{export_name}: in-memory capture failed - using browser download: {str(e)}")
+            return None
+    
+    async def _download_export(self, page: Page, export_name: str, button_selector: str, start_date: str, end_date: str):
+        """Fetch the export as bytes (in-memory mode) or as a finalized file path"""
+        config = self.config.get_export_config(export_name)
+        
+        if self.capture_config["enabled"]:
+            content = await self._capture_export_bytes(page, export_name, button_selector)
+            if content is not None:
+                if self.capture_config["persist_to_disk"]:
+                    self.download_staging.persist_async(content, config, start_date, end_date)
+                return content
+        
+        # Click export button and handle download
+        async with page.expect_download() as download_info:
+            await page.click(button_selector)
+        
+        download = await download_info.value
+        
+        # Save file via this export's own staging folder
+        return await self._save_download(download, export_name, start_date, end_date)
+    
+    async def _download_window_on_new_page(self, export_name: str, button_selector: str, window: tuple, semaphore: asyncio.Semaphore):
+        """Fetch one date window on its own page, retrying just this window on failure"""
+        config = self.config.get_export_config(export_name)
+        selectors = config["selectors"]
+        window_config = self.windowed_fetcher.config
+        attempts = window_config["window_retries"] + 1
+        
+        for attempt in range(1, attempts + 1):
+            async with semaphore:
+                page = None
+                try:
+                    page = await self._new_page(export_name)
+                    
+                    await page.goto(config["url"])
+                    await page.wait_for_load_state('networkidle')
+                    await page.fill(selectors["start_date"], window[0])
+                    await page.fill(selectors["end_date"], window[1])
+                    await page.wait_for_timeout(1000)
+                    
+                    return await self._download_export(page, export_name, button_selector, window[0], window[1])
+                    
+                except Exception as e:
+                    self.logger.warning(f"{export_name} window {window[0]}..{window[1]} failed (attempt {attempt}/{attempts}): {str(e)}")
+                    
+                finally:
+                    if page:
+                        await page.close()
+            
+            if attempt < attempts:
+                await asyncio.sleep(window_config["retry_delay"] * attempt)
+        
+        raise Exception(f"{export_name} window {window[0]}..{window[1]} failed after {attempts} attempts")
+    
+    async def _download_windows(self, export_name: str, button_selector: str, start_date: str, end_date: str):
+        """Fetch a long range as concurrent date windows and merge them into one DataFrame"""
+        windows = self.windowed_fetcher.windows_for(start_date, end_date)
+        max_windows = self.windowed_fetcher.config["max_concurrent_windows"]
+        # Concurrent mode shares one page budget across exports; otherwise cap this export's windows
+        semaphore = self.page_slots or asyncio.Semaphore(max_windows)
+        page_budget = "sharing the concurrent page budget" if self.page_slots else f"{max_windows} pages at a time"
+        self.logger.info(f"{export_name}: {start_date}..{end_date} as {len(windows)} windows, {page_budget}")
+        
+        fetch_start = datetime.now()
+        outcomes = await asyncio.gather(
+            *[self._download_window_on_new_page(export_name, button_selector, window, semaphore) for window in windows],
+            return_exceptions=True
+        )
+        
+        failed = [window for window, outcome in zip(windows, outcomes) if isinstance(outcome, BaseException)]
+        if failed:
+            raise Exception(f"{len(failed)} of {len(windows)} date windows failed for {export_name}: {failed}")
+        
+        self.logger.info(f"{export_name}: fetched {len(windows)} windows in {(datetime.now() - fetch_start).total_seconds():.1f}s")
+        for window, source in zip(windows, outcomes):
+            self.windowed_fetcher.archive.store_async(export_name, source, *window)
+        return await asyncio.to_thread(self.windowed_fetcher.merge, export_name, list(outcomes))
+    
+    async def export_transaksi(self, start_date: str, end_date: str, page: Page = None):
         """Export transaksi data"""
         export_name = "transaksi"
         self.logger.info(f"Starting {export_name} export...")
         export_start = datetime.now()
+        page = page or self.page
         
         try:
             config = self.config.get_export_config(export_name)
             
-            # Navigate to export page
-            await self.page.goto(config["url"])
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Fill date fields (YYYY-MM-DD format for HTML5 date inputs)
-            await self.page.fill('input[name="start_date"]', start_date)
-            await self.page.fill('input[name="end_date"]', end_date)
-            
-            # Click export button and handle download
-            async with self.page.expect_download() as download_info:
-                await self.page.click('button:has-text("Export")')
-            
-            download = await download_info.value
+            if self.windowed_fetcher.should_split(start_date, end_date):
+                # Long range: one page per N-day window, merged into one DataFrame
+                export_source = await self._download_windows(export_name, 'button:has-text("Export")', start_date, end_date)
+            else:
+                # Navigate to export page
+                await page.goto(config["url"])
+                await page.wait_for_load_state('networkidle')
             
-            # Save file
-            downloads_path = Path(self.config.DOWNLOADS_FOLDER)
-            downloads_path.mkdir(exist_ok=True)
+                # Fill date fields (YYYY-MM-DD format for HTML5 date inputs)
+                await page.fill('input[name="start_date"]', start_date)
+                await page.fill('input[name="end_date"]', end_date)
             
-            file_path = downloads_path / f"{config['file_prefix']}_{start_date}_{end_date}.xlsx"
-            await download.save_as(str(file_path))
+                # Download (or capture in memory) the export
+                export_source = await self._download_export(page, export_name, 'button:has-text("Export")', start_date, end_date)
             
             # Upload to Google Sheets
             sheets_manager = SheetsManager(export_name)
-            success = sheets_manager.upload_with_smart_validation(str(file_path))
+            # Run the blocking upload in a worker thread so concurrent exports keep progressing
+            upload_result = await asyncio.to_thread(
+                sheets_manager.upload_with_smart_validation, export_source, start_date=start_date, end_date=end_date
+            )
+            self._record_upload_status(export_name, upload_result)
             
             # Check if upload was successful (upload_with_smart_validation returns True/False)
             self.export_times[export_name] = (datetime.now() - export_start).total_seconds()
@@ -140,47 +316,46 @@ class SingleSessionAutomation:
                 
         except Exception as e:
             self.logger.error(f"{export_name} export failed: {str(e)}")
-            await self.page.screenshot(path=f"{export_name}_export_error.png")
+            if page:
+                await page.screenshot(path=f"{export_name}_export_error.png")
             return False
             
-    async def export_point_trx(self, start_date: str, end_date: str):
+    async def export_point_trx(self, start_date: str, end_date: str, page: Page = None):
         """Export point transaction data"""
         export_name = "point_trx"
         self.logger.info(f"Starting {export_name} export...")
         export_start = datetime.now()
+        page = page or self.page
         
         try:
             config = self.config.get_export_config(export_name)
             selectors = config["selectors"]
             
-            # Navigate to export page
-            await self.page.goto(config["url"])
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Fill date fields (HTML5 date input format: YYYY-MM-DD)
-            await self.page.fill(selectors["start_date"], start_date)
-            await self.page.fill(selectors["end_date"], end_date)
-            
-            # Wait a moment for any dynamic updates
-            await self.page.wait_for_timeout(1000)
-            
-            # Click export button and handle download
-            async with self.page.expect_download() as download_info:
-                await self.page.click(selectors["export_button"])
+            if self.windowed_fetcher.should_split(start_date, end_date):
+                # Long range: one page per N-day window, merged into one DataFrame
+                export_source = await self._download_windows(export_name, selectors["export_button"], start_date, end_date)
+            else:
+                # Navigate to export page
+                await page.goto(config["url"])
+                await page.wait_for_load_state('networkidle')
             
-            download = await download_info.value
+                # Fill date fields (HTML5 date input format: YYYY-MM-DD)
+                await page.fill(selectors["start_date"], start_date)
+                await page.fill(selectors["end_date"], end_date)
             
-            # Save file
-            downloads_path = Path(self.config.DOWNLOADS_FOLDER)
-            downloads_path.mkdir(exist_ok=True)
+                # Wait a moment for any dynamic updates
+                await page.wait_for_timeout(1000)
             
-            file_extension = ".pdf" if config["file_type"] == "pdf" else ".xlsx"
-            file_path = downloads_path / f"{config['file_prefix']}_{start_date}_{end_date}{file_extension}"
-            await download.save_as(str(file_path))
+                # Download (or capture in memory) the export
+                export_source = await self._download_export(page, export_name, selectors["export_button"], start_date, end_date)
             
             # Upload Excel file to Google Sheets (all exports are now Excel format)
             sheets_manager = SheetsManager(export_name)
-            success = sheets_manager.upload_with_smart_validation(str(file_path))
+            # Run the blocking upload in a worker thread so concurrent exports keep progressing
+            upload_result = await asyncio.to_thread(
+                sheets_manager.upload_with_smart_validation, export_source, start_date=start_date, end_date=end_date
+            )
+            self._record_upload_status(export_name, upload_result)
             
             # Always return True if we reach this point (upload completed)
             self.export_times[export_name] = (datetime.now() - export_start).total_seconds()
@@ -189,47 +364,46 @@ class SingleSessionAutomation:
                 
         except Exception as e:
             self.logger.error(f"{export_name} export failed: {str(e)}")
-            await self.page.screenshot(path=f"{export_name}_export_error.png")
+            if page:
+                await page.screenshot(path=f"{export_name}_export_error.png")
             return False
             
-    async def export_user(self, start_date: str, end_date: str):
+    async def export_user(self, start_date: str, end_date: str, page: Page = None):
         """Export user data with date filtering"""
         export_name = "user"
         self.logger.info(f"Starting {export_name} export...")
         export_start = datetime.now()
+        page = page or self.page
         
         try:
             config = self.config.get_export_config(export_name)
             selectors = config["selectors"]
             
-            # Navigate to export page
-            await self.page.goto(config["url"])
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Fill date fields (HTML5 date input format: YYYY-MM-DD)
-            await self.page.fill(selectors["start_date"], start_date)
-            await self.page.fill(selectors["end_date"], end_date)
-            
-            # Wait a moment for any dynamic updates
-            await self.page.wait_for_timeout(1000)
-            
-            # Click export button and handle download
-            async with self.page.expect_download() as download_info:
-                await self.page.click(selectors["export_button"])
+            if self.windowed_fetcher.should_split(start_date, end_date):
+                # Long range: one page per N-day window, merged into one DataFrame
+                export_source = await self._download_windows(export_name, selectors["export_button"], start_date, end_date)
+            else:
+                # Navigate to export page
+                await page.goto(config["url"])
+                await page.wait_for_load_state('networkidle')
             
-            download = await download_info.value
+                # Fill date fields (HTML5 date input format: YYYY-MM-DD)
+                await page.fill(selectors["start_date"], start_date)
+                await page.fill(selectors["end_date"], end_date)
             
-            # Save file
-            downloads_path = Path(self.config.DOWNLOADS_FOLDER)
-            downloads_path.mkdir(exist_ok=True)
+                # Wait a moment for any dynamic updates
+                await page.wait_for_timeout(1000)
             
-            file_extension = ".pdf" if config["file_type"] == "pdf" else ".xlsx"
-            file_path = downloads_path / f"{config['file_prefix']}_{start_date}_{end_date}{file_extension}"
-            await download.save_as(str(file_path))
+                # Download (or capture in memory) the export
+                export_source = await self._download_export(page, export_name, selectors["export_button"], start_date, end_date)
             
             # Upload Excel file to Google Sheets (all exports are now Excel format)
             sheets_manager = SheetsManager(export_name)
-            success = sheets_manager.upload_with_smart_validation(str(file_path))
+            # Run the blocking upload in a worker thread so concurrent exports keep progressing
+            upload_result = await asyncio.to_thread(
+                sheets_manager.upload_with_smart_validation, export_source, start_date=start_date, end_date=end_date
+            )
+            self._record_upload_status(export_name, upload_result)
             
             # Always return True if we reach this point (upload completed)
             self.export_times[export_name] = (datetime.now() - export_start).total_seconds()
@@ -238,47 +412,46 @@ class SingleSessionAutomation:
                 
         except Exception as e:
             self.logger.error(f"{export_name} export failed: {str(e)}")
-            await self.page.screenshot(path=f"{export_name}_export_error.png")
+            if page:
+                await page.screenshot(path=f"{export_name}_export_error.png")
             return False
             
-    async def export_pembayaran_koin(self, start_date: str, end_date: str):
+    async def export_pembayaran_koin(self, start_date: str, end_date: str, page: Page = None):
         """Export coin payment data"""
         export_name = "pembayaran_koin"
         self.logger.info(f"Starting {export_name} export...")
         export_start = datetime.now()
+        page = page or self.page
         
         try:
             config = self.config.get_export_config(export_name)
             selectors = config["selectors"]
             
-            # Navigate to export page
-            await self.page.goto(config["url"])
-            await self.page.wait_for_load_state('networkidle')
-            
-            # Fill date fields (HTML5 date input format: YYYY-MM-DD)
-            await self.page.fill(selectors["start_date"], start_date)
-            await self.page.fill(selectors["end_date"], end_date)
-            
-            # Wait a moment for any dynamic updates
-            await self.page.wait_for_timeout(1000)
-            
-            # Click export button and handle download
-            async with self.page.expect_download() as download_info:
-                await self.page.click(selectors["export_button"])
+            if self.windowed_fetcher.should_split(start_date, end_date):
+                # Long range: one page per N-day window, merged into one DataFrame
+                export_source = await self._download_windows(export_name, selectors["export_button"], start_date, end_date)
+            else:
+                # Navigate to export page
+                await page.goto(config["url"])
+                await page.wait_for_load_state('networkidle')
             
-            download = await download_info.value
+                # Fill date fields (HTML5 date input format: YYYY-MM-DD)
+                await page.fill(selectors["start_date"], start_date)
+                await page.fill(selectors["end_date"], end_date)
             
-            # Save file
-            downloads_path = Path(self.config.DOWNLOADS_FOLDER)
-            downloads_path.mkdir(exist_ok=True)
+                # Wait a moment for any dynamic updates
+                await page.wait_for_timeout(1000)
             
-            file_extension = ".pdf" if config["file_type"] == "pdf" else ".xlsx"
-            file_path = downloads_path / f"{config['file_prefix']}_{start_date}_{end_date}{file_extension}"
-            await download.save_as(str(file_path))
+                # Download (or capture in memory) the export
+                export_source = await self._download_export(page, export_name, selectors["export_button"], start_date, end_date)
             
             # Upload Excel file to Google Sheets (all exports are now Excel format)
             sheets_manager = SheetsManager(export_name)
-            success = sheets_manager.upload_with_smart_validation(str(file_path))
+            # Run the blocking upload in a worker thread so concurrent exports keep progressing
+            upload_result = await asyncio.to_thread(
+                sheets_manager.upload_with_smart_validation, export_source, start_date=start_date, end_date=end_date
+            )
+            self._record_upload_status(export_name, upload_result)
             
             # Always return True if we reach this point (upload completed)
             self.export_times[export_name] = (datetime.now() - export_start).total_seconds()
@@ -287,7 +460,8 @@ class SingleSessionAutomation:
                 
         except Exception as e:
             self.logger.error(f"{export_name} export failed: {str(e)}")
-            await self.page.screenshot(path=f"{export_name}_export_error.png")
+            if page:
+                await page.screenshot(path=f"{export_name}_export_error.png")
             return False
             
     async def _analyze_page_structure(self, export_name: str):
@@ -374,31 +548,7 @@ class SingleSessionAutomation:
             # 4. Coin Payment Export (needs data collection)  
             results["pembayaran_koin"] = await self.export_pembayaran_koin(start_date, end_date)
             
-            # Calculate session statistics
-            total_time = (datetime.now() - self.session_start_time).total_seconds()
-            successful_exports = [k for k, v in results.items() if v]
-            failed_exports = [k for k, v in results.items() if not v]
-            
-            self.logger.info("=== Single Session Automation Summary ===")
-            self.logger.info(f"Total session time: {total_time:.2f} seconds")
-            self.logger.info(f"Login time: {self.login_time:.2f} seconds")
-            self.logger.info(f"Successful exports: {successful_exports}")
-            self.logger.info(f"Failed exports: {failed_exports}")
-            
-            for export_name, duration in self.export_times.items():
-                self.logger.info(f"{export_name} export time: {duration:.2f} seconds")
-            
-            return {
-                "success": True,
-                "results": results,
-                "stats": {
-                    "total_time": total_time,
-                    "login_time": self.login_time,
-                    "export_times": self.export_times,
-                    "successful_exports": successful_exports,
-                    "failed_exports": failed_exports
-                }
-            }
+            return self._build_session_summary(results)
             
         except Exception as e:
             self.logger.error(f"Single session automation failed: {str(e)}")
@@ -407,8 +557,124 @@ class SingleSessionAutomation:
         finally:
             # Clean up browser
             if self.browser:
+                self.request_blocker.log_report()
+                await self.browser.close()
+                self.logger.info("Browser session closed")
+    
+    async def _run_export_on_new_page(self, export_name: str, start_date: str, end_date: str):
+        """Run one export on its own page inside the shared logged-in context"""
+        export_method = getattr(self, f"export_{export_name}")
+        
+        if self.windowed_fetcher.should_split(start_date, end_date):
+            # Windowed exports only use window pages, which take their own slots -
+            # holding a slot here as well could starve the windows
+            try:
+                return await export_method(start_date, end_date)
+            except Exception as e:
+                self.logger.error(f"{export_name} concurrent export failed: {str(e)}")
+                return False
+        
+        async with self.page_slots:
+            page = None
+            try:
+                page = await self._new_page(export_name)
+                return await export_method(start_date, end_date, page=page)
+                
+            except Exception as e:
+                # Isolate failures - one broken export must not cancel the others
+                self.logger.error(f"{export_name} concurrent export failed: {str(e)}")
+                return False
+                
+            finally:
+                if page:
+                    await page.close()
+    
+    async def run_all_exports_concurrent(self, start_date: str = None, end_date: str = None, max_concurrency: int = None):
+        """Run all exports at once, one page per export, sharing the single login"""
+        self.session_start_time = datetime.now()
+        
+        if not start_date:
+            start_date = datetime.now().strftime("%Y-%m-%d")
+        if not end_date:
+            end_date = start_date
+        if not max_concurrency:
+            max_concurrency = self.config.CONCURRENCY_CONFIG["max_concurrent_exports"]
+            
+        self.logger.info(f"Starting concurrent single session automation for date range: {start_date} to {end_date} (max {max_concurrency} pages)")
+        
+        try:
+            # Initialize browser - every export opens its own page, so skip the main one
+            await self.initialize_browser(main_page=False)
+            
+            # Login once - every page opened from this context shares the cookies
+            if not await self.login_to_backend():
+                return {"success": False, "error": "Login failed"}
+            
+            self.page_slots = asyncio.Semaphore(max_concurrency)
+            export_names = self.config.get_all_export_types()
+            
+            outcomes = await asyncio.gather(
+                *[self._run_export_on_new_page(name, start_date, end_date) for name in export_names],
+                return_exceptions=True
+            )
+            
+            results = {}
+            for export_name, outcome in zip(export_names, outcomes):
+                if isinstance(outcome, BaseException):
+                    self.logger.error(f"{export_name} export raised: {str(outcome)}")
+                    results[export_name] = False
+                else:
+                    results[export_name] = outcome
+            
+            return self._build_session_summary(results)
+            
+        except Exception as e:
+            self.logger.error(f"Concurrent session automation failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+            
+        finally:
+            # Clean up browser
+            if self.browser:
+                self.request_blocker.log_report()
                 await self.browser.close()
                 self.logger.info("Browser session closed")
+    
+    def _build_session_summary(self, results: dict):
+        """Log and return session statistics"""
+        total_time = (datetime.now() - self.session_start_time).total_seconds()
+        successful_exports = [k for k, v in results.items() if v]
+        failed_exports = [k for k, v in results.items() if not v]
+        
+        self.logger.info("=== Single Session Automation Summary ===")
+        self.logger.info(f"Total session time: {total_time:.2f} seconds")
+        self.logger.info(f"Login time: {self.login_time:.2f} seconds")
+        self.logger.info(f"Successful exports: {successful_exports}")
+        self.logger.info(f"Failed exports: {failed_exports}")
+        unchanged_exports = [k for k, v in self.export_statuses.items() if v == "unchanged"]
+        if unchanged_exports:
+            self.logger.info(f"Unchanged exports (upload skipped): {unchanged_exports}")
+        
+        for export_name, duration in self.export_times.items():
+            self.logger.info(f"{export_name} export time: {duration:.2f} seconds")
+        
+        # Compare wall clock with the sum of export times to show the concurrency gain
+        summed_time = sum(self.export_times.values())
+        if summed_time > 0:
+            self.logger.info(f"Sum of export times: {summed_time:.2f} seconds (wall clock {total_time:.2f} seconds)")
+        
+        return {
+            "success": True,
+            "results": results,
+            "stats": {
+                "total_time": total_time,
+                "login_time": self.login_time,
+                "export_times": self.export_times,
+                "successful_exports": successful_exports,
+                "failed_exports": failed_exports,
+                "unchanged_exports": unchanged_exports,
+                "request_blocking": self.request_blocker.get_stats()
+            }
+        }
                 
     async def test_individual_export(self, export_type: str, start_date: str = None, end_date: str = None):
         """Test individual export for data collection"""
@@ -457,6 +723,11 @@ async def run_single_session_date(date: str):
     automation = SingleSessionAutomation()
     return await automation.run_all_exports_sequential(date, date)
 
+async def run_single_session_concurrent(date: str, max_concurrency: int = None):
+    """Run all exports concurrently for specific date in single session"""
+    automation = SingleSessionAutomation()
+    return await automation.run_all_exports_concurrent(date, date, max_concurrency)
+
 async def test_export_page(export_type: str):
     """Test individual export page for data collection"""
     automation = SingleSessionAutomation()
@@ -471,6 +742,8 @@ if __name__ == "__main__":
     parser.add_argument('--date', type=str, help='Date for export (YYYY-MM-DD)')
     parser.add_argument('--test', type=str, help='Test specific export (point_trx, user, pembayaran_koin)')
     parser.add_argument('--all', action='store_true', help='Run all exports in single session')
+    parser.add_argument('--concurrent', action='store_true', help='Run exports concurrently (one page per export)')
+    parser.add_argument('--max-concurrency', type=int, help='Maximum pages exporting at the same time')
     parser.add_argument('--headless', action='store_true', help='Force headless mode (no browser window)')
     parser.add_argument('--debug', action='store_true', help='Debug mode (show browser, slow motion)')
     parser.add_argument('--production', action='store_true', help='Production mode (optimized settings)')
@@ -503,7 +776,10 @@ if __name__ == "__main__":
         # Run all exports
         target_date = args.date or datetime.now().strftime("%Y-%m-%d")
         automation = SingleSessionAutomation(headless=headless, debug=debug, production=production)
-        asyncio.run(automation.run_all_exports_sequential(target_date, target_date))
+        if args.concurrent:
+            asyncio.run(automation.run_all_exports_concurrent(target_date, target_date, args.max_concurrency))
+        else:
+            asyncio.run(automation.run_all_exports_sequential(target_date, target_date))
     else:
         # Default: run all exports for today
         automation = SingleSessionAutomation(headless=headless, debug=debug, production=production)
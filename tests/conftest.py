@@ -0,0 +1,102 @@
+"""
+Shared fixtures: an in-memory worksheet and a SheetsManager wired to it (no Google credentials)
+"""
+
+import logging
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.config import ExportConfig
+from shared.data_validator import DataValidator
+from shared.export_schema import ExportSchema
+from shared.sheet_key_index import SheetKeyIndex
+from shared.sheets_manager import SheetsManager
+from shared.sheets_serializer import SheetsSerializer
+
+def displayed(value) -> str:
+    """Cell text as the sheet shows a value written with valueInputOption RAW"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class FakeSheet:
+    """The gspread Worksheet calls the upload path uses, over a list of displayed rows"""
+
+    def __init__(self, rows=None):
+        self.rows = [[displayed(value) for value in row] for row in rows or []]
+        self.batch_update_calls = []
+        self.full_reads = 0
+
+    @staticmethod
+    def _trimmed(rows):
+        # The API omits trailing empty cells and rows
+        rows = [list(row) for row in rows]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def _range(self, range_name: str):
+        first, last = map(int, range_name.split(":"))
+        return self._trimmed(self.rows[first - 1:last])
+
+    def get_all_values(self):
+        self.full_reads += 1
+        rows = self._trimmed(self.rows)
+        width = max((len(row) for row in rows), default=0)
+        return [row + [""] * (width - len(row)) for row in rows]
+
+    def get(self, range_name: str):
+        return self._range(range_name)
+
+    def batch_get(self, ranges):
+        return [self._range(range_name) for range_name in ranges]
+
+    def update(self, range_name: str, values):
+        first = int(re.match(r"A(\d+)", range_name).group(1))
+        for offset, row in enumerate(values):
+            while len(self.rows) < first + offset:
+                self.rows.append([])
+            self.rows[first - 1 + offset] = [displayed(value) for value in row]
+
+    def batch_update(self, data):
+        self.batch_update_calls.append(data)
+        for entry in data:
+            self.update(entry["range"], entry["values"])
+
+@pytest.fixture
+def sheets_manager(tmp_path, monkeypatch):
+    """SheetsManager for the point_trx export without a Google client; state files go to tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    manager = object.__new__(SheetsManager)
+    manager.export_type = "point_trx"
+    manager.export_config = ExportConfig.get_export_config("point_trx")
+    manager.logger = logging.getLogger("tests")
+    manager.retry_config = dict(ExportConfig.GOOGLE_SHEETS_RETRY_CONFIG, base_delay=0, jitter=False,
+                                 rate_limit_delay=0, batch_delay=0)
+    manager.serializer = SheetsSerializer(ExportSchema(columns={}))
+    manager.row_update_config = dict(ExportConfig.ROW_UPDATE_CONFIG, enabled=True)
+    manager.gc = None
+    return manager
+
+@pytest.fixture
+def validator():
+    return DataValidator(unique_key="ID", composite_key_columns=["ID"])
+
+@pytest.fixture
+def key_index(sheets_manager, validator, tmp_path):
+    """Key index over a fresh SQLite file, sampling every row in its probe"""
+    config = dict(ExportConfig.SHEET_KEY_INDEX_CONFIG, enabled=True, folder=str(tmp_path / "key_index"),
+                  probe_sample_rows=1000)
+    return SheetKeyIndex(sheets_manager, validator, config)
@@ -0,0 +1,83 @@
+"""
+HttpExportFetcher session handling: stale cookies must not keep the HTTP path failing all run
+"""
+
+import pytest
+
+from shared.config import ExportConfig
+from shared.export_download import ExportDownloadMixin
+from shared.http_exporter import HttpExportError, HttpExportFetcher
+from shared.session_cache import SessionCache
+
+LOGIN_PAGE = """<form action="/login" method="post">
+<input name="email"><input name="password" type="password"><button type="submit">Log In</button>
+</form>"""
+
+STALE_COOKIE = {"name": "laravel_session", "value": "stale", "domain": "backend.example"}
+FRESH_COOKIE = {"name": "laravel_session", "value": "fresh", "domain": "backend.example"}
+
+class FakeResponse:
+    def __init__(self, url: str, text: str):
+        self.url = url
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+class LoginPageSession:
+    """requests.Session whose every page is the login form (stale cookies)"""
+
+    def __init__(self, session):
+        self.cookies = session.cookies
+        self.pages = []
+
+    def get(self, url, **kwargs):
+        self.pages.append(url)
+        return FakeResponse(url, LOGIN_PAGE)
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = HttpExportFetcher(dict(ExportConfig.HTTP_EXPORT_CONFIG, enabled=True))
+    fetcher.session_cache = SessionCache(dict(ExportConfig.SESSION_CACHE_CONFIG, enabled=True,
+                                              file=str(tmp_path / "session.json"), encryption_key=None))
+    fetcher.session_cache.save_storage_state({"cookies": [STALE_COOKIE], "origins": []})
+    fetcher.load_cookies(fetcher.session_cache.load())
+    fetcher.session = LoginPageSession(fetcher.session)
+    return fetcher
+
+def test_missing_export_form_resets_session(fetcher):
+    assert fetcher.authenticated
+
+    with pytest.raises(HttpExportError, match="Export form not found"):
+        fetcher.fetch_export_bytes("transaksi", "2024-01-01", "2024-01-01")
+
+    assert not fetcher.authenticated
+    assert len(fetcher.session.cookies) == 0
+    assert fetcher.session_cache.load() is None
+
+def test_browser_fallback_hands_over_fresh_cookies(fetcher):
+    class Connector:
+        driver = type("Driver", (), {"get_cookies": lambda self: [FRESH_COOKIE]})()
+
+        def set_export_type(self, export_type):
+            pass
+
+        def ensure_logged_in(self):
+            pass
+
+        def navigate_to_export_page(self):
+            pass
+
+        def download_export_file(self, start_date, end_date):
+            return "browser.xlsx"
+
+    class Automation(ExportDownloadMixin):
+        pass
+
+    automation = Automation()
+    automation._setup_download("transaksi", Connector(), fetcher)
+
+    # HTTP still believes it is authenticated - the browser's cookies replace the stale ones anyway
+    assert automation._download_via_browser("2024-01-01", "2024-01-01") == "browser.xlsx"
+    assert fetcher.authenticated
+    assert fetcher.session.cookies.get("laravel_session") == "fresh"
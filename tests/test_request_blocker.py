@@ -0,0 +1,46 @@
+"""
+RequestBlocker URL matching: extension patterns must also catch cache-busting query strings
+"""
+
+import re
+
+from shared.config import ExportConfig
+from shared.request_blocker import RequestBlocker
+
+ASSET_URLS = [
+    "https://backend.example/css/app.css?v=123",
+    "https://backend.example/fonts/icons.woff2?v=4.7.0#iefix",
+    "https://backend.example/img/logo.png",
+]
+
+def cdp_matches(url: str, pattern: str) -> bool:
+    """Network.setBlockedURLs matching - '*' is the only wildcard"""
+    return re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) is not None
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = {}
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands[command] = params
+
+def test_selenium_patterns_block_assets_with_query_strings():
+    driver = FakeDriver()
+    RequestBlocker(dict(ExportConfig.REQUEST_BLOCKING_CONFIG, enabled=True)).apply_to_selenium(driver)
+    patterns = driver.commands["Network.setBlockedURLs"]["urls"]
+
+    for url in ASSET_URLS:
+        assert any(cdp_matches(url, pattern) for pattern in patterns), url
+    assert not any(cdp_matches("https://backend.example/transaction/export?start=2024-01-01", pattern) for pattern in patterns)
+
+def test_url_patterns_ignore_query_string():
+    blocker = RequestBlocker(dict(ExportConfig.REQUEST_BLOCKING_CONFIG, enabled=True, blocked_url_patterns=["*.css"]))
+
+    assert blocker.should_block("https://backend.example/css/app.css?v=123", "other", [])
+    assert not blocker.should_block("https://backend.example/transaction?format=css", "document", [])
+
+def test_allowlist_ignores_query_string():
+    blocker = RequestBlocker(dict(ExportConfig.REQUEST_BLOCKING_CONFIG, enabled=True))
+
+    assert not blocker.should_block("https://backend.example/css/datepicker.css?v=2", "stylesheet", ["*/datepicker.css"])
+    assert blocker.should_block("https://backend.example/css/app.css?v=2", "stylesheet", ["*/datepicker.css"])
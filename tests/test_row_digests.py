@@ -0,0 +1,64 @@
+"""
+DataValidator.row_digests: one digest per displayed row, stable across runs and sources
+"""
+
+import numpy as np
+import pandas as pd
+
+from shared.data_validator import DataValidator
+from shared.sheet_key_index import SheetKeyIndex
+
+COLUMNS = ["ID", "Nama", "Jumlah", "Aktif", "Catatan", "Nomor"]
+
+def sheet_cells() -> pd.DataFrame:
+    """One row as get_all_values returns it"""
+    return pd.DataFrame([["T1", "user1", "66", "TRUE", "", "12345678901234567890"]], columns=COLUMNS, dtype=object)
+
+def upload_frame() -> pd.DataFrame:
+    """The same row as a cleaned upload frame"""
+    return pd.DataFrame({
+        "ID": ["T1"], "Nama": ["user1"], "Jumlah": [66.0], "Aktif": [True],
+        "Catatan": [np.nan], "Nomor": ["12345678901234567890"]
+    })
+
+def test_digest_is_pinned():
+    # Digests are persisted in the key index - if this changes, bump SheetKeyIndex.DIGEST_VERSION
+    assert SheetKeyIndex.DIGEST_VERSION == "digest-1"
+    assert DataValidator.row_digests(sheet_cells()).tolist() == [1559819644559583602]
+
+def test_sheet_text_and_upload_values_digest_equal():
+    assert DataValidator.row_digests(sheet_cells()).tolist() == DataValidator.row_digests(upload_frame()).tolist()
+
+def test_canonical_cell_spellings():
+    assert DataValidator._canonical_cell("5.0") == "5"
+    assert DataValidator._canonical_cell("005") == "5"
+    assert DataValidator._canonical_cell("1.50") == "1.5"
+    assert DataValidator._canonical_cell("true") == "TRUE"
+    assert DataValidator._canonical_cell("Sukses") == "Sukses"
+
+def test_digest_ignores_index_and_row_order():
+    cells = pd.concat([sheet_cells(), sheet_cells().assign(ID="T2")], ignore_index=True)
+    digests = DataValidator.row_digests(cells)
+
+    shuffled = cells.iloc[::-1].set_index(pd.Index([10, 20]))
+
+    assert DataValidator.row_digests(shuffled).tolist() == digests[::-1].tolist()
+
+def test_digest_changes_with_any_cell():
+    base = DataValidator.row_digests(sheet_cells())[0]
+    for column in COLUMNS:
+        changed = sheet_cells()
+        changed[column] = "other"
+        assert DataValidator.row_digests(changed)[0] != base, column
+
+def test_digest_depends_on_column_order():
+    reordered = sheet_cells()[list(reversed(COLUMNS))]
+    assert DataValidator.row_digests(reordered)[0] != DataValidator.row_digests(sheet_cells())[0]
+
+def test_digest_changes_needs_same_columns():
+    validator = DataValidator(unique_key="ID", composite_key_columns=["ID"])
+    new_rows = upload_frame().assign(Jumlah=[67.0])
+
+    assert validator.digest_changes(new_rows, sheet_cells()).tolist() == [True]
+    assert validator.digest_changes(upload_frame()[list(reversed(COLUMNS))], sheet_cells()).tolist() == [False]
+    assert validator.digest_changes(upload_frame().drop(columns=["Catatan"]), sheet_cells()) is None
@@ -0,0 +1,138 @@
+"""
+In-place updates of changed rows: values.batchUpdate packing and the update plan
+"""
+
+import json
+
+import pandas as pd
+from gspread.utils import numericise_all
+
+from conftest import FakeSheet
+from shared.data_validator import DataValidator
+
+HEADER = ["ID", "Nama", "Jumlah", "Poin", "Status"]
+
+def build_frame(rows: int, status: str = "Sukses") -> pd.DataFrame:
+    return pd.DataFrame(
+        [[f"T{number}", f"user{number}", number * 1.5, number * 10.0, status] for number in range(1, rows + 1)],
+        columns=HEADER
+    )
+
+def build_sheet(df: pd.DataFrame) -> FakeSheet:
+    return FakeSheet([HEADER] + df.values.tolist())
+
+def sheet_records(sheet: FakeSheet) -> pd.DataFrame:
+    """The sheet as get_all_records() parses it"""
+    header, *rows = sheet.get_all_values()
+    return pd.DataFrame([dict(zip(header, numericise_all(row))) for row in rows])
+
+def payload_bytes(batch) -> int:
+    """The request size _update_rows estimates for one batch"""
+    return sum(40 + sum(len(json.dumps(values, default=str)) + 1 for values in entry["values"]) for entry in batch)
+
+def test_consecutive_rows_share_one_range(sheets_manager):
+    sheet = build_sheet(build_frame(10))
+    changed = build_frame(10, status="Batal").iloc[2:6]
+
+    written = sheets_manager._update_rows(sheet, changed, [4, 5, 6, 7])
+
+    assert written == [4, 5, 6, 7]
+    assert len(sheet.batch_update_calls) == 1
+    assert [entry["range"] for entry in sheet.batch_update_calls[0]] == ["A4"]
+    assert [row[4] for row in sheet.rows[3:7]] == ["Batal"] * 4
+    assert sheet.rows[2][4] == "Sukses" and sheet.rows[7][4] == "Sukses"
+
+def test_batches_respect_max_ranges(sheets_manager):
+    sheets_manager.row_update_config.update(max_ranges=3)
+    sheet = build_sheet(build_frame(20))
+    changed = build_frame(20, status="Batal").iloc[::2]  # Every other row - no two consecutive
+    rows = [position + 2 for position in range(0, 20, 2)]
+
+    written = sheets_manager._update_rows(sheet, changed, rows)
+
+    assert written == rows
+    assert [len(batch) for batch in sheet.batch_update_calls] == [3, 3, 3, 1]
+    assert [row[4] for row in sheet.rows[1::2]] == ["Batal"] * 10
+
+def test_batches_respect_max_payload(sheets_manager):
+    sheets_manager.row_update_config.update(max_payload_kb=1)
+    sheet = build_sheet(build_frame(200))
+    changed = build_frame(200, status="Batal")
+
+    written = sheets_manager._update_rows(sheet, changed, list(range(2, 202)))
+
+    assert len(written) == 200
+    assert len(sheet.batch_update_calls) > 1
+    assert all(payload_bytes(batch) <= 1024 for batch in sheet.batch_update_calls)
+    assert sum(len(entry["values"]) for batch in sheet.batch_update_calls for entry in batch) == 200
+    assert all(row[4] == "Batal" for row in sheet.rows[1:])
+
+def test_last_record_wins_for_repeated_row(sheets_manager):
+    sheet = build_sheet(build_frame(3))
+    changed = pd.concat([build_frame(1, status="Pending"), build_frame(1, status="Batal")])
+
+    written = sheets_manager._update_rows(sheet, changed, [2, 2])
+
+    assert written == [2]
+    assert sheet.rows[1][4] == "Batal"
+
+def test_disabled_or_unknown_rows_write_nothing(sheets_manager):
+    sheet = build_sheet(build_frame(3))
+    changed = build_frame(3, status="Batal")
+
+    assert sheets_manager._update_rows(sheet, changed, [2, 3]) == []
+    sheets_manager.row_update_config.update(enabled=False)
+    assert sheets_manager._update_rows(sheet, changed, [2, 3, 4]) == []
+    assert sheet.batch_update_calls == []
+
+def test_plan_updates_only_rows_whose_digest_changed():
+    validator = DataValidator(unique_key="ID", composite_key_columns=["ID"])
+    uploaded = build_frame(50)
+    existing = sheet_records(build_sheet(uploaded))
+
+    # Re-uploading the same data: Poin 10.0 vs the sheet's 10 differ as str() but not as displayed cells
+    assert len(validator.categorize_data(uploaded, existing)["updated"]) == 50
+    plan = validator.prepare_smart_upload_data(uploaded, existing)
+    assert plan["update_rows"] == []
+    assert len(plan["skip_data"]) == 50
+
+    changed = uploaded.copy()
+    changed.loc[[4, 30], "Status"] = "Batal"
+    plan = validator.prepare_smart_upload_data(changed, existing)
+    assert plan["update_rows"] == [6, 32]
+    assert plan["update_data"]["ID"].tolist() == ["T5", "T31"]
+    assert len(plan["skip_data"]) == 48
+
+class FlakySheet(FakeSheet):
+    """Fails the second batchUpdate call once, as a 503 part-way through the updates would"""
+
+    def __init__(self, rows=None):
+        super().__init__(rows)
+        self.batch_update_attempts = 0
+
+    def batch_update(self, data):
+        self.batch_update_attempts += 1
+        if self.batch_update_attempts == 2:
+            raise Exception("APIError: [503]: The service is currently unavailable - service unavailable")
+        super().batch_update(data)
+
+def test_failed_batch_update_does_not_repeat_append(sheets_manager):
+    sheets_manager.row_update_config.update(max_ranges=1)
+    sheet = FlakySheet([HEADER] + build_frame(10).values.tolist())
+    new_records = build_frame(12).iloc[10:]
+    changed = build_frame(10, status="Batal").iloc[[1, 5, 8]]
+    upload_plan = {
+        "append_data": new_records,
+        "update_data": changed,
+        "update_rows": [3, 7, 10],
+        "skip_data": pd.DataFrame(),
+        "operations": []
+    }
+
+    updated_rows = sheets_manager._execute_smart_upload(sheet, upload_plan, existing_rows=10)
+
+    assert updated_rows == [3, 7, 10]
+    assert sheet.batch_update_attempts == 4  # Three batches, the second one retried
+    assert len(sheet.get_all_values()) == 13  # Header, 10 existing rows, 2 appended once
+    assert [row[0] for row in sheet.rows[11:]] == ["T11", "T12"]
+    assert [sheet.rows[row - 1][4] for row in (3, 7, 10)] == ["Batal"] * 3
@@ -0,0 +1,92 @@
+"""
+SheetKeyIndex against an in-memory sheet: trust checks, reconcile and in-place row updates
+"""
+
+import pandas as pd
+
+from conftest import FakeSheet
+
+HEADER = ["ID", "Nama", "Jumlah", "Status"]
+
+def build_sheet(rows: int = 5) -> FakeSheet:
+    return FakeSheet([HEADER] + [[f"T{number}", f"user{number}", number * 1.5, "Sukses"] for number in range(1, rows + 1)])
+
+def test_reconcile_reads_sheet_and_indexes_every_row(key_index):
+    sheet = build_sheet()
+
+    existing_df = key_index.reconcile(sheet)
+
+    assert len(existing_df) == 5
+    assert key_index.reconciled
+    assert key_index.used_rows == 6
+    found = key_index.lookup(pd.Series(["T1", "T5", "missing"]))
+    assert {key: row for key, (row, _) in found.items()} == {"T1": 2, "T5": 6}
+
+def test_is_current_only_after_reconcile(key_index):
+    sheet = build_sheet()
+
+    assert not key_index.is_current(sheet)
+    key_index.reconcile(sheet)
+    assert key_index.is_current(sheet)
+    assert sheet.full_reads == 1  # The trust check is a batch read, not another full read
+
+def test_is_current_detects_manual_edit(key_index):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+
+    sheet.rows[3][1] = "edited by hand"
+
+    assert not key_index.is_current(sheet)
+
+def test_is_current_detects_rows_added_outside(key_index):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+
+    sheet.rows.append(["T99", "someone", "1", "Sukses"])
+
+    assert not key_index.is_current(sheet)
+
+def test_is_current_detects_changed_key_columns(key_index, validator):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+
+    key_index.key_signature = [validator.unique_key, ["ID", "Status"], key_index.DIGEST_VERSION]
+
+    assert not key_index.is_current(sheet)
+
+def test_invalidate_forces_reconcile(key_index):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+
+    key_index.invalidate("test")
+
+    assert not key_index.is_current(sheet)
+    key_index.reconcile(sheet)
+    assert key_index.is_current(sheet)
+
+def test_record_update_keeps_index_current(key_index, validator):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+    changed = pd.DataFrame([["T2", "user2", 3.0, "Batal"]], columns=HEADER)
+    _, is_changed, sheet_rows = key_index.match(validator.create_composite_key(changed), key_index.digests_for(changed))
+    assert is_changed.tolist() == [True]
+    assert sheet_rows.tolist() == [3]
+
+    sheet.batch_update([{"range": "A3", "values": [["T2", "user2", 3.0, "Batal"]]}])
+    key_index.record_update(sheet, [3])
+
+    # The probe accepts the rewritten row and its new content is no longer a change
+    assert key_index.is_current(sheet)
+    _, is_changed, _ = key_index.match(validator.create_composite_key(changed), key_index.digests_for(changed))
+    assert is_changed.tolist() == [False]
+
+def test_record_append_adds_read_back_rows(key_index, validator):
+    sheet = build_sheet()
+    key_index.reconcile(sheet)
+
+    sheet.update("A7", [["T6", "user6", 9.0, "Sukses"], ["T7", "user7", 10.5, "Sukses"]])
+    key_index.record_append(sheet, 7, 2)
+
+    assert key_index.used_rows == 8
+    assert key_index.is_current(sheet)
+    assert key_index.contains(pd.Series(["T6", "T7", "T8"])).tolist() == [True, True, False]